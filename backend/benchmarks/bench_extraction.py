@@ -0,0 +1,89 @@
+"""Benchmark snippet extraction as result sets and skill lists grow.
+
+Generates synthetic LinkedIn-style snippets and times the previous per-result
+extraction (patterns compiled on every call, one lowercase scan per skill
+and exclusion term) against the batch pipeline in agents/tools/extraction.py.
+The baseline grows with the number of skills; the pipeline should stay flat.
+
+Usage (from backend/):
+    python benchmarks/bench_extraction.py --snippets 1000,10000 --skills 5,50,500
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from agents.tools.extraction import extract_profile_fields_batch, skill_matcher
+
+WORDS = (
+    "engineer manager senior staff lead team product design platform payments infrastructure "
+    "python go rust java kubernetes react aws data machine learning distributed systems the and "
+    "with for building scaling teams startup enterprise"
+).split()
+COMPANIES = ["Stripe", "Google", "Airbnb", "Figma", "Datadog", "Notion"]
+
+def make_snippets(count: int, rng: random.Random) -> list:
+    snippets = []
+    for i in range(count):
+        body = " ".join(rng.choice(WORDS) for _ in range(30))
+        years = f" {rng.randint(1, 20)}+ years of experience" if i % 3 == 0 else ""
+        snippets.append(f"{rng.choice(WORDS).title()} Engineer\nCurrently at {rng.choice(COMPANIES)}. {body}{years}")
+    return snippets
+
+def make_skills(count: int) -> list:
+    known = ["Python", "Go", "Rust", "Kubernetes", "Machine Learning", "Distributed Systems", "AWS", "React"]
+    return (known + [f"Skill {i}" for i in range(count)])[:count]
+
+def baseline(snippets: list, skills: list) -> list:
+    """The extraction search_professionals did before the pipeline, per result."""
+    results = []
+    for snippet in snippets:
+        import re
+        position = ""
+        for line in snippet.split("\n"):
+            if any(term in line.lower() for term in ["at ", "currently ", "presently "]):
+                position = line.strip()
+                break
+        match = re.search(r"(\d+)\+?\s*(?:year|yr)s?\s*(?:of\s*)?experience", snippet.lower())
+        results.append({
+            "excluded": any(term in snippet.lower() for term in ["job", "career", "hiring", "apply now"]),
+            "current_position": position,
+            "years_experience": int(match.group(1)) if match else None,
+            "matched_skills": [skill for skill in skills if skill.lower() in snippet.lower()],
+        })
+    return results
+
+def pipeline(snippets: list, skills: list) -> list:
+    return extract_profile_fields_batch(snippets, skills, with_years=True)
+
+def best_of(function, snippets: list, skills: list, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        skill_matcher.cache_clear()  # include building the matcher, as a new search would
+        start = time.perf_counter()
+        function(snippets, skills)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--snippets", default="1000,10000", help="Comma-separated snippet counts")
+    parser.add_argument("--skills", default="5,50,500", help="Comma-separated skill counts")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'snippets':>9} {'skills':>7} {'baseline (ms)':>14} {'pipeline (ms)':>14} {'us/snippet':>11}")
+    for count in (int(n) for n in args.snippets.split(",")):
+        snippets = make_snippets(count, rng)
+        for skill_count in (int(n) for n in args.skills.split(",")):
+            skills = make_skills(skill_count)
+            before = best_of(baseline, snippets, skills, args.repeat)
+            after = best_of(pipeline, snippets, skills, args.repeat)
+            print(f"{count:>9} {skill_count:>7} {before:>14.1f} {after:>14.1f} {after * 1000 / count:>11.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Compare chat turn latency across FOLLOW_UP_MODE settings.
+
+Runs chat_with_openai against a stub OpenAI client that sleeps for a fixed
+latency per completion, with a tool that returns immediately, so the numbers
+isolate the cost of the reply after a tool call.
+
+Usage (from backend/):
+    python benchmarks/bench_follow_up.py --latency 1.5 --turns 5
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from app import create_app
+from services import openai_client
+
+class StubCompletions:
+    """Answers the first call of a turn with a tool call and later calls with text."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    def create(self, **kwargs):
+        time.sleep(self.latency)
+        self.calls += 1
+        if kwargs.get("tool_choice") == "auto":
+            tool_call = SimpleNamespace(
+                id="call_1",
+                function=SimpleNamespace(name="generate_sequence", arguments='{"role": "PM", "location": "SF"}')
+            )
+            message = SimpleNamespace(content=None, tool_calls=[tool_call])
+        else:
+            message = SimpleNamespace(content="Your sequence is ready!", tool_calls=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+def run_mode(mode: str, latency: float, turns: int) -> tuple:
+    stub = StubCompletions(latency)
+    tools = {"generate_sequence": lambda session_id, **kwargs: "Outreach sequence generated and saved successfully."}
+    timings = []
+    with patch.object(openai_client, "FOLLOW_UP_MODE", mode), \
+            patch.object(openai_client.client.chat, "completions", stub), \
+            patch.dict(openai_client.tool_functions, tools):
+        for _ in range(turns):
+            start = time.perf_counter()
+            openai_client.chat_with_openai([{"role": "user", "content": "Make a sequence"}], session_id="bench")
+            timings.append(time.perf_counter() - start)
+    return statistics.mean(timings), stub.calls / turns
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=1.0, help="Seconds per stubbed completion")
+    parser.add_argument("--turns", type=int, default=5, help="Turns per mode")
+    args = parser.parse_args()
+
+    app = create_app(testing=True)
+    with app.app_context():
+        print(f"{'mode':<12} {'turn latency (s)':>17} {'completions/turn':>17}")
+        for mode in openai_client.FOLLOW_UP_MODES:
+            latency, calls = run_mode(mode, args.latency, args.turns)
+            print(f"{mode:<12} {latency:>17.3f} {calls:>17.1f}")
+
+if __name__ == "__main__":
+    main()
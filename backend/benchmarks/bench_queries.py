@@ -0,0 +1,113 @@
+"""Benchmark the session-scoped hot queries with and without indexes.
+
+Fills a throwaway SQLite database with synthetic users, sessions, messages and
+sequence steps, then times the queries behind /chat, /sequence/<id>,
+/sessions and /sessions/<id>/messages before and after the model indexes are
+created. Without indexes latency grows with the table; with them it stays flat.
+
+Usage (from backend/):
+    python benchmarks/bench_queries.py --sizes 10000,100000,1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from sqlalchemy import create_engine, select, func
+from database.db import db
+from database.models import User, Session, Message, SequenceStep
+
+MESSAGES_PER_SESSION = 50
+SESSIONS_PER_USER = 20
+STEPS_PER_SESSION = 3
+BATCH_SIZE = 50_000
+
+def populate(engine, message_count: int) -> tuple:
+    """Insert synthetic rows and return a (user_id, session_id) pair to query."""
+    session_count = max(1, message_count // MESSAGES_PER_SESSION)
+    user_count = max(1, session_count // SESSIONS_PER_USER)
+    start = datetime(2025, 1, 1)
+
+    with engine.begin() as connection:
+        connection.execute(User.__table__.insert(), [
+            {"id": f"user-{u}", "name": f"User {u}", "email": f"user{u}@example.com"}
+            for u in range(user_count)
+        ])
+        connection.execute(Session.__table__.insert(), [
+            {"id": f"session-{s}", "user_id": f"user-{s % user_count}",
+             "created_at": start + timedelta(minutes=s), "session_title": f"Chat {s}"}
+            for s in range(session_count)
+        ])
+        for offset in range(0, session_count * STEPS_PER_SESSION, BATCH_SIZE):
+            connection.execute(SequenceStep.__table__.insert(), [
+                {"id": f"step-{i}", "session_id": f"session-{i // STEPS_PER_SESSION}",
+                 "step_number": i % STEPS_PER_SESSION + 1, "content": "Hi there, ..."}
+                for i in range(offset, min(offset + BATCH_SIZE, session_count * STEPS_PER_SESSION))
+            ])
+        # Interleave sessions so each session's messages are spread across the table
+        for offset in range(0, message_count, BATCH_SIZE):
+            connection.execute(Message.__table__.insert(), [
+                {"id": f"message-{i}", "session_id": f"session-{i % session_count}",
+                 "sender": "user" if i % 2 else "ai", "content": "Find me hiring managers in SF",
+                 "timestamp": start + timedelta(seconds=i)}
+                for i in range(offset, min(offset + BATCH_SIZE, message_count))
+            ])
+
+    middle = session_count // 2
+    return f"user-{middle % user_count}", f"session-{middle}"
+
+def hot_queries(user_id: str, session_id: str) -> dict:
+    return {
+        "messages for session": select(Message).where(Message.session_id == session_id).order_by(Message.timestamp),
+        "message count": select(func.count()).select_from(Message).where(Message.session_id == session_id),
+        "steps for session": select(SequenceStep).where(SequenceStep.session_id == session_id).order_by(SequenceStep.step_number),
+        "sessions for user": select(Session).where(Session.user_id == user_id).order_by(Session.created_at.desc()),
+    }
+
+def time_queries(engine, queries: dict, repeat: int) -> dict:
+    timings = {}
+    with engine.connect() as connection:
+        for name, query in queries.items():
+            connection.execute(query).fetchall()  # warm up
+            start = time.perf_counter()
+            for _ in range(repeat):
+                connection.execute(query).fetchall()
+            timings[name] = (time.perf_counter() - start) / repeat * 1000
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Comma-separated message counts")
+    parser.add_argument("--repeat", type=int, default=20, help="Executions per query")
+    args = parser.parse_args()
+
+    print(f"{'messages':>10}  {'query':<22} {'no index (ms)':>14} {'indexed (ms)':>13}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.sqlite')}")
+            for table in db.metadata.sorted_tables:
+                table.create(engine)
+                for index in table.indexes:
+                    index.drop(engine)
+
+            user_id, session_id = populate(engine, size)
+            queries = hot_queries(user_id, session_id)
+            before = time_queries(engine, queries, args.repeat)
+
+            for table in db.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(engine)
+            with engine.connect() as connection:
+                connection.exec_driver_sql("ANALYZE")
+            after = time_queries(engine, queries, args.repeat)
+            engine.dispose()
+
+        for name in queries:
+            print(f"{size:>10}  {name:<22} {before[name]:>14.3f} {after[name]:>13.3f}")
+
+if __name__ == "__main__":
+    main()
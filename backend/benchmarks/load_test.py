@@ -0,0 +1,79 @@
+"""Measure concurrent /chat throughput against a running backend.
+
+Creates one user and one session per simulated chat, then sends every chat's
+messages concurrently. Pair it with stub_openai_server.py so model latency is
+fixed and free:
+
+    python benchmarks/stub_openai_server.py --latency 2 &
+    (cd src && OPENAI_BASE_URL=http://127.0.0.1:8001/v1 OPENAI_API_KEY=stub python serve.py) &
+    python benchmarks/load_test.py --chats 300 --messages 2
+
+With the gevent server, total time should stay close to messages x latency as
+the number of chats grows; the threaded development server (run.py) degrades
+once its threads are exhausted.
+
+Usage (from backend/):
+    python benchmarks/load_test.py --url http://127.0.0.1:5001 --chats 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+
+async def create_session(client: httpx.AsyncClient, user_id: str) -> str:
+    res = await client.post("/sessions", json={"user_id": user_id, "session_title": "Load test"})
+    res.raise_for_status()
+    return res.json()["session_id"]
+
+async def run_chat(client: httpx.AsyncClient, session_id: str, messages: int, latencies: list, errors: list):
+    for i in range(messages):
+        start = time.perf_counter()
+        try:
+            res = await client.post("/chat", json={"message": f"Message {i}: find PMs in SF", "session_id": session_id, "wait": True})
+            res.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+        except Exception as e:
+            errors.append(str(e))
+
+async def main_async(args):
+    limits = httpx.Limits(max_connections=args.chats, max_keepalive_connections=args.chats)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        res = await client.post("/signup", json={
+            "name": "Load Test",
+            "email": f"load-{uuid.uuid4().hex}@example.com",
+            "title": "Engineer",
+            "industry": "Tech"
+        })
+        res.raise_for_status()
+        user_id = res.json()["user_id"]
+        session_ids = await asyncio.gather(*(create_session(client, user_id) for _ in range(args.chats)))
+
+        latencies, errors = [], []
+        start = time.perf_counter()
+        await asyncio.gather(*(run_chat(client, sid, args.messages, latencies, errors) for sid in session_ids))
+        elapsed = time.perf_counter() - start
+
+    total = args.chats * args.messages
+    print(f"chats: {args.chats}, messages per chat: {args.messages}")
+    print(f"completed: {len(latencies)}/{total} in {elapsed:.2f}s ({len(latencies) / elapsed:.1f} req/s)")
+    if latencies:
+        latencies.sort()
+        print(f"latency p50: {statistics.median(latencies):.2f}s  "
+              f"p95: {latencies[int(len(latencies) * 0.95) - 1]:.2f}s  max: {latencies[-1]:.2f}s")
+    if errors:
+        print(f"errors: {len(errors)} (first: {errors[0]})")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:5001")
+    parser.add_argument("--chats", type=int, default=100, help="Concurrent chat sessions")
+    parser.add_argument("--messages", type=int, default=2, help="Sequential messages per chat")
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Minimal stand-in for the OpenAI chat completions API, for load testing.
+
+Answers POST /v1/chat/completions after a fixed delay with a short assistant
+message (or an SSE stream of it when "stream" is set), so the backend can be
+exercised without spending tokens. Point the backend at it with:
+
+    OPENAI_BASE_URL=http://127.0.0.1:8001/v1 OPENAI_API_KEY=stub python serve.py
+
+Usage (from backend/):
+    python benchmarks/stub_openai_server.py --port 8001 --latency 2.0
+"""
+import argparse
+import json
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLY = "Happy to help with your job search! What role are you targeting?"
+
+class CompletionHandler(BaseHTTPRequestHandler):
+    latency = 1.0
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if not self.path.endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        time.sleep(self.latency)
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        model = body.get("model", "gpt-4")
+        if body.get("stream"):
+            self._stream(completion_id, model)
+        else:
+            self._respond(completion_id, model)
+
+    def _respond(self, completion_id: str, model: str):
+        payload = json.dumps({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": REPLY},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 15, "total_tokens": 115}
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _stream(self, completion_id: str, model: str):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for word in REPLY.split(" "):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.close_connection = True
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=1.0, help="Seconds before each response")
+    args = parser.parse_args()
+
+    CompletionHandler.latency = args.latency
+    server = ThreadingHTTPServer((args.host, args.port), CompletionHandler)
+    server.daemon_threads = True
+    print(f"Stub OpenAI server on http://{args.host}:{args.port}/v1 (latency {args.latency}s)")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
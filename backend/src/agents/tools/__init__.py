@@ -5,8 +5,11 @@ from .core import (
     change_tone,
     add_step,
     generate_networking_asset,
+    undo_sequence_change,
+    redo_sequence_change,
     search_and_analyze_professionals,
-    generate_personalized_outreach
+    generate_personalized_outreach,
+    generate_batch_outreach
 )
 
 __all__ = [
@@ -16,6 +19,9 @@ __all__ = [
     'change_tone',
     'add_step',
     'generate_networking_asset',
+    'undo_sequence_change',
+    'redo_sequence_change',
     'search_and_analyze_professionals',
-    'generate_personalized_outreach'
+    'generate_personalized_outreach',
+    'generate_batch_outreach'
 ]
@@ -1,19 +1,49 @@
-from database.models import SequenceStep, db, Session
-from openai import OpenAI
+from database.queries import get_session_user
+from database.profiles import get_stored_details, search_stored_profiles, store_details, store_profiles
+from database.sequences import current_version, get_sequence, replace_sequence, undo_sequence, redo_sequence
+from services.model_router import create_chat_completion
+from services.user_context import user_contexts
 import os
 from dotenv import load_dotenv
 import json
 import re
-from typing import Dict, Any, Optional, List
-from .web_search import search_professionals, get_professional_details
-
-from socketio_instance import socketio  # import safely
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from typing import Dict, Any, Optional, List, Tuple
+from .web_search import (
+    search_professionals, get_professional_details, normalize_profile_url,
+    SEARCH_CACHE_SIZE, SEARCH_CACHE_PATH, SEARCH_FANOUT_LIMIT
+)
+from .extraction import extract_profile_fields_batch
+from .ranking import merge_duplicates, rank_professionals
+
+from services.cache import TTLCache
+from services.sequence_events import sequence_broadcaster, session_room
+from socketio_instance import socketio
 import logging
 
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 logger = logging.getLogger(__name__)
 
+# Tone changes rewrite every step concurrently; these bound the fan-out.
+TONE_MAX_WORKERS = int(os.getenv("TONE_MAX_WORKERS", "4"))
+TONE_STEP_TIMEOUT = float(os.getenv("TONE_STEP_TIMEOUT", "30"))
+
+# Batch outreach looks up profiles and drafts messages concurrently; model calls
+# are also bounded by the shared OpenAI concurrency limit and token budget.
+OUTREACH_MAX_WORKERS = int(os.getenv("OUTREACH_MAX_WORKERS", "4"))
+OUTREACH_BATCH_LIMIT = int(os.getenv("OUTREACH_BATCH_LIMIT", "10"))
+OUTREACH_DRAFT_TIMEOUT = float(os.getenv("OUTREACH_DRAFT_TIMEOUT", "60"))
+LAST_SEARCH_TTL = float(os.getenv("LAST_SEARCH_TTL", "86400"))
+
+# Searches with at least this many stored matches are answered without going to the network
+PROFILE_LOCAL_MIN_RESULTS = int(os.getenv("PROFILE_LOCAL_MIN_RESULTS", "5"))
+
+# Search results listed in the reply, best matches for the user first
+SEARCH_RESULTS_SHOWN = int(os.getenv("SEARCH_RESULTS_SHOWN", "10"))
+
+# Professionals found by each session's latest search, so batch outreach can target them
+last_searches = TTLCache("last_search", LAST_SEARCH_TTL, SEARCH_CACHE_SIZE, SEARCH_CACHE_PATH)
+
 def get_sequence_data(session_id: str):
     """Retrieve all steps of a sequence for a given session.
     
@@ -31,13 +61,18 @@ def get_sequence_data(session_id: str):
     Note:
         Returns an empty list if no steps are found for the given session_id
     """
-    steps = SequenceStep.query.filter_by(session_id=session_id).order_by(SequenceStep.step_number).all()
-    return [{"step_number": step.step_number, "content": step.content} for step in steps]
+    return get_sequence(session_id)
+
+def emit_sequence_update(session_id: str, sequence_data: Optional[List[dict]] = None, version: Optional[int] = None):
+    """Send the session's room its new sequence (debounced; see SequenceBroadcaster).
 
-def emit_sequence_update(session_id: str):
-    steps = SequenceStep.query.filter_by(session_id=session_id).order_by(SequenceStep.step_number).all()
-    sequence_data = [{"step_number": s.step_number, "content": s.content} for s in steps]
-    socketio.emit("sequence_updated", {"session_id": session_id, "sequence": sequence_data})
+    Pass ``sequence_data`` and ``version`` when already known to skip reading them back.
+    """
+    if sequence_data is None:
+        sequence_data = get_sequence(session_id)
+    if version is None:
+        version = current_version(session_id)
+    sequence_broadcaster.notify(session_id, sequence_data, version)
 
 def validate_sequence_params(role: str, location: str) -> Optional[str]:
     """Validates the input parameters for sequence generation."""
@@ -55,15 +90,15 @@ def generate_sequence(role: str, location: str, session_id: str, step_count: Opt
         return f"{validation_error}"
 
     # Get user info from session
-    session = Session.query.get(session_id)
-    user_name = session.user.name if session and session.user else "the job seeker"
-    user_title = session.user.title if session and session.user else "professional"
+    user = get_session_user(session_id)
+    user_name = user.name if user else "the job seeker"
+    user_title = user.title if user else "professional"
 
     # Get professional details if profile_url is provided
     professional_context = ""
     if profile_url:
         try:
-            details = get_professional_details(profile_url)
+            details = lookup_professional_details(profile_url)
             professional_context = f"""
             Professional Details:
             - Profile: {profile_url}
@@ -109,8 +144,8 @@ Each message should be complete and self-contained. Make sure to:
         base_prompt = f"Generate a {step_count}-step outreach sequence for a job seeker interested in a {role} position in {location}.\n" + base_prompt
 
     try:
-        response = client.chat.completions.create(
-            model="gpt-4",
+        response = create_chat_completion(
+            route="long_form",
             messages=[
                 {
                     "role": "system",
@@ -118,7 +153,6 @@ Each message should be complete and self-contained. Make sure to:
                 },
                 {"role": "user", "content": base_prompt}
             ],
-            temperature=0.7,
             max_tokens=2000  # Ensure we get complete responses
         )
 
@@ -154,37 +188,14 @@ Each message should be complete and self-contained. Make sure to:
                 return f"Invalid content type: {type(step['content'])}. Expected str. Raw content:\n{content}"
 
         try:
-            # Delete existing steps
-            SequenceStep.query.filter_by(session_id=session_id).delete()
-            db.session.commit()
-
-            # Add new steps
-            for step in steps_json:
-                new_step = SequenceStep(
-                    session_id=session_id,
-                    step_number=step["step_number"],
-                    content=step["content"].strip()  # Ensure content is stripped
-                )
-                db.session.add(new_step)
-                print(f"Adding step {step['step_number']} for session {session_id}")
-
-            db.session.commit()
-            print(f"Successfully saved {len(steps_json)} steps for session {session_id}")
-
-            # Verify the steps were saved
-            saved_steps = SequenceStep.query.filter_by(session_id=session_id).order_by(SequenceStep.step_number).all()
-            print(f"Verified {len(saved_steps)} steps in database for session {session_id}")
-
-            if len(saved_steps) != len(steps_json):
-                print(f"Warning: Saved steps count ({len(saved_steps)}) doesn't match generated steps count ({len(steps_json)})")
-                db.session.rollback()
-                return "Error: Failed to save all steps correctly"
-
-            emit_sequence_update(session_id)
+            ordered = sorted(steps_json, key=lambda step: step["step_number"])
+            sequence = replace_sequence(session_id, [step["content"] for step in ordered], "generate_sequence")
+            print(f"Successfully saved {len(sequence)} steps for session {session_id}")
+
+            emit_sequence_update(session_id, sequence)
             return "Outreach sequence generated and saved successfully."
 
         except Exception as e:
-            db.session.rollback()
             print(f"Database error while saving sequence: {str(e)}")
             return f"Error saving sequence to database: {str(e)}"
 
@@ -193,49 +204,13 @@ Each message should be complete and self-contained. Make sure to:
         return f"Error generating sequence: {str(e)}"
 
 def get_user_context(session_id: str) -> str:
-    session = Session.query.get(session_id)
-    if not session or not session.user:
-        return ""
-    user = session.user
-    
-    # Extract job seeker preferences
-    prefs = user.preferences or {}
-    job_types = ", ".join(prefs.get("jobTypes", []) or ["Full-time"])
-    target_companies = ", ".join(prefs.get("targetCompanies", []) or [])
-    target_locations = ", ".join(prefs.get("targetLocations", []) or [])
-    years_experience = prefs.get("yearsExperience", 0)
-    skills = ", ".join(prefs.get("skills", []) or [])
-    job_level = prefs.get("jobLevel", "")
-    
-    context = f"""
-The messages should be written from {user.name}'s perspective as a {user.title} in the {user.industry} industry.
-"""
-
-    if user.company:
-        context += f"Their current or previous company is {user.company}.\n"
-    
-    if years_experience:
-        context += f"They have {years_experience} years of experience.\n"
-    
-    if skills:
-        context += f"Their key skills include: {skills}.\n"
-    
-    if job_level:
-        context += f"They are looking for {job_level}-level positions.\n"
-    
-    if job_types:
-        context += f"They are interested in {job_types} roles.\n"
-    
-    if target_locations:
-        context += f"Their preferred locations are: {target_locations}.\n"
-    
-    if target_companies:
-        context += f"Their target companies include: {target_companies}.\n"
-    
-    return context
+    """Profile paragraph for tool prompts, memoized per user (empty if the session has no user)."""
+    context = user_contexts.for_session(session_id)
+    return context.prompt_text if context else ""
 
-def revise_step(session_id: str, step_number: int, new_instruction: str) -> str:
-    step = SequenceStep.query.filter_by(session_id=session_id, step_number=step_number).first()
+def revise_step(session_id: str, step_number: int, new_instruction: str, fresh: bool = False) -> str:
+    sequence = get_sequence(session_id)
+    step = next((s for s in sequence if s["step_number"] == step_number), None)
     if not step:
         return f"Step {step_number} not found."
 
@@ -243,44 +218,98 @@ def revise_step(session_id: str, step_number: int, new_instruction: str) -> str:
     prompt = f"""Rewrite this message to reflect the following instruction:
 {user_context}
 Instruction: {new_instruction}
-Original message: {step.content}
+Original message: {step['content']}
 Rewritten message:"""
 
-    response = client.chat.completions.create(
-        model="gpt-4",
+    response = create_chat_completion(
+        route="rewrite",
         messages=[{ "role": "user", "content": prompt }],
-        temperature=0.7
+        cache=not fresh
     )
 
-    step.content = response.choices[0].message.content.strip()
-    db.session.commit()
-    emit_sequence_update(session_id)
+    step["content"] = response.choices[0].message.content
+    sequence = replace_sequence(session_id, [s["content"] for s in sequence], "revise_step")
+    emit_sequence_update(session_id, sequence)
     return f"Step {step_number} revised."
 
-def change_tone(session_id: str, tone: str) -> str:
-    steps = SequenceStep.query.filter_by(session_id=session_id).order_by(SequenceStep.step_number).all()
+def _rewrite_with_tone(content: str, tone: str, user_context: str, fresh: bool = False) -> str:
+    """Rewrite a single step in the requested tone.
+
+    Runs on a worker thread, so it only deals with plain strings and never
+    touches the database session.
+    """
+    prompt = f"""Rewrite the following message to be more {tone}:
+{user_context}
+Original message: {content}
+Rewritten message:"""
+    response = create_chat_completion(
+        route="rewrite",
+        messages=[{ "role": "user", "content": prompt }],
+        deadline=TONE_STEP_TIMEOUT,
+        cache=not fresh
+    )
+    return response.choices[0].message.content.strip()
+
+def change_tone(session_id: str, tone: str, fresh: bool = False) -> str:
+    """Rewrite every step of a session's sequence in a new tone.
+
+    All steps are rewritten concurrently (at most ``TONE_MAX_WORKERS`` at a time,
+    each bounded by ``TONE_STEP_TIMEOUT`` seconds) and the results are saved
+    with a single :func:`replace_sequence` once every rewrite has finished. A step whose rewrite
+    fails or times out keeps its original content.
+
+    Args:
+        session_id (str): The unique identifier of the chat session
+        tone (str): Tone to apply (e.g. casual, bold, personal)
+        fresh (bool): Ask the model again instead of reusing an earlier rewrite
+            of the same step in the same tone
+
+    Returns:
+        str: A short status message describing the outcome
+    """
+    steps = get_sequence(session_id)
     if not steps:
         return "No steps found for this session."
 
     user_context = get_user_context(session_id)
-    for step in steps:
-        prompt = f"""Rewrite the following message to be more {tone}:
-{user_context}
-Original message: {step.content}
-Rewritten message:"""
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[{ "role": "user", "content": prompt }],
-            temperature=0.7
-        )
-        step.content = response.choices[0].message.content.strip()
+    max_workers = max(1, min(TONE_MAX_WORKERS, len(steps)))
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {
+            executor.submit(_rewrite_with_tone, step["content"], tone, user_context, fresh): step
+            for step in steps
+        }
+        # Queued steps only start once a worker frees up, so allow one timeout per batch.
+        batches = -(-len(steps) // max_workers)
+        wait(futures, timeout=TONE_STEP_TIMEOUT * batches)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    failed_steps = []
+    for future, step in futures.items():
+        if not future.done() or future.cancelled():
+            print(f"Tone rewrite timed out for step {step['step_number']}")
+            failed_steps.append(step["step_number"])
+            continue
+        try:
+            step["content"] = future.result()
+        except Exception as e:
+            print(f"Error rewriting step {step['step_number']}: {str(e)}")
+            failed_steps.append(step["step_number"])
+
+    if len(failed_steps) == len(steps):
+        return f"Could not change the tone to {tone}; the sequence was left unchanged."
+
+    sequence = replace_sequence(session_id, [step["content"] for step in steps], "change_tone")
+    emit_sequence_update(session_id, sequence)
 
-    db.session.commit()
-    emit_sequence_update(session_id)
+    if failed_steps:
+        kept = ", ".join(str(n) for n in sorted(failed_steps))
+        return f"Steps updated to have a more {tone} tone, except step(s) {kept} which kept their original wording."
     return f"All steps updated to have a more {tone} tone."
 
-def add_step(session_id: str, step_content: str, position: Optional[int] = None) -> str:
-    steps = SequenceStep.query.filter_by(session_id=session_id).order_by(SequenceStep.step_number).all()
+def add_step(session_id: str, step_content: str, position: Optional[int] = None, fresh: bool = False) -> str:
+    steps = get_sequence(session_id)
 
     if position is None or position > len(steps):
         position = len(steps) + 1
@@ -292,33 +321,22 @@ def add_step(session_id: str, step_content: str, position: Optional[int] = None)
 Original content: {step_content}
 New message:"""
 
-    response = client.chat.completions.create(
-        model="gpt-4",
+    response = create_chat_completion(
+        route="rewrite",
         messages=[{ "role": "user", "content": prompt }],
-        temperature=0.7
+        cache=not fresh
     )
 
-    new_content = response.choices[0].message.content.strip()
+    new_content = response.choices[0].message.content
 
-    # Shift step numbers at and after the insertion point
-    for step in steps:
-        if step.step_number >= position:
-            step.step_number += 1
-
-    # Add the new step
-    new_step = SequenceStep(session_id=session_id, step_number=position, content=new_content)
-    db.session.add(new_step)
-
-    # Reorder everything to ensure consistent step numbering
-    all_steps = sorted(steps + [new_step], key=lambda s: s.step_number)
-    for idx, step in enumerate(all_steps, start=1):
-        step.step_number = idx
-
-    db.session.commit()
-    emit_sequence_update(session_id)
+    # Insert the new step; everything from the insertion point on moves down one
+    contents = [step["content"] for step in steps]
+    contents.insert(max(position, 1) - 1, new_content)
+    sequence = replace_sequence(session_id, contents, "add_step")
+    emit_sequence_update(session_id, sequence)
     return f"New step added at position {position}."
 
-def generate_networking_asset(task: str, session_id: str):
+def generate_networking_asset(task: str, session_id: str, fresh: bool = False):
     user_context = get_user_context(session_id)
     prompt = f"""
 You're a job search assistant. Based on the following instruction, generate a fully formatted message (email, letter, follow-up, etc).
@@ -328,32 +346,51 @@ Task: {task}
 Format the result as if it will be sent to a potential employer, hiring manager, or networking contact.
 """
 
-    response = client.chat.completions.create(
-        model="gpt-4",
+    response = create_chat_completion(
+        route="long_form",
         messages=[{ "role": "user", "content": prompt }],
-        temperature=0.7
+        cache=not fresh
     )
 
-    content = response.choices[0].message.content.strip()
+    content = response.choices[0].message.content
 
     # Store it as a single step
-    SequenceStep.query.filter_by(session_id=session_id).delete()
-    db.session.add(SequenceStep(session_id=session_id, step_number=1, content=content))
-    db.session.commit()
-    emit_sequence_update(session_id)
+    sequence = replace_sequence(session_id, [content], "generate_networking_asset")
+    emit_sequence_update(session_id, sequence)
 
     return "Networking asset generated successfully."
 
+def undo_sequence_change(session_id: str) -> str:
+    """Restore the sequence as it was before the last change, without calling the model."""
+    restored = undo_sequence(session_id)
+    if restored is None:
+        return "There is no earlier version of the sequence to go back to."
+    emit_sequence_update(session_id, restored["sequence"], restored["version"])
+    return f"Sequence restored to version {restored['version']}."
+
+def redo_sequence_change(session_id: str) -> str:
+    """Re-apply the change that was last undone, without calling the model."""
+    restored = redo_sequence(session_id)
+    if restored is None:
+        return "There is no undone change to re-apply."
+    emit_sequence_update(session_id, restored["sequence"], restored["version"])
+    return f"Sequence restored to version {restored['version']}."
+
 def search_and_analyze_professionals(
     session_id: str,
     query: str,
     location: Optional[str] = None,
     years_experience: Optional[int] = None,
     skills: Optional[List[str]] = None,
-    current_company: Optional[str] = None
+    current_company: Optional[str] = None,
+    fan_out: bool = True
 ) -> str:
     """
     Search for potential employers and networking contacts based on role and location.
+
+    With ``fan_out``, several result pages and rephrasings of the query are
+    searched at once and merged; each batch of new profiles is pushed to the
+    session room as a ``search_results`` event as it arrives.
     
     Args:
         session_id (str): The session ID
@@ -362,6 +399,7 @@ def search_and_analyze_professionals(
         years_experience (Optional[int]): Minimum years of experience
         skills (Optional[List[str]]): List of relevant skills
         current_company (Optional[str]): Target company name
+        fan_out (bool): Search broadly in one round trip; False for a single page
     
     Returns:
         str: Formatted results with professional profiles
@@ -370,25 +408,70 @@ def search_and_analyze_professionals(
         # Get user context for personalization
         user_context = get_user_context(session_id)
         
-        # Search for professionals
-        results = search_professionals(
-            query=query,
-            location=location,
-            years_experience=years_experience,
-            skills=skills,
-            current_company=current_company
-        )
+        found = []
+
+        def push_results(professionals):
+            found.extend(professionals)
+            socketio.emit("search_results", {
+                "session_id": session_id,
+                "professionals": professionals,
+                "found": len(found)
+            }, to=session_room(session_id))
+
+        # Answer from the local profile store when it knows enough matches
+        search_terms = " ".join(term for term in (query, location, current_company) if term)
+        stored = search_stored_profiles(search_terms, limit=SEARCH_FANOUT_LIMIT)
+        if len(stored) >= PROFILE_LOCAL_MIN_RESULTS:
+            logger.info(f"Answered search from {len(stored)} stored profiles: {search_terms}")
+            professionals = _with_search_fields(stored, years_experience, skills)
+            push_results(professionals)
+            results = {"query": query, "professionals": professionals, "total_found": len(professionals)}
+        else:
+            # Search for professionals
+            results = search_professionals(
+                query=query,
+                location=location,
+                years_experience=years_experience,
+                skills=skills,
+                current_company=current_company,
+                fan_out=fan_out,
+                on_results=push_results
+            )
+            store_profiles(
+                [{**prof, "url": normalize_profile_url(prof["link"])} for prof in results["professionals"]],
+                search_terms
+            )
+            # Add stored matches the network search did not return
+            seen = {normalize_profile_url(prof["link"]) for prof in results["professionals"]}
+            extra = [prof for prof in stored if normalize_profile_url(prof["link"]) not in seen]
+            if extra:
+                extra = _with_search_fields(extra, years_experience, skills)
+                push_results(extra)
+                results = {**results, "professionals": results["professionals"] + extra}
+                results["total_found"] = len(results["professionals"])
         
         if not results["professionals"]:
             return f"I couldn't find any professionals matching your criteria for '{query}' in {location or 'any location'}. Would you like to try different search criteria?"
         
+        # One entry per person, ranked against the user's preferences and this search's criteria
+        professionals = merge_duplicates(results["professionals"])
+        preferences = _ranking_preferences(session_id, location, skills, current_company)
+        ranked = rank_professionals(professionals, preferences, limit=SEARCH_RESULTS_SHOWN)
+        total_found = len(professionals)
+
+        last_searches.set(session_id, [
+            {"name": prof["name"], "link": prof["link"]} for prof in ranked
+        ])
+
         # Format the results
-        response = f"I found {results['total_found']} potential contacts matching your search for '{query}'"
+        response = f"I found {total_found} potential contacts matching your search for '{query}'"
         if location:
             response += f" in {location}"
+        if len(ranked) < total_found:
+            response += f". Here are the {len(ranked)} best matches"
         response += ":\n\n"
         
-        for i, prof in enumerate(results["professionals"], 1):
+        for i, prof in enumerate(ranked, 1):
             response += f"{i}. {prof['name']}\n"
             
             # Add current position if available
@@ -417,28 +500,79 @@ def search_and_analyze_professionals(
         logger.error(f"Error in search_and_analyze_professionals: {str(e)}", exc_info=True)
         return f"An error occurred while searching for professionals: {str(e)}"
 
-def generate_personalized_outreach(profile_url: str, session_id: str) -> str:
-    """
-    Generate a personalized outreach message for a specific professional based on their profile.
-    
-    Args:
-        profile_url (str): URL of the professional's profile
-        session_id (str): The current session ID
-    
+def _ranking_preferences(
+    session_id: str,
+    location: Optional[str],
+    skills: Optional[List[str]],
+    current_company: Optional[str]
+) -> Dict[str, Any]:
+    """The user's preferences, plus the locations, skills and company this search asked for."""
+    context = user_contexts.for_session(session_id)
+    preferences = dict(context.preferences) if context else {}
+    for key, value in (("targetLocations", [location]), ("skills", skills), ("targetCompanies", [current_company])):
+        extra = [item for item in value or [] if item]
+        if extra:
+            preferences[key] = list(preferences.get(key) or []) + extra
+    return preferences
+
+def _with_search_fields(
+    professionals: List[Dict[str, Any]],
+    years_experience: Optional[int],
+    skills: Optional[List[str]]
+) -> List[Dict[str, Any]]:
+    """Stored professionals with the fields ``search_professionals`` adds for this search."""
+    if not years_experience and not skills:
+        return professionals
+    fields = extract_profile_fields_batch(
+        [prof["snippet"] for prof in professionals], skills, with_years=bool(years_experience)
+    )
+    results = []
+    for prof, extracted in zip(professionals, fields):
+        prof = dict(prof)
+        if years_experience:
+            prof["years_experience"] = extracted["years_experience"]
+        if skills:
+            prof["matched_skills"] = extracted["matched_skills"]
+        results.append(prof)
+    return results
+
+def lookup_professional_details(profile_url: str) -> Dict[str, Any]:
+    """Profile details from the local store, or looked up and stored."""
+    url = normalize_profile_url(profile_url)
+    details = get_stored_details(url)
+    if details is None:
+        details = get_professional_details(profile_url)
+        store_details(url, details)
+    return details
+
+def _outreach_sender(session_id: str) -> Tuple[str, str]:
+    """Name and title the outreach is written from."""
+    user = get_session_user(session_id)
+    user_name = user.name if user else "the job seeker"
+    user_title = user.title if user else "professional"
+    return user_name, user_title
+
+def _draft_outreach(
+    profile_url: str,
+    user_name: str,
+    user_title: str,
+    deadline: Optional[float] = None,
+    details: Optional[Dict[str, Any]] = None
+) -> Tuple[str, Dict[str, Any]]:
+    """Write the outreach message for a profile, looking it up unless ``details`` are given.
+
+    Runs on worker threads for batch outreach, so it never touches the
+    database; callers load and store the details.
+
     Returns:
-        str: A personalized outreach message
+        Tuple[str, Dict[str, Any]]: The message and the profile details it used
     """
-    try:
-        # Get professional details
+    # Get professional details
+    if details is None:
         details = get_professional_details(profile_url)
-        
-        # Get user context
-        session = Session.query.get(session_id)
-        user_name = session.user.name if session and session.user else "the job seeker"
-        user_title = session.user.title if session and session.user else "professional"
-        
-        # Generate personalized message using OpenAI
-        prompt = f"""
+
+    # Generate personalized message using OpenAI
+    prompt = f"""
         Generate a personalized outreach message for a professional based on their profile:
         Profile URL: {profile_url}
         Profile Content: {details['content']}
@@ -451,22 +585,131 @@ def generate_personalized_outreach(profile_url: str, session_id: str) -> str:
         
         Format the message in a professional but conversational tone.
         """
-        
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are an expert recruiter crafting personalized outreach messages."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=500
-        )
-        
-        return response.choices[0].message.content
+
+    response = create_chat_completion(
+        route="long_form",
+        messages=[
+            {"role": "system", "content": "You are an expert recruiter crafting personalized outreach messages."},
+            {"role": "user", "content": prompt}
+        ],
+        max_tokens=500,
+        deadline=deadline
+    )
+    return response.choices[0].message.content, details
+
+def generate_personalized_outreach(profile_url: str, session_id: str) -> str:
+    """
+    Generate a personalized outreach message for a specific professional based on their profile.
+    
+    Args:
+        profile_url (str): URL of the professional's profile
+        session_id (str): The current session ID
+    
+    Returns:
+        str: A personalized outreach message
+    """
+    try:
+        user_name, user_title = _outreach_sender(session_id)
+        draft, _ = _draft_outreach(profile_url, user_name, user_title, details=lookup_professional_details(profile_url))
+        return draft
         
     except Exception as e:
         return f"An error occurred while generating the outreach message: {str(e)}"
 
+def generate_batch_outreach(
+    session_id: str,
+    profile_urls: Optional[List[str]] = None,
+    result_numbers: Optional[List[int]] = None
+) -> str:
+    """Draft personalized outreach for several professionals at once.
+
+    Targets are the given profile URLs or, without them, the session's latest
+    ``search_and_analyze_professionals`` results (optionally just the
+    1-based ``result_numbers``), capped at ``OUTREACH_BATCH_LIMIT``. Profiles
+    are looked up and drafted concurrently on up to ``OUTREACH_MAX_WORKERS``
+    threads. Each draft is pushed to the session room as an
+    ``outreach_draft`` event as soon as it is ready.
+
+    Args:
+        session_id (str): The current session ID
+        profile_urls (Optional[List[str]]): Profiles to write to
+        result_numbers (Optional[List[int]]): Which results of the last search to use
+
+    Returns:
+        str: Every draft, in target order, plus any that failed
+    """
+    if profile_urls:
+        targets = [{"name": None, "link": url} for url in profile_urls]
+    else:
+        found = last_searches.get(session_id) or []
+        if not found:
+            return "There is no recent search to draft outreach for. Search for professionals first or give me their profile URLs."
+        if result_numbers:
+            targets = [found[number - 1] for number in result_numbers if 1 <= number <= len(found)]
+        else:
+            targets = found
+
+    # Drop repeated profiles, keeping the first mention
+    unique = {}
+    for target in targets:
+        unique.setdefault(target["link"], target)
+    targets = list(unique.values())[:OUTREACH_BATCH_LIMIT]
+    if not targets:
+        return "None of those result numbers are in the last search."
+
+    user_name, user_title = _outreach_sender(session_id)
+    stored = [get_stored_details(normalize_profile_url(target["link"])) for target in targets]
+    outcomes = [None] * len(targets)
+    max_workers = max(1, min(OUTREACH_MAX_WORKERS, len(targets)))
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {
+            executor.submit(_draft_outreach, target["link"], user_name, user_title, OUTREACH_DRAFT_TIMEOUT, stored[index]): index
+            for index, target in enumerate(targets)
+        }
+        # Queued drafts only start once a worker frees up, so allow one timeout per batch.
+        batches = -(-len(targets) // max_workers)
+        completed = 0
+        for future in as_completed(futures, timeout=OUTREACH_DRAFT_TIMEOUT * batches):
+            index = futures[future]
+            try:
+                draft, details = future.result()
+                outcomes[index] = {"draft": draft}
+                if stored[index] is None:
+                    store_details(normalize_profile_url(targets[index]["link"]), details)
+            except Exception as e:
+                print(f"Error drafting outreach for {targets[index]['link']}: {str(e)}")
+                outcomes[index] = {"error": str(e)}
+            completed += 1
+            socketio.emit("outreach_draft", {
+                "session_id": session_id,
+                "index": index,
+                "name": targets[index]["name"],
+                "profile_url": targets[index]["link"],
+                "completed": completed,
+                "total": len(targets),
+                **outcomes[index]
+            }, to=session_room(session_id))
+    except TimeoutError:
+        print(f"Batch outreach timed out for session_id: {session_id}")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    drafts, failed = [], []
+    for target, outcome in zip(targets, outcomes):
+        label = target["name"] or target["link"]
+        if outcome and "draft" in outcome:
+            drafts.append(f"{len(drafts) + 1}. {label} ({target['link']})\n{outcome['draft'].strip()}")
+        else:
+            failed.append(label)
+
+    if not drafts:
+        return "Could not draft outreach for any of those professionals. Want me to try again?"
+    response = f"Outreach drafted for {len(drafts)} of {len(targets)} professionals:\n\n" + "\n\n".join(drafts)
+    if failed:
+        response += f"\n\nCould not draft messages for: {', '.join(failed)}."
+    return response
+
 tool_definitions = [
     {
         "type": "function",
@@ -496,6 +739,7 @@ tool_definitions = [
                 "properties": {
                     "step_number": {"type": "integer", "description": "Step number to revise"},
                     "new_instruction": {"type": "string", "description": "How to revise this step"},
+                    "fresh": {"type": "boolean", "description": "True if the user wants a new variation rather than repeating an earlier result"},
                     "session_id": {"type": "string", "description": "The session ID as a string UUID"}
                 },
                 "required": ["step_number", "new_instruction", "session_id"]
@@ -511,6 +755,7 @@ tool_definitions = [
                 "type": "object",
                 "properties": {
                     "tone": {"type": "string", "description": "Tone to apply (e.g. personal, bold, casual)"},
+                    "fresh": {"type": "boolean", "description": "True if the user wants a new variation rather than repeating an earlier result"},
                     "session_id": {"type": "string", "description": "The session ID as a string UUID"}
                 },
                 "required": ["tone", "session_id"]
@@ -527,6 +772,7 @@ tool_definitions = [
                 "properties": {
                     "step_content": {"type": "string", "description": "Content of the new step"},
                     "position": {"type": "integer", "description": "Position to insert the step"},
+                    "fresh": {"type": "boolean", "description": "True if the user wants a new variation rather than repeating an earlier result"},
                     "session_id": {"type": "string", "description": "The session ID as a string UUID"}
                 },
                 "required": ["step_content", "session_id"]
@@ -542,12 +788,41 @@ tool_definitions = [
                 "type": "object",
                 "properties": {
                     "task": {"type": "string", "description": "Instruction like 'Write a thank you email after the interview with Google'"},
+                    "fresh": {"type": "boolean", "description": "True if the user wants a new variation rather than repeating an earlier result"},
                     "session_id": {"type": "string", "description": "The session ID as a string UUID"}
                 },
                 "required": ["task", "session_id"]
             }
         }
     },
+    {
+        "type": "function",
+        "function": {
+            "name": "undo_sequence_change",
+            "description": "Reverts the sequence to how it was before the last change (undo)",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "session_id": {"type": "string", "description": "The session ID as a string UUID"}
+                },
+                "required": ["session_id"]
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "redo_sequence_change",
+            "description": "Re-applies the last change that was undone (redo)",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "session_id": {"type": "string", "description": "The session ID as a string UUID"}
+                },
+                "required": ["session_id"]
+            }
+        }
+    },
     {
         "type": "function",
         "function": {
@@ -561,7 +836,8 @@ tool_definitions = [
                     "location": {"type": "string", "description": "Optional. Location to search in (e.g., 'San Francisco')"},
                     "years_experience": {"type": "integer", "description": "Optional. Minimum years of experience"},
                     "skills": {"type": "array", "items": {"type": "string"}, "description": "Optional. List of relevant skills"},
-                    "current_company": {"type": "string", "description": "Optional. Target company name"}
+                    "current_company": {"type": "string", "description": "Optional. Target company name"},
+                    "fan_out": {"type": "boolean", "description": "Optional. Defaults to true (several pages and rephrasings at once); false for a quick single-page search"}
                 },
                 "required": ["session_id", "query"]
             }
@@ -581,5 +857,21 @@ tool_definitions = [
                 "required": ["session_id", "profile_url"]
             }
         }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "generate_batch_outreach",
+            "description": "Generates personalized outreach messages for several professionals at once, either the given profiles or the results of the last professional search",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "session_id": {"type": "string", "description": "The session ID as a string UUID"},
+                    "profile_urls": {"type": "array", "items": {"type": "string"}, "description": "Optional. Profile URLs to write to; omit to use the last search results"},
+                    "result_numbers": {"type": "array", "items": {"type": "integer"}, "description": "Optional. Which results of the last search to write to (1-based), e.g. [1, 3]; omit for all"}
+                },
+                "required": ["session_id"]
+            }
+        }
     }
 ]
\ No newline at end of file
@@ -0,0 +1,166 @@
+"""Field extraction from search result snippets.
+
+Every pattern is compiled once at import. Keyword matching (skills,
+exclusion terms) checks a handful of keywords with substring scans of the
+lowercased snippet; larger sets tokenize the snippet once and look every
+token up in a prebuilt index, so the cost per snippet does not grow with the
+number of keywords. The batch functions take whole result sets at a time.
+"""
+import os
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Words as keywords and snippets are split into; keeps "c++", "c#", "node.js" and "front-end" whole
+WORD_PATTERN = re.compile(r"[a-z0-9+#]+(?:[.\-][a-z0-9+#]+)*")
+# Where a WORD_PATTERN word starts ({0} is the word, checked after it so the
+# regex engine can search for the literal) and ends, and what separates the words of a phrase
+WORD_START = r"(?<![a-z0-9+#]{0})(?<![a-z0-9+#][.\-]{0})"
+WORD_END = r"(?![a-z0-9+#])(?![.\-][a-z0-9+#])"
+WORD_SEPARATOR = r"(?:[^a-z0-9+#]{2,}|[^a-z0-9+#.\-])"
+# Up to this many keywords, scanning the text for each beats tokenizing it
+KEYWORD_SCAN_MAX = int(os.getenv("KEYWORD_SCAN_MAX", "40"))
+YEARS_EXPERIENCE_PATTERN = re.compile(r"(\d+)\+?\s*(?:year|yr)s?\s*(?:of\s*)?experience")
+# A line that states where someone works now, e.g. "Engineering Manager at Stripe"
+CURRENT_POSITION_PATTERN = re.compile(r"\b(?:at|currently|presently)\s", re.IGNORECASE)
+
+# Snippets mentioning these are job listings or careers pages, not people
+EXCLUDED_TERMS = ["job", "jobs", "career", "careers", "hiring", "apply now"]
+
+def tokenize(text: str) -> List[str]:
+    return WORD_PATTERN.findall(text.lower())
+
+def _keyword_pattern(words: Sequence[str]) -> re.Pattern:
+    """Whole-word pattern for a keyword already split into ``words``."""
+    escaped = [re.escape(word) for word in words]
+    return re.compile(escaped[0] + WORD_START.format(escaped[0]) + WORD_SEPARATOR.join([""] + escaped[1:]) + WORD_END)
+
+class KeywordMatcher:
+    """Finds which of a fixed set of keywords (words or phrases) occur in a text.
+
+    Matching is case-insensitive and on whole words, so "Go" does not match
+    "Google". Single-word keywords are found with one set intersection over
+    the tokens; phrases are indexed by their first word and only compared
+    where that word occurs. The cost depends on the text, not on how many
+    keywords there are.
+
+    Tokenizing is most of that cost, so for up to ``KEYWORD_SCAN_MAX``
+    keywords :meth:`find_in_lowered` skips it: each keyword's longest word is
+    looked for with a substring check, and only texts containing it run the
+    keyword's whole-word pattern.
+
+    Args:
+        keywords (Iterable[str]): Keywords in the order results are reported
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = []
+        self._words: Dict[str, str] = {}
+        self._phrases: Dict[str, List[Tuple[Tuple[str, ...], str]]] = {}
+        split = []
+        for keyword in keywords:
+            words = tuple(tokenize(keyword))
+            if not words or keyword in self.keywords:
+                continue
+            self.keywords.append(keyword)
+            split.append((keyword, words))
+            if len(words) == 1:
+                self._words.setdefault(words[0], keyword)
+            else:
+                self._phrases.setdefault(words[0], []).append((words, keyword))
+        self._word_set = frozenset(self._words)
+        self._phrase_starts = frozenset(self._phrases)
+        # (longest word, whole-word pattern, keyword) per keyword, when the set is small enough to scan for
+        self.scans = len(self.keywords) <= KEYWORD_SCAN_MAX
+        self._scans = [(max(words, key=len), _keyword_pattern(words), keyword) for keyword, words in split] if self.scans else []
+
+    def find_in_tokens(self, tokens: Sequence[str]) -> List[str]:
+        """Keywords present in already tokenized text, in keyword order."""
+        found = {self._words[word] for word in self._word_set.intersection(tokens)}
+        if not self._phrase_starts.isdisjoint(tokens):
+            for index, token in enumerate(tokens):
+                for phrase, keyword in self._phrases.get(token, ()):
+                    if tuple(tokens[index:index + len(phrase)]) == phrase:
+                        found.add(keyword)
+        if not found:
+            return []
+        return [keyword for keyword in self.keywords if keyword in found]
+
+    def find_in_lowered(self, lowered: str, tokens: Optional[Sequence[str]] = None) -> List[str]:
+        """Keywords present in lowercased text; ``tokens`` are its words, if already split."""
+        if not self.scans:
+            return self.find_in_tokens(WORD_PATTERN.findall(lowered) if tokens is None else tokens)
+        return [keyword for needle, pattern, keyword in self._scans if needle in lowered and pattern.search(lowered)]
+
+    def find(self, text: str) -> List[str]:
+        return self.find_in_lowered(text.lower())
+
+    def find_batch(self, texts: Iterable[str]) -> List[List[str]]:
+        return [self.find_in_lowered(text.lower()) for text in texts]
+
+    def contains_any(self, text: str) -> bool:
+        return bool(self.find(text))
+
+excluded_terms = KeywordMatcher(EXCLUDED_TERMS)
+
+def extract_current_position(snippet: str) -> str:
+    """The first line of the snippet that says where the person works now, or ""."""
+    for line in snippet.split("\n"):
+        if CURRENT_POSITION_PATTERN.search(line):
+            return line.strip()
+    return ""
+
+def extract_years_experience(snippet: str) -> Optional[int]:
+    """Years of experience stated in the snippet (e.g. "8+ years of experience"), if any."""
+    return _years_experience(snippet.lower())
+
+def _years_experience(lowered: str) -> Optional[int]:
+    # Most snippets never say "experience"; skip the regex scan for them
+    if "experience" not in lowered:
+        return None
+    match = YEARS_EXPERIENCE_PATTERN.search(lowered)
+    return int(match.group(1)) if match else None
+
+@lru_cache(maxsize=256)
+def skill_matcher(skills: Tuple[str, ...]) -> KeywordMatcher:
+    """Matcher for a search's skills, reused across searches for the same skills."""
+    return KeywordMatcher(skills)
+
+def extract_profile_fields(snippet: str, skills: Optional[Sequence[str]] = None, with_years: bool = False) -> Dict:
+    """Everything the search needs from one snippet (see :func:`extract_profile_fields_batch`)."""
+    return extract_profile_fields_batch([snippet], skills, with_years)[0]
+
+def extract_profile_fields_batch(
+    snippets: Iterable[str],
+    skills: Optional[Sequence[str]] = None,
+    with_years: bool = False
+) -> List[Dict]:
+    """Extract the profile fields of many snippets at once.
+
+    Each snippet is lowercased once. Long skill lists tokenize it once too,
+    and the tokens serve both the exclusion check and skill matching.
+
+    Args:
+        snippets (Iterable[str]): Result snippets
+        skills (Optional[Sequence[str]]): Skills to look for; adds ``matched_skills``
+        with_years (bool): Adds ``years_experience``
+
+    Returns:
+        List[Dict]: Per snippet: ``excluded`` (a job listing rather than a
+        person), ``current_position`` and the optional fields above
+    """
+    matcher = skill_matcher(tuple(skills)) if skills else None
+    results = []
+    for snippet in snippets:
+        lowered = snippet.lower()
+        tokens = WORD_PATTERN.findall(lowered) if matcher is not None and not matcher.scans else None
+        fields = {
+            "excluded": bool(excluded_terms.find_in_lowered(lowered, tokens)),
+            "current_position": extract_current_position(snippet)
+        }
+        if with_years:
+            fields["years_experience"] = _years_experience(lowered)
+        if matcher is not None:
+            fields["matched_skills"] = matcher.find_in_lowered(lowered, tokens)
+        results.append(fields)
+    return results
@@ -0,0 +1,130 @@
+"""Deduplication and relevance ranking of professional search results.
+
+Results arrive in search-engine order and may list one person several
+times under different URLs (locale subdomains, trailing slashes, tracking
+parameters). :func:`merge_duplicates` folds them into one entry per
+canonical profile URL, and :class:`PreferenceScorer` scores every result
+against the job seeker's preferences so the best matches come first.
+"""
+import heapq
+import re
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import unquote, urlsplit
+from .extraction import KeywordMatcher, tokenize
+
+# LinkedIn serves the same profile from www., m. and country subdomains (uk., de., ...)
+LINKEDIN_HOST_PATTERN = re.compile(r"^(?:(?:m|[a-z]{2,3})\.)?linkedin\.com$")
+LINKEDIN_PROFILE_PATTERN = re.compile(r"^/in/([^/]+)")
+
+# How much each preference contributes to a profile's relevance
+RANKING_WEIGHTS = {"skills": 3.0, "companies": 2.0, "locations": 1.5, "level": 1.0}
+# Weight of the search engine's own order, so it still breaks ties between equal matches
+SEARCH_ORDER_WEIGHT = 0.5
+
+# Words in a title that place someone at the job seeker's target level
+JOB_LEVEL_TERMS = {
+    "entry": ["junior", "associate", "entry level", "graduate", "intern"],
+    "junior": ["junior", "associate", "entry level", "graduate"],
+    "mid": ["engineer", "developer", "specialist", "analyst", "ii"],
+    "senior": ["senior", "sr", "staff", "principal", "lead"],
+    "lead": ["lead", "staff", "principal", "manager"],
+    "manager": ["manager", "head", "lead"],
+    "director": ["director", "head", "vp", "vice president"],
+    "executive": ["vp", "vice president", "chief", "cto", "ceo", "founder", "head"],
+}
+
+def canonical_profile_url(profile_url: str) -> str:
+    """One URL per profile: https, www host, lowercase slug, no query, fragment or trailing slash.
+
+    Non-LinkedIn URLs only get the scheme, case, query and trailing slash normalised.
+    """
+    parts = urlsplit(profile_url.strip())
+    host = parts.netloc.lower()
+    path = unquote(parts.path).rstrip("/")
+    if LINKEDIN_HOST_PATTERN.match(host.removeprefix("www.")):
+        host = "www.linkedin.com"
+        match = LINKEDIN_PROFILE_PATTERN.match(path)
+        if match:
+            path = f"/in/{match.group(1).lower()}"
+    return f"https://{host}{path}" if host else path
+
+def merge_duplicates(professionals: Iterable[Dict]) -> List[Dict]:
+    """One entry per canonical profile URL, in order of first appearance.
+
+    The first occurrence wins; later duplicates only fill in what it lacks
+    (a longer snippet, a current position, more matched skills).
+    """
+    merged: Dict[str, Dict] = {}
+    for prof in professionals:
+        url = canonical_profile_url(prof["link"])
+        existing = merged.get(url)
+        if existing is None:
+            merged[url] = {**prof, "link": url}
+            continue
+        if len(prof.get("snippet") or "") > len(existing.get("snippet") or ""):
+            existing["snippet"] = prof["snippet"]
+        if not existing.get("current_position") and prof.get("current_position"):
+            existing["current_position"] = prof["current_position"]
+        if prof.get("matched_skills"):
+            skills = existing.setdefault("matched_skills", [])
+            skills += [skill for skill in prof["matched_skills"] if skill not in skills]
+        if existing.get("years_experience") is None and prof.get("years_experience") is not None:
+            existing["years_experience"] = prof["years_experience"]
+    return list(merged.values())
+
+class PreferenceScorer:
+    """Scores professionals against a job seeker's preferences.
+
+    Every preference list becomes a :class:`KeywordMatcher` once, when the
+    scorer is built; each profile is then tokenized once and all matchers
+    run over the same tokens, so scoring a batch costs one pass per profile
+    however many skills or companies the user listed.
+
+    Args:
+        preferences (dict): ``User.preferences`` (skills, targetCompanies,
+            targetLocations, jobLevel)
+    """
+
+    def __init__(self, preferences: Optional[dict] = None):
+        preferences = preferences or {}
+        self.skills = KeywordMatcher(preferences.get("skills") or [])
+        self.companies = KeywordMatcher(preferences.get("targetCompanies") or [])
+        self.locations = KeywordMatcher(preferences.get("targetLocations") or [])
+        level = (preferences.get("jobLevel") or "").strip().lower()
+        self.level = KeywordMatcher(JOB_LEVEL_TERMS.get(level, [level] if level else []))
+
+    def score(self, professional: Dict) -> float:
+        return self.score_batch([professional])[0]
+
+    def score_batch(self, professionals: List[Dict]) -> List[float]:
+        """Relevance of each professional; results earlier in search order get a small bonus."""
+        count = len(professionals)
+        scores = []
+        for index, prof in enumerate(professionals):
+            position = tokenize(prof.get("current_position") or "")
+            text = position + tokenize(f"{prof.get('name') or ''} {prof.get('snippet') or ''}")
+            score = SEARCH_ORDER_WEIGHT * (1 - index / count)
+            if self.skills.keywords:
+                score += RANKING_WEIGHTS["skills"] * len(self.skills.find_in_tokens(text)) / len(self.skills.keywords)
+            if self.companies.find_in_tokens(position):
+                score += RANKING_WEIGHTS["companies"]
+            elif self.companies.find_in_tokens(text):
+                score += RANKING_WEIGHTS["companies"] / 2
+            if self.locations.find_in_tokens(text):
+                score += RANKING_WEIGHTS["locations"]
+            if self.level.find_in_tokens(position or text):
+                score += RANKING_WEIGHTS["level"]
+            scores.append(score)
+        return scores
+
+def rank_professionals(professionals: List[Dict], preferences: Optional[dict] = None, limit: Optional[int] = None) -> List[Dict]:
+    """Score deduplicated professionals and return the ``limit`` best, best first.
+
+    Top-k selection uses a heap (O(n log k)) instead of sorting every result.
+    Each returned professional carries its ``relevance`` score.
+    """
+    scores = PreferenceScorer(preferences).score_batch(professionals)
+    # The index breaks ties in search order and keeps the dicts out of comparisons
+    scored = [(round(score, 3), -index, prof) for index, (score, prof) in enumerate(zip(scores, professionals))]
+    best = heapq.nlargest(limit, scored) if limit is not None and limit < len(scored) else sorted(scored, reverse=True)
+    return [{**prof, "relevance": score} for score, _, prof in best]
@@ -1,11 +1,15 @@
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 from serpapi import GoogleSearch
 import logging
 import requests
 from bs4 import BeautifulSoup
 import json
+from services.cache import TTLCache, make_key, cache_path_from_env
+from .extraction import extract_profile_fields_batch
+from .ranking import canonical_profile_url, merge_duplicates
 
 load_dotenv()
 
@@ -13,12 +17,75 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# SerpAPI responses are cached per normalised query / profile URL, in memory and
+# in a SQLite file shared by every worker on the host (SEARCH_CACHE_PATH="" keeps
+# the cache in memory only).
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "86400"))
+PROFILE_CACHE_TTL = float(os.getenv("PROFILE_CACHE_TTL", "604800"))
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "1024"))
+SEARCH_CACHE_PATH = cache_path_from_env("SEARCH_CACHE_PATH", "search_cache.sqlite")
+
+# Fan-out searches run several pages of several query variants concurrently and
+# merge them, within an overall deadline
+SEARCH_FANOUT_PAGES = int(os.getenv("SEARCH_FANOUT_PAGES", "2"))
+SEARCH_FANOUT_VARIANTS = int(os.getenv("SEARCH_FANOUT_VARIANTS", "3"))
+SEARCH_FANOUT_WORKERS = int(os.getenv("SEARCH_FANOUT_WORKERS", "6"))
+SEARCH_FANOUT_DEADLINE = float(os.getenv("SEARCH_FANOUT_DEADLINE", "15"))
+SEARCH_FANOUT_LIMIT = int(os.getenv("SEARCH_FANOUT_LIMIT", "25"))
+SEARCH_PAGE_SIZE = 10
+
+# Other ways people title the same role, tried as query variants when fanning out
+TITLE_SYNONYMS = {
+    "hiring manager": ["engineering manager", "team lead"],
+    "engineering manager": ["software engineering manager", "head of engineering"],
+    "engineering director": ["director of engineering", "head of engineering"],
+    "director of engineering": ["engineering director", "head of engineering"],
+    "recruiter": ["technical recruiter", "talent acquisition"],
+    "technical recruiter": ["recruiter", "talent acquisition partner"],
+    "talent acquisition": ["recruiter", "talent partner"],
+    "product manager": ["product lead", "senior product manager"],
+    "vp": ["vice president", "head"],
+    "vice president": ["vp", "head"],
+    "cto": ["chief technology officer", "vp engineering"],
+    "founder": ["co-founder", "ceo"],
+}
+
+search_cache = TTLCache("serpapi_search", SEARCH_CACHE_TTL, SEARCH_CACHE_SIZE, SEARCH_CACHE_PATH)
+profile_cache = TTLCache("serpapi_profile", PROFILE_CACHE_TTL, SEARCH_CACHE_SIZE, SEARCH_CACHE_PATH)
+
+def _normalize_text(value: Optional[str]) -> Optional[str]:
+    return " ".join(value.lower().split()) if value else None
+
+def search_cache_key(
+    query: str,
+    location: Optional[str] = None,
+    years_experience: Optional[int] = None,
+    skills: Optional[List[str]] = None,
+    current_company: Optional[str] = None,
+    fan_out: bool = False
+) -> str:
+    """Cache key for a professional search, insensitive to case, spacing and skill order."""
+    return make_key(
+        "search_fanout" if fan_out else "search",
+        _normalize_text(query),
+        _normalize_text(location),
+        years_experience or None,
+        sorted({_normalize_text(skill) for skill in skills or [] if skill}),
+        _normalize_text(current_company)
+    )
+
+def normalize_profile_url(profile_url: str) -> str:
+    """Key for a profile URL in caches and the profile store: its canonical URL without the scheme."""
+    return canonical_profile_url(profile_url).removeprefix("https://")
+
 def search_professionals(
     query: str,
     location: Optional[str] = None,
     years_experience: Optional[int] = None,
     skills: Optional[List[str]] = None,
-    current_company: Optional[str] = None
+    current_company: Optional[str] = None,
+    fan_out: bool = False,
+    on_results: Optional[Callable[[List[Dict]], None]] = None
 ) -> Dict:
     """
     Search for potential employers and networking contacts using LinkedIn.
@@ -29,87 +96,31 @@ def search_professionals(
         years_experience (Optional[int]): Minimum years of experience
         skills (Optional[List[str]]): List of relevant skills
         current_company (Optional[str]): Target company name
+        fan_out (bool): Search several pages of several query variants
+            concurrently and merge them (see :func:`_fan_out_professionals`)
+            instead of one page of the query
+        on_results (Optional[Callable]): Called with each batch of new,
+            deduplicated professionals as it arrives
     
     Returns:
         Dict: Search results containing professional profiles
     """
+    cache_key = search_cache_key(query, location, years_experience, skills, current_company, fan_out)
+    cached = search_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"Search cache hit for query: {query}")
+        cached["query"] = query
+        if on_results and cached["professionals"]:
+            on_results(cached["professionals"])
+        return cached
+
     try:
-        # Build a more targeted LinkedIn search query
-        linkedin_query = f"{query} site:linkedin.com/in/"
-        
-        # Add location if specified
-        if location:
-            linkedin_query += f" in {location}"
-            
-        # Add current company if specified
-        if current_company:
-            linkedin_query += f" at {current_company}"
-            
-        # Add experience if specified
-        if years_experience:
-            linkedin_query += f" {years_experience}+ years experience"
-            
-        # Add skills if specified
-        if skills:
-            linkedin_query += f" {' OR '.join(skills)}"
-            
-        params = {
-            "engine": "google",
-            "q": linkedin_query,
-            "api_key": os.getenv("SERPAPI_KEY"),
-            "num": 10,
-            "gl": "us",  # Set to US for better results
-            "hl": "en"   # Set to English
-        }
-        
-        logger.info(f"Making LinkedIn search request with query: {linkedin_query}")
-        search = GoogleSearch(params)
-        search_results = search.get_dict()
-        
-        professionals = []
-        if "organic_results" in search_results:
-            for result in search_results["organic_results"]:
-                if "linkedin.com/in/" in result.get("link", ""):
-                    # Extract name and clean it
-                    title = result.get("title", "")
-                    name = title.split(" | ")[0] if " | " in title else title
-                    
-                    # Extract current position if available
-                    snippet = result.get("snippet", "")
-                    current_position = extract_current_position(snippet)
-                    
-                    professional = {
-                        "name": name,
-                        "link": result.get("link", ""),
-                        "snippet": snippet,
-                        "source": "LinkedIn",
-                        "type": "profile",
-                        "current_position": current_position
-                    }
-                    
-                    # Add experience if mentioned
-                    if years_experience:
-                        professional["years_experience"] = extract_years_experience(snippet)
-                    
-                    # Add skills if mentioned
-                    if skills:
-                        professional["matched_skills"] = [skill for skill in skills if skill.lower() in snippet.lower()]
-                    
-                    professionals.append(professional)
-        
-        # Filter out job listings and invalid profiles
-        filtered_professionals = [
-            prof for prof in professionals
-            if not any(term in prof["snippet"].lower() for term in ["job", "career", "hiring", "apply now"])
-            and prof["name"] != "LinkedIn"
-        ]
-        
-        return {
-            "query": query,
-            "professionals": filtered_professionals,
-            "total_found": len(filtered_professionals)
-        }
-        
+        if fan_out:
+            results, complete = _fan_out_professionals(query, location, years_experience, skills, current_company, on_results)
+        else:
+            results, complete = _fetch_professionals(query, location, years_experience, skills, current_company), True
+            if on_results and results["professionals"]:
+                on_results(results["professionals"])
     except Exception as e:
         logger.error(f"Error in search_professionals: {str(e)}", exc_info=True)
         return {
@@ -118,30 +129,216 @@ def search_professionals(
             "total_found": 0
         }
 
-def extract_current_position(snippet: str) -> str:
-    """Extract current position from LinkedIn snippet."""
-    try:
-        # Look for position at the start of the snippet
-        lines = snippet.split("\n")
-        for line in lines:
-            if any(term in line.lower() for term in ["at ", "currently ", "presently "]):
-                return line.strip()
-        return ""
-    except:
-        return ""
-
-def extract_years_experience(snippet: str) -> Optional[int]:
-    """Extract years of experience from text snippet."""
+    # Partial fan-outs (a page failed or missed the deadline) are not pinned for the full TTL
+    if complete:
+        search_cache.set(cache_key, results)
+    return results
+
+def build_linkedin_query(
+    query: str,
+    location: Optional[str],
+    years_experience: Optional[int],
+    skills: Optional[List[str]],
+    current_company: Optional[str]
+) -> str:
+    """The Google query for LinkedIn profiles matching the search criteria."""
+    # Build a more targeted LinkedIn search query
+    linkedin_query = f"{query} site:linkedin.com/in/"
+    
+    # Add location if specified
+    if location:
+        linkedin_query += f" in {location}"
+        
+    # Add current company if specified
+    if current_company:
+        linkedin_query += f" at {current_company}"
+        
+    # Add experience if specified
+    if years_experience:
+        linkedin_query += f" {years_experience}+ years experience"
+        
+    # Add skills if specified
+    if skills:
+        linkedin_query += f" {' OR '.join(skills)}"
+    return linkedin_query
+
+def title_variants(query: str) -> List[str]:
+    """Rephrasings of the query with a known job title swapped for each of its synonyms."""
+    padded = f" {_normalize_text(query) or ''} "
+    for title, synonyms in TITLE_SYNONYMS.items():
+        # Plural first, so "recruiters" becomes "technical recruiters"
+        for form, suffix in ((f"{title}s", "s"), (title, "")):
+            if f" {form} " in padded:
+                return [padded.replace(f" {form} ", f" {synonym}{suffix} ").strip() for synonym in synonyms]
+    return []
+
+def query_variants(
+    query: str,
+    location: Optional[str] = None,
+    current_company: Optional[str] = None,
+    limit: int = SEARCH_FANOUT_VARIANTS
+) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    """The search as given followed by up to ``limit - 1`` variants of it.
+
+    Each variant is a ``(query, location, current_company)`` for
+    :func:`build_linkedin_query`. Variants are, in order: the first title
+    synonym; the company as a plain keyword ("Stripe recruiters") instead of
+    "at Stripe"; the location as a plain keyword instead of "in <location>";
+    then the remaining title synonyms.
+    """
+    synonyms = title_variants(query)
+    variants = [(query, location, current_company)] + [(synonym, location, current_company) for synonym in synonyms[:1]]
+    if current_company:
+        variants.append((f"{current_company} {query}", location, None))
+    if location:
+        variants.append((f"{query} {location}", None, current_company))
+    variants += [(synonym, location, current_company) for synonym in synonyms[1:]]
+
+    unique, seen = [], set()
+    for variant in variants:
+        key = tuple(_normalize_text(part) for part in variant)
+        if key not in seen:
+            seen.add(key)
+            unique.append(variant)
+    return unique[:limit]
+
+def _fetch_search_page(linkedin_query: str, page: int = 0) -> List[Dict]:
+    """One page of organic results from SerpAPI. Errors propagate so they are never cached."""
+    params = {
+        "engine": "google",
+        "q": linkedin_query,
+        "api_key": os.getenv("SERPAPI_KEY"),
+        "num": SEARCH_PAGE_SIZE,
+        "gl": "us",  # Set to US for better results
+        "hl": "en"   # Set to English
+    }
+    if page:
+        params["start"] = page * SEARCH_PAGE_SIZE
+    
+    logger.info(f"Making LinkedIn search request with query: {linkedin_query} (page {page + 1})")
+    search = GoogleSearch(params)
+    search_results = search.get_dict()
+    if "error" in search_results:
+        raise RuntimeError(f"SerpAPI error: {search_results['error']}")
+    return search_results.get("organic_results", [])
+
+def _parse_professionals(
+    organic_results: List[Dict],
+    years_experience: Optional[int],
+    skills: Optional[List[str]]
+) -> List[Dict]:
+    """LinkedIn profiles among the results, without job listings, invalid profiles or duplicates."""
+    profile_results = [result for result in organic_results if "linkedin.com/in/" in result.get("link", "")]
+    fields = extract_profile_fields_batch(
+        [result.get("snippet", "") for result in profile_results], skills, with_years=bool(years_experience)
+    )
+
+    professionals = []
+    for result, extracted in zip(profile_results, fields):
+        # Extract name and clean it
+        title = result.get("title", "")
+        name = title.split(" | ")[0] if " | " in title else title
+
+        # Filter out job listings and invalid profiles
+        if extracted["excluded"] or name == "LinkedIn":
+            continue
+
+        professional = {
+            "name": name,
+            "link": result.get("link", ""),
+            "snippet": result.get("snippet", ""),
+            "source": "LinkedIn",
+            "type": "profile",
+            "current_position": extracted["current_position"]
+        }
+        # Add experience and matched skills if asked for
+        if years_experience:
+            professional["years_experience"] = extracted["years_experience"]
+        if skills:
+            professional["matched_skills"] = extracted["matched_skills"]
+        professionals.append(professional)
+    return merge_duplicates(professionals)
+
+def _fetch_professionals(
+    query: str,
+    location: Optional[str],
+    years_experience: Optional[int],
+    skills: Optional[List[str]],
+    current_company: Optional[str]
+) -> Dict:
+    """Run the LinkedIn search against SerpAPI. Errors propagate so they are never cached."""
+    linkedin_query = build_linkedin_query(query, location, years_experience, skills, current_company)
+    filtered_professionals = _parse_professionals(_fetch_search_page(linkedin_query), years_experience, skills)
+    
+    return {
+        "query": query,
+        "professionals": filtered_professionals,
+        "total_found": len(filtered_professionals)
+    }
+
+def _fan_out_professionals(
+    query: str,
+    location: Optional[str],
+    years_experience: Optional[int],
+    skills: Optional[List[str]],
+    current_company: Optional[str],
+    on_results: Optional[Callable[[List[Dict]], None]] = None
+) -> tuple:
+    """Fetch ``SEARCH_FANOUT_PAGES`` pages of every query variant concurrently.
+
+    Results are merged as pages arrive, keeping the first occurrence of each
+    profile (by normalised URL) and stopping at ``SEARCH_FANOUT_LIMIT``.
+    Pages still outstanding at ``SEARCH_FANOUT_DEADLINE`` are abandoned.
+
+    Returns:
+        tuple: The results dict, and whether every page was fetched. Raises
+        the first error only if no page succeeded.
+    """
+    searches = [
+        (build_linkedin_query(variant, variant_location, years_experience, skills, variant_company), page)
+        for variant, variant_location, variant_company in query_variants(query, location, current_company)
+        for page in range(SEARCH_FANOUT_PAGES)
+    ]
+    professionals, seen, errors = [], set(), []
+    pending = len(searches)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(SEARCH_FANOUT_WORKERS, len(searches))))
     try:
-        # Simple regex pattern for years of experience
-        import re
-        pattern = r"(\d+)\+?\s*(?:year|yr)s?\s*(?:of\s*)?experience"
-        match = re.search(pattern, snippet.lower())
-        if match:
-            return int(match.group(1))
-    except:
-        pass
-    return None
+        futures = [executor.submit(_fetch_search_page, linkedin_query, page) for linkedin_query, page in searches]
+        for future in as_completed(futures, timeout=SEARCH_FANOUT_DEADLINE):
+            pending -= 1
+            try:
+                page_results = _parse_professionals(future.result(), years_experience, skills)
+            except Exception as e:
+                logger.warning(f"Search page failed: {str(e)}")
+                errors.append(e)
+                continue
+
+            new = []
+            for prof in page_results:
+                key = normalize_profile_url(prof["link"])
+                if key not in seen and len(professionals) < SEARCH_FANOUT_LIMIT:
+                    seen.add(key)
+                    new.append(prof)
+            professionals += new
+            if new and on_results:
+                on_results(new)
+            if len(professionals) >= SEARCH_FANOUT_LIMIT:
+                break
+    except TimeoutError:
+        logger.warning(f"Search fan-out deadline reached with {pending} page(s) outstanding")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if errors and not professionals and len(errors) == len(searches):
+        raise errors[0]
+
+    results = {
+        "query": query,
+        "professionals": professionals,
+        "total_found": len(professionals)
+    }
+    return results, not errors and (pending == 0 or len(professionals) >= SEARCH_FANOUT_LIMIT)
 
 def get_professional_details(profile_url: str) -> Dict:
     """
@@ -153,40 +350,55 @@ def get_professional_details(profile_url: str) -> Dict:
     Returns:
         Dict: Detailed information about the professional
     """
+    cache_key = make_key("profile", normalize_profile_url(profile_url))
+    cached = profile_cache.get(cache_key)
+    if cached is not None:
+        logger.info(f"Profile cache hit for: {profile_url}")
+        cached["url"] = profile_url
+        return cached
+
     try:
-        params = {
-            "engine": "google",
-            "q": f"site:{profile_url}",
-            "api_key": os.getenv("SERPAPI_KEY")
-        }
-        
-        logger.info(f"Making SerpAPI request for profile: {profile_url}")
-        search = GoogleSearch(params)
-        search_results = search.get_dict()
-        
-        # Extract relevant information with better error handling
-        organic_results = search_results.get("organic_results", [])
-        if not organic_results:
-            logger.warning(f"No organic results found for profile: {profile_url}")
-            return {
-                "url": profile_url,
-                "content": "",
-                "title": ""
-            }
-            
-        first_result = organic_results[0]
-        details = {
-            "url": profile_url,
-            "content": first_result.get("snippet", ""),
-            "title": first_result.get("title", "")
-        }
-        
-        return details
-        
+        details = _fetch_professional_details(profile_url)
     except Exception as e:
         logger.error(f"Error in get_professional_details: {str(e)}", exc_info=True)
         return {
             "url": profile_url,
             "content": "",
             "title": ""
-        } 
\ No newline at end of file
+        }
+
+    # Don't pin an empty lookup for the full TTL; the profile may just not be indexed yet
+    if details["content"] or details["title"]:
+        profile_cache.set(cache_key, details)
+    return details
+
+def _fetch_professional_details(profile_url: str) -> Dict:
+    """Look up a profile through SerpAPI. Errors propagate so they are never cached."""
+    params = {
+        "engine": "google",
+        "q": f"site:{profile_url}",
+        "api_key": os.getenv("SERPAPI_KEY")
+    }
+    
+    logger.info(f"Making SerpAPI request for profile: {profile_url}")
+    search = GoogleSearch(params)
+    search_results = search.get_dict()
+    if "error" in search_results:
+        raise RuntimeError(f"SerpAPI error: {search_results['error']}")
+    
+    # Extract relevant information with better error handling
+    organic_results = search_results.get("organic_results", [])
+    if not organic_results:
+        logger.warning(f"No organic results found for profile: {profile_url}")
+        return {
+            "url": profile_url,
+            "content": "",
+            "title": ""
+        }
+        
+    first_result = organic_results[0]
+    return {
+        "url": profile_url,
+        "content": first_result.get("snippet", ""),
+        "title": first_result.get("title", "")
+    }
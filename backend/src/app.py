@@ -1,23 +1,43 @@
-from flask import Flask
+from flask import Flask, current_app
 from flask_cors import CORS
+from flask_socketio import emit, join_room, leave_room
 from socketio_instance import socketio
 from database.db import db
-from database.models import User, Session, Message, SequenceStep
-from services.openai_client import chat_with_openai
-from flask import request, jsonify
+from database.migrations import ensure_indexes, normalize_timestamps
+from database.profiles import ensure_profile_search_index
+from database.queries import delete_session_rows
+from database.pagination import InvalidCursor, encode_cursor, keyset_page, parse_limit
+from database.sequences import (
+    current_version, get_sequence as load_sequence, redo_sequence, restore_version, sequence_history, undo_sequence
+)
+from database.models import User, Session, Message, Job
+from services.openai_client import stream_chat_with_openai
+from services.context_builder import conversation_contexts
+from services.user_context import user_contexts
+from services.sequence_events import SequenceBroadcaster, sequence_broadcaster, session_room, user_room
+from services.llm_client import completion_cache, metrics as llm_metrics
+from services.model_router import create_chat_completion, route_metrics
+from services.jobs import JOB_PRIORITIES, job_queue, job_to_dict
+from agents.tools.web_search import search_cache, profile_cache
+from flask import request, jsonify, Response, stream_with_context
 from dotenv import load_dotenv
 import os
+import json
 import uuid
-from openai import OpenAI
+from concurrent.futures import ThreadPoolExecutor
 
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+# Generated titles are produced off the request thread
+title_executor = ThreadPoolExecutor(max_workers=int(os.getenv("TITLE_WORKERS", "2")), thread_name_prefix="title")
+# Longest a ``"wait": true`` /chat request holds the connection before answering with the job
+CHAT_WAIT_TIMEOUT = float(os.getenv("CHAT_WAIT_TIMEOUT", "120"))
 
 def generate_chat_title(message: str) -> str:
     """Generate a meaningful title for the chat based on the first message."""
     try:
-        response = client.chat.completions.create(
-            model="gpt-4",
+        response = create_chat_completion(
+            route="title",
             messages=[
                 {
                     "role": "system",
@@ -32,9 +52,7 @@ def generate_chat_title(message: str) -> str:
                     "role": "user",
                     "content": f"Generate a title for this chat message: {message}"
                 }
-            ],
-            temperature=0.7,
-            max_tokens=10
+            ]
         )
         title = response.choices[0].message.content.strip()
         # Ensure title isn't too long and remove quotes if present
@@ -42,7 +60,95 @@ def generate_chat_title(message: str) -> str:
         return title[:30]
     except Exception as e:
         print(f"Error generating title: {str(e)}")
-        return "New Chat"
+        return fallback_title(message)
+
+def fallback_title(message: str) -> str:
+    """Cheap local title from the first message, shown until the generated one arrives."""
+    words = message.replace('"', '').replace("'", "").split()
+    title = ""
+    for word in words:
+        candidate = f"{title} {word}".strip()
+        if len(candidate) > 30:
+            break
+        title = candidate
+    return title or message.strip()[:30] or "New Chat"
+
+def emit_session_title(session: Session, title: str) -> None:
+    """Tell the owner's open clients (their ``user_room``) that a session was renamed."""
+    socketio.emit("session_updated", {
+        "session_id": session.id,
+        "session_title": title
+    }, to=user_room(session.user_id))
+
+def update_generated_title(session_id: str, message: str, placeholder: str) -> None:
+    """Generate the real title and replace the placeholder, unless the user renamed the session meanwhile."""
+    title = generate_chat_title(message)
+    session = Session.query.get(session_id)
+    if not session or session.session_title != placeholder or title == placeholder:
+        return
+    session.session_title = title
+    db.session.commit()
+    print(f"Generated title: {title}")  # Debug log
+    emit_session_title(session, title)
+
+def _update_generated_title_in_background(app: Flask, session_id: str, message: str, placeholder: str) -> None:
+    with app.app_context():
+        try:
+            update_generated_title(session_id, message, placeholder)
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error updating generated title: {str(e)}")
+        finally:
+            db.session.remove()
+
+def record_user_message(session: Session, user_message: str) -> None:
+    """Save the user's message and title the session if it is the first one.
+
+    The session immediately gets a local fallback title; the model-generated
+    title is produced on ``title_executor`` and pushed as ``session_updated``
+    when ready, so it never delays the reply.
+    """
+    session_id = session.id
+
+    # Save user message to DB
+    user_msg = Message(session_id=session_id, sender="user", content=user_message)
+    db.session.add(user_msg)
+    db.session.commit()
+    conversation_contexts.record_message(session_id, "user", user_message)
+
+    # If this is the first message, title the session
+    if Message.query.filter_by(session_id=session_id).count() == 1:
+        placeholder = fallback_title(user_message)
+        session.session_title = placeholder
+        db.session.commit()
+        emit_session_title(session, placeholder)
+
+        app = current_app._get_current_object()
+        if app.config["ASYNC_TITLES"]:
+            title_executor.submit(_update_generated_title_in_background, app, session_id, user_message, placeholder)
+        else:
+            update_generated_title(session_id, user_message, placeholder)
+
+def run_chat_job(session_id: str, payload: dict, report) -> dict:
+    """Job handler for one chat turn; ``/chat`` has already saved the user's message.
+
+    Every event from ``stream_chat_with_openai`` except the final one is
+    reported as progress; the reply is saved and returned as the job result.
+    """
+    messages = conversation_contexts.build_messages(session_id)
+    for event in stream_chat_with_openai(messages, session_id=session_id):
+        if event["type"] != "done":
+            report(event)
+            continue
+        ai_msg = Message(session_id=session_id, sender="ai", content=event["response"])
+        db.session.add(ai_msg)
+        db.session.commit()
+        conversation_contexts.record_message(session_id, "ai", event["response"])
+        # Tools persist and broadcast the sequence themselves; this is their snapshot
+        return {"response": event["response"], "sequence": event["sequence"] or []}
+    raise RuntimeError("Chat ended without a reply")
+
+job_queue.register("chat", run_chat_job)
 
 def create_app(testing=False):
     """Create and configure the Flask application.
@@ -62,6 +168,9 @@ def create_app(testing=False):
         - Creates necessary database tables if they don't exist
         - Sets up WebSocket support with CORS enabled
         - Configures SQLAlchemy with appropriate database URI
+        - Does not start the job workers; the serving entry points (run.py,
+          serve.py) call ``job_queue.start(app)`` so scripts such as
+          init_db.py never claim queued jobs
     """
     app = Flask(__name__)
     CORS(app)
@@ -73,13 +182,44 @@ def create_app(testing=False):
 
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
     app.config["TESTING"] = testing
+    # Tests generate titles inline so background threads never share the in-memory database
+    app.config["ASYNC_TITLES"] = not testing
+    # ...and run jobs inline for the same reason
+    app.config["ASYNC_JOBS"] = not testing
 
     db.init_app(app)
     socketio.init_app(app, cors_allowed_origins="*")
 
-    # Create database tables
+    # Create database tables, bring older databases up to date (indexes, timestamp format) and build the profile search index
     with app.app_context():
         db.create_all()
+        ensure_indexes()
+        normalize_timestamps()
+        ensure_profile_search_index()
+
+    @socketio.on("join_session")
+    def handle_join_session(data):
+        """Subscribe this client to a session's updates and send it the current sequence."""
+        session_id = (data or {}).get("session_id")
+        if not session_id:
+            return
+        join_room(session_room(session_id))
+        emit("sequence_updated", SequenceBroadcaster.snapshot(
+            session_id, load_sequence(session_id), current_version(session_id)
+        ))
+
+    @socketio.on("leave_session")
+    def handle_leave_session(data):
+        session_id = (data or {}).get("session_id")
+        if session_id:
+            leave_room(session_room(session_id))
+
+    @socketio.on("join_user")
+    def handle_join_user(data):
+        """Subscribe this client to title changes of the user's sessions."""
+        user_id = (data or {}).get("user_id")
+        if user_id:
+            join_room(user_room(user_id))
 
     @socketio.on("session_updated")
     def handle_session_update(data):
@@ -97,23 +237,39 @@ def create_app(testing=False):
                 session.session_title = new_title
                 db.session.commit()
                 
-                # Broadcast the update to all clients
-                socketio.emit("session_updated", {
-                    "session_id": session_id,
-                    "session_title": new_title
-                })
+                # Broadcast the update to the owner's other clients
+                emit_session_title(session, new_title)
         except Exception as e:
             print(f"Error handling session update: {str(e)}")
 
     @app.route("/")
     def index():
         return "Seeker backend running!"
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        """Operational counters for caches and other shared components."""
+        return jsonify({
+            "caches": [search_cache.stats(), profile_cache.stats(), completion_cache.stats()],
+            "openai": llm_metrics.stats(),
+            "model_routes": route_metrics.stats()
+        })
     
     @app.route("/chat", methods=["POST"])
     def chat():
+        """Queue a chat turn and return its job right away (202).
+
+        The reply is produced on the job worker pool; progress arrives in the
+        session's room as ``job_progress`` events and the outcome as
+        ``job_updated``, or poll ``/jobs/<job_id>``. ``"priority"`` is "high",
+        "normal" (default) or "low". With ``"wait": true`` the request blocks
+        until the reply is ready and returns ``{"response", "sequence"}`` as
+        before, falling back to the 202 job response after CHAT_WAIT_TIMEOUT.
+        """
         data = request.get_json()
         user_message = data.get("message")
         session_id = data.get("session_id")
+        priority = data.get("priority", "normal")
 
         if not user_message:
             return jsonify({"error": "No message provided"}), 400
@@ -121,6 +277,9 @@ def create_app(testing=False):
         if not session_id:
             return jsonify({"error": "No session_id provided"}), 400
 
+        if priority not in JOB_PRIORITIES:
+            return jsonify({"error": f"priority must be one of {', '.join(JOB_PRIORITIES)}"}), 400
+
         print(f"Processing chat for session_id: {session_id}")  # Debug log
 
         # Verify session exists
@@ -130,173 +289,108 @@ def create_app(testing=False):
             return jsonify({"error": "Session not found"}), 404
 
         try:
-            # Save user message to DB
-            user_msg = Message(session_id=session_id, sender="user", content=user_message)
-            db.session.add(user_msg)
-            db.session.commit()
-
-            # If this is the first message, generate a title
-            if len(Message.query.filter_by(session_id=session_id).all()) == 1:
-                title = generate_chat_title(user_message)
-                session.session_title = title
-                db.session.commit()
-                print(f"Generated title: {title}")  # Debug log
-                # Emit title update via WebSocket
-                socketio.emit("session_updated", {
-                    "session_id": session_id,
-                    "session_title": title
-                })
+            record_user_message(session, user_message)
+            job = job_queue.submit("chat", session_id, {"message": user_message}, priority=priority)
+        except Exception as e:
+            db.session.rollback()  # Rollback any failed database operations
+            import traceback
+            traceback.print_exc()  # print full stack trace to console
+            return jsonify({"error": str(e)}), 500
 
-            # Fetch full chat history for this session
-            past_messages = Message.query.filter_by(session_id=session_id).order_by(Message.timestamp).all()
+        if data.get("wait"):
+            job = job_queue.wait(job["job_id"], timeout=CHAT_WAIT_TIMEOUT)
+            if job["status"] == "succeeded":
+                print(f"Sending response for session_id {session_id}: {job['result']}")  # Debug log
+                return jsonify(job["result"])
+            if job["status"] == "failed":
+                return jsonify({"error": job["error"]}), 500
 
-            messages = [
-                {
-                    "role": "system",
-                    "content": """
-                            You are Seeker, an AI job search assistant that helps users find and connect with potential employers and professional contacts.
-
-                            **Rules to Follow:**
-
-                            1. **Tool Usage**: Always use tools for sequence-related tasks. Never write or suggest sequence content directly.
-                            - Available tools:
-                                - `generate_sequence` (requires role) - Use for creating multi-step outreach campaigns to potential employers or networking contacts
-                                - `revise_step` (requires step number and revision instruction) - Use to refine specific messages in a sequence
-                                - `change_tone` (requires tone and session_id) - Use to adjust the overall tone of messages
-                                - `add_step` (requires step content and session_id) - Use to add follow-ups or additional messages
-                                - `generate_networking_asset` - Use for one-off requests like "write a cold email," "thank you note," or "follow-up email"
-                                - `search_and_analyze_professionals` - Use to find potential employers or networking contacts based on role and location
-
-                            2. **Clarify Intent**: If the user's request is unclear, ask a clarifying question before proceeding.
-
-                            3. **Conversational Responses**: Respond conversationally if the user's input is vague or unrelated to sequence manipulation.
-
-                            **Common Job Seeker Needs**:
-                            - Finding relevant hiring managers or team leads to contact
-                            - Crafting personalized cold outreach emails
-                            - Writing follow-up messages after job applications
-                            - Creating thank you notes after interviews
-                            - Developing networking strategies for specific companies
-
-                            **Tone Guidance**:
-                            - Technical roles → professional & direct
-                            - Creative roles → casual & expressive
-                            - Senior roles → formal & strategic
-                            - Startup companies → energetic & conversational
-                            - Enterprise companies → formal & structured
-
-                            **Your Role**: Act as a friendly, smart job search co-pilot, not a chatbot.
-
-                            **Before Responding**:
-                            - Verify that your response complies with all rules above.
-                            - Ensure you are using tools appropriately (if required).
-                            - Avoid direct content creation or unnecessary tool usage.
-                            If not compliant, revise your response before sending it.
-    """
-                }
-            ]           
-            for msg in past_messages:
-                role = "user" if msg.sender == "user" else "assistant"
-                messages.append({"role": role, "content": msg.content})
-
-            # Inject current sequence into context (if any)
-            sequence_steps = SequenceStep.query.filter_by(session_id=session_id).order_by(SequenceStep.step_number).all()
-            if sequence_steps:
-                sequence_text = "\n\n".join(
-                    [f"Step {step.step_number}: {step.content}" for step in sequence_steps]
-                )
-                messages.append({
-                    "role": "system",
-                    "content": f"Here is the current outreach sequence for context:\n\n{sequence_text}"
-                })
+        return jsonify(job), 202
 
-            # Send to OpenAI
-            ai_result = chat_with_openai(messages, session_id=session_id)
+    @app.route("/jobs/<job_id>", methods=["GET"])
+    def get_job(job_id):
+        return jsonify(job_to_dict(Job.query.get_or_404(job_id)))
 
-            ai_response_text = ai_result["response"]
-            ai_sequence = ai_result.get("sequence")
+    @app.route("/chat/stream", methods=["POST"])
+    def chat_stream():
+        """Streaming variant of /chat for API clients.
 
-            # Store AI message in DB
-            ai_msg = Message(session_id=session_id, sender="ai", content=ai_response_text)
-            db.session.add(ai_msg)
-            db.session.commit()
+        Responds with newline-delimited JSON events as the model produces them
+        (see ``stream_chat_with_openai``), so the client can render tokens before
+        the turn has finished. Tools that change the sequence also broadcast it
+        as ``sequence_updated`` over Socket.IO.
 
-            # If a sequence was generated, save it
-            if ai_sequence:
-                print(f"Received sequence from OpenAI for session_id: {session_id}")  # Debug log
-                
-                try:
-                    # Delete existing steps
-                    SequenceStep.query.filter_by(session_id=session_id).delete()
-                    db.session.commit()
-
-                    # Validate and save new steps
-                    for step in ai_sequence:
-                        if not isinstance(step, dict) or "step_number" not in step or "content" not in step:
-                            print(f"Invalid step structure: {step}")
-                            continue
-                        
-                        new_step = SequenceStep(
-                            session_id=session_id,
-                            step_number=step["step_number"],
-                            content=step["content"].strip()
-                        )
-                        db.session.add(new_step)
-                    
-                    db.session.commit()
-
-                    # Verify saved steps
-                    saved_sequence = SequenceStep.query.filter_by(session_id=session_id).order_by(SequenceStep.step_number).all()
-                    print(f"Retrieved saved sequence for session_id {session_id}: {len(saved_sequence)} steps")
-                    
-                    if len(saved_sequence) == 0:
-                        print("Warning: No steps were saved to the database")
-                        sequence_data = []
-                    else:
-                        sequence_data = [
-                            {
-                                "step_number": step.step_number,
-                                "content": step.content
-                            }
-                            for step in saved_sequence
-                        ]
-                        # Emit updated sequence over WebSocket
-                        socketio.emit("sequence_updated", {
-                            "session_id": session_id,
-                            "sequence": sequence_data
-                        })
-                except Exception as e:
-                    print(f"Error saving sequence: {str(e)}")
-                    db.session.rollback()
-                    sequence_data = []
-            else:
-                sequence_data = []
-
-            # Return structured response
-            response_data = {
-                "response": ai_response_text,
-                "sequence": sequence_data
-            }
-            print(f"Sending response for session_id {session_id}: {response_data}")  # Debug log
-            return jsonify(response_data)
+        The turn runs on the request thread, so the connection stays open for
+        the whole turn; the web UI uses ``/chat`` and the job events instead.
+        """
+        data = request.get_json()
+        user_message = data.get("message")
+        session_id = data.get("session_id")
+
+        if not user_message:
+            return jsonify({"error": "No message provided"}), 400
+
+        if not session_id:
+            return jsonify({"error": "No session_id provided"}), 400
+
+        session = Session.query.get(session_id)
+        if not session:
+            return jsonify({"error": "Session not found"}), 404
 
+        try:
+            record_user_message(session, user_message)
+            messages = conversation_contexts.build_messages(session_id)
         except Exception as e:
-            db.session.rollback()  # Rollback any failed database operations
-            import traceback
-            traceback.print_exc()  # print full stack trace to console
+            db.session.rollback()
             return jsonify({"error": str(e)}), 500
 
+        def generate():
+            try:
+                for event in stream_chat_with_openai(messages, session_id=session_id):
+                    if event["type"] == "done":
+                        ai_msg = Message(session_id=session_id, sender="ai", content=event["response"])
+                        db.session.add(ai_msg)
+                        db.session.commit()
+                        conversation_contexts.record_message(session_id, "ai", event["response"])
+                    yield json.dumps(event) + "\n"
+            except Exception as e:
+                db.session.rollback()
+                import traceback
+                traceback.print_exc()
+                yield json.dumps({"type": "error", "error": str(e)}) + "\n"
+
+        return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
     @app.route("/sequence/<session_id>", methods=["GET"])
     def get_sequence(session_id):
-        steps = SequenceStep.query.filter_by(session_id=session_id).order_by(SequenceStep.step_number).all()
-
-        return jsonify([
-            {
-                "step_number": step.step_number,
-                "content": step.content
-            }
-            for step in steps
-        ])
+        return jsonify(load_sequence(session_id))
+
+    def restored_sequence_response(session_id, restored, missing_message):
+        if restored is None:
+            return jsonify({"error": missing_message}), 409
+        sequence_broadcaster.notify(session_id, restored["sequence"], restored["version"])
+        return jsonify(restored)
+
+    @app.route("/sequence/<session_id>/history", methods=["GET"])
+    def get_sequence_history(session_id):
+        """Newest saved versions of the session's sequence (``?limit=``) and the current one."""
+        try:
+            limit = parse_limit(request.args.get("limit"))
+        except InvalidCursor as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify(sequence_history(session_id, limit))
+
+    @app.route("/sequence/<session_id>/undo", methods=["POST"])
+    def undo_sequence_endpoint(session_id):
+        return restored_sequence_response(session_id, undo_sequence(session_id), "Nothing to undo")
+
+    @app.route("/sequence/<session_id>/redo", methods=["POST"])
+    def redo_sequence_endpoint(session_id):
+        return restored_sequence_response(session_id, redo_sequence(session_id), "Nothing to redo")
+
+    @app.route("/sequence/<session_id>/versions/<int:version>/restore", methods=["POST"])
+    def restore_sequence_version(session_id, version):
+        return restored_sequence_response(session_id, restore_version(session_id, version), "Version not found")
     
     @app.route("/signup", methods=["POST"])
     def signup():
@@ -355,34 +449,81 @@ def create_app(testing=False):
     
     @app.route("/sessions", methods=["GET"])
     def get_sessions():
+        """List a user's sessions, newest first, one page at a time.
+
+        Query params:
+            user_id: Owner of the sessions (required)
+            limit: Page size (default 50, max 200)
+            before: Cursor from a previous page's ``before``; returns older sessions
+        """
         user_id = request.args.get("user_id")
 
         if not user_id:
             return jsonify({"error": "user_id is required"}), 400
 
-        sessions = Session.query.filter_by(user_id=user_id).order_by(Session.created_at.desc()).all()
-
-        return jsonify([
-            {
-                "session_id": s.id,
-                "session_title": s.session_title,
-                "created_at": s.created_at.isoformat()
-            }
-            for s in sessions
-        ])
+        try:
+            limit = parse_limit(request.args.get("limit"))
+            # Only the listed columns, as plain rows rather than Session objects
+            sessions, has_more = keyset_page(
+                db.session.query(Session.id, Session.session_title, Session.created_at).filter(Session.user_id == user_id),
+                Session.created_at, Session.id, limit,
+                before=request.args.get("before")
+            )
+        except InvalidCursor as e:
+            return jsonify({"error": str(e)}), 400
+
+        sessions.reverse()
+        return jsonify({
+            "sessions": [
+                {
+                    "session_id": s.id,
+                    "session_title": s.session_title,
+                    "created_at": s.created_at.isoformat()
+                }
+                for s in sessions
+            ],
+            "has_more": has_more,
+            "before": encode_cursor(sessions[-1].created_at, sessions[-1].id) if sessions else None
+        })
 
     @app.route("/sessions/<session_id>/messages", methods=["GET"])
     def get_session_messages(session_id):
-        messages = Message.query.filter_by(session_id=session_id).order_by(Message.timestamp).all()
+        """Return one page of a session's messages in chronological order.
 
-        return jsonify([
-            {
-                "sender": m.sender,
-                "content": m.content,
-                "timestamp": m.timestamp.isoformat()
-            }
-            for m in messages
-        ])
+        Without a cursor the latest page is returned. Pass the response's
+        ``before`` cursor to load older history, or ``after`` to load newer.
+
+        Query params:
+            limit: Page size (default 50, max 200)
+            before: Return the messages immediately older than this cursor
+            after: Return the messages immediately newer than this cursor
+        """
+        try:
+            limit = parse_limit(request.args.get("limit"))
+            messages, has_more = keyset_page(
+                db.session.query(Message.id, Message.sender, Message.content, Message.timestamp)
+                .filter(Message.session_id == session_id),
+                Message.timestamp, Message.id, limit,
+                before=request.args.get("before"),
+                after=request.args.get("after")
+            )
+        except InvalidCursor as e:
+            return jsonify({"error": str(e)}), 400
+
+        return jsonify({
+            "messages": [
+                {
+                    "id": m.id,
+                    "sender": m.sender,
+                    "content": m.content,
+                    "timestamp": m.timestamp.isoformat()
+                }
+                for m in messages
+            ],
+            "has_more": has_more,
+            "before": encode_cursor(messages[0].timestamp, messages[0].id) if messages else None,
+            "after": encode_cursor(messages[-1].timestamp, messages[-1].id) if messages else None
+        })
 
     @app.route("/sessions/<session_id>", methods=["PATCH"])
     def update_session(session_id):
@@ -401,21 +542,20 @@ def create_app(testing=False):
 
     @app.route("/sessions/<session_id>", methods=["DELETE"])
     def delete_session(session_id):
-        session = Session.query.get_or_404(session_id)
-        
-        # Delete all messages and sequence steps associated with this session
-        Message.query.filter_by(session_id=session_id).delete()
-        SequenceStep.query.filter_by(session_id=session_id).delete()
-        
-        # Delete the session itself
-        db.session.delete(session)
+        # Delete the session with its messages, steps, jobs and history, without loading any of them
+        if not delete_session_rows(session_id):
+            db.session.rollback()
+            return jsonify({"error": "Session not found"}), 404
         db.session.commit()
+        conversation_contexts.invalidate(session_id)
+        user_contexts.invalidate_session(session_id)
+        sequence_broadcaster.forget(session_id)
         
         return jsonify({"message": "Session deleted successfully"})
 
     @app.route("/sessions/<session_id>", methods=["GET"])
     def get_session(session_id):
-        session = Session.query.get(session_id)
+        session = db.session.query(Session.id, Session.session_title, Session.created_at).filter(Session.id == session_id).first()
         if not session:
             return jsonify({"error": "Session not found"}), 404
             
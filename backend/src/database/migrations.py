@@ -0,0 +1,96 @@
+from sqlalchemy import inspect, text
+from database.db import db
+
+def _renumber_duplicate_steps(connection) -> int:
+    """Give every step of a session a distinct step_number before the unique index is built.
+
+    Older databases never enforced uniqueness, so a session may contain two rows
+    for the same position. Affected sessions are renumbered 1..n, keeping the
+    existing order (step_number, then id) so no content is lost.
+
+    Returns:
+        int: Number of sessions that had to be renumbered
+    """
+    duplicates = connection.execute(text(
+        "SELECT DISTINCT session_id FROM sequence_step "
+        "GROUP BY session_id, step_number HAVING COUNT(*) > 1"
+    )).fetchall()
+
+    for (session_id,) in duplicates:
+        rows = connection.execute(
+            text("SELECT id FROM sequence_step WHERE session_id = :session_id ORDER BY step_number, id"),
+            {"session_id": session_id}
+        ).fetchall()
+        for position, (step_id,) in enumerate(rows, start=1):
+            connection.execute(
+                text("UPDATE sequence_step SET step_number = :position WHERE id = :id"),
+                {"position": position, "id": step_id}
+            )
+    return len(duplicates)
+
+# Columns paged by keyset cursors; see normalize_timestamps
+KEYSET_TIMESTAMP_COLUMNS = (("session", "created_at"), ("message", "timestamp"))
+
+def normalize_timestamps() -> int:
+    """Give SQLite timestamps written by ``CURRENT_TIMESTAMP`` the format SQLAlchemy writes.
+
+    These columns used to default to the database's ``now()``, which SQLite
+    stores as "YYYY-MM-DD HH:MM:SS". SQLAlchemy binds datetimes as
+    "YYYY-MM-DD HH:MM:SS.ffffff", and SQLite compares the two as strings, so
+    a keyset cursor on such a row never matches it and pages repeat forever.
+    Appending the missing fraction makes both forms compare correctly. Other
+    databases store real timestamps and are left alone. Safe to run on every
+    start-up; must be called inside an application context.
+
+    Returns:
+        int: Number of rows updated
+    """
+    if db.engine.dialect.name != "sqlite":
+        return 0
+    updated = 0
+    with db.engine.begin() as connection:
+        existing_tables = set(inspect(connection).get_table_names())
+        for table, column in KEYSET_TIMESTAMP_COLUMNS:
+            if table not in existing_tables:
+                continue
+            result = connection.execute(text(
+                f'UPDATE "{table}" SET "{column}" = "{column}" || \'.000000\' WHERE length("{column}") = 19'
+            ))
+            updated += result.rowcount
+    if updated:
+        print(f"Normalized {updated} timestamps")
+    return updated
+
+def ensure_indexes() -> list:
+    """Create any index declared on the models that the database is missing.
+
+    ``db.create_all()`` only creates indexes together with new tables, so
+    databases created before an index was added to a model never get it. This
+    inspects the live schema and creates the missing ones, which works the same
+    on SQLite and Postgres. It is safe to run on every start-up.
+
+    Must be called inside an application context.
+
+    Returns:
+        list: Names of the indexes that were created
+    """
+    created = []
+    with db.engine.begin() as connection:
+        inspector = inspect(connection)
+        existing_tables = set(inspector.get_table_names())
+
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in sorted(table.indexes, key=lambda i: i.name):
+                if index.name in existing:
+                    continue
+                if index.name == "uq_sequence_step_session_id_step_number":
+                    renumbered = _renumber_duplicate_steps(connection)
+                    if renumbered:
+                        print(f"Renumbered duplicate steps in {renumbered} sessions")
+                index.create(bind=connection)
+                created.append(index.name)
+                print(f"Created index {index.name}")
+    return created
@@ -1,4 +1,5 @@
 from database.db import db
+from datetime import datetime
 import uuid
 
 class User(db.Model):
@@ -46,10 +47,18 @@ class Session(db.Model):
         - Belongs to a User (many-to-one relationship)
         - Has many Messages (one-to-many relationship)
         - Has many SequenceSteps (one-to-many relationship)
+
+    Indexes:
+        - (user_id, created_at) for listing a user's sessions newest first
     """
+    __table_args__ = (
+        db.Index("ix_session_user_id_created_at", "user_id", "created_at"),
+    )
+
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = db.Column(db.String(36), db.ForeignKey("user.id"), nullable=False)
-    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    # Set in Python so SQLite stores microseconds; keyset cursors compare against this column
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
     session_title = db.Column(db.String(100), default="New Session")
 
     messages = db.relationship("Message", backref="session", lazy=True, cascade="all, delete-orphan")
@@ -70,12 +79,20 @@ class Message(db.Model):
     
     Relationships:
         - Belongs to a Session (many-to-one relationship)
+
+    Indexes:
+        - (session_id, timestamp) for reading a session's history in order
     """
+    __table_args__ = (
+        db.Index("ix_message_session_id_timestamp", "session_id", "timestamp"),
+    )
+
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     session_id = db.Column(db.String(36), db.ForeignKey("session.id"))
     sender = db.Column(db.String(10))  # "user" or "ai"
     content = db.Column(db.Text)
-    timestamp = db.Column(db.DateTime, server_default=db.func.now())
+    # Set in Python so SQLite stores microseconds; keyset cursors compare against this column
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
 
 class SequenceStep(db.Model):
     """Model representing a single step in a candidate outreach sequence.
@@ -91,8 +108,157 @@ class SequenceStep(db.Model):
     
     Relationships:
         - Belongs to a Session (many-to-one relationship)
+
+    Indexes:
+        - unique (session_id, step_number): a session has at most one step per
+          position, and the index serves every session-scoped step lookup
     """
+    __table_args__ = (
+        db.Index("uq_sequence_step_session_id_step_number", "session_id", "step_number", unique=True),
+    )
+
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     session_id = db.Column(db.String(36), db.ForeignKey("session.id"))
     step_number = db.Column(db.Integer)
     content = db.Column(db.Text)
+
+class StepContent(db.Model):
+    """Content-addressed text of a sequence step.
+
+    Every distinct step text is stored once, keyed by its SHA-256, and shared
+    by every version (in any session) that contains it. A new version therefore
+    only adds rows for the steps that actually changed.
+
+    Attributes:
+        hash (str): Primary key, hex SHA-256 of ``content``
+        content (str): The step text
+    """
+    hash = db.Column(db.String(64), primary_key=True)
+    content = db.Column(db.Text, nullable=False)
+
+class SequenceVersion(db.Model):
+    """One saved state of a session's outreach sequence.
+
+    A version lists the hashes of its steps in order (see StepContent) and
+    points at the version it was derived from, so versions form a tree that
+    undo and redo walk one edge at a time.
+
+    Attributes:
+        id (str): Primary key, UUID string
+        session_id (str): Foreign key linking to the Session model
+        version_number (int): 1, 2, ... in creation order within the session
+        parent_version (int): Version this one replaced, or None for the first
+        step_hashes (list): StepContent hashes of the steps, in order
+        operation (str): What produced the version (e.g. "revise_step")
+        created_at (datetime): When the version was saved
+
+    Relationships:
+        - Belongs to a Session (many-to-one relationship)
+
+    Indexes:
+        - unique (session_id, version_number) for history listings and lookups
+        - (session_id, parent_version) for finding the version to redo
+    """
+    __table_args__ = (
+        db.Index("uq_sequence_version_session_id_version_number", "session_id", "version_number", unique=True),
+        db.Index("ix_sequence_version_session_id_parent_version", "session_id", "parent_version"),
+    )
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    session_id = db.Column(db.String(36), db.ForeignKey("session.id"), nullable=False)
+    version_number = db.Column(db.Integer, nullable=False)
+    parent_version = db.Column(db.Integer)
+    step_hashes = db.Column(db.JSON, nullable=False)
+    operation = db.Column(db.String(50))
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+
+class SequenceHead(db.Model):
+    """Which version of a session's sequence is currently applied.
+
+    Attributes:
+        session_id (str): Primary key and foreign key linking to the Session model
+        current_version (int): Version whose steps are in SequenceStep
+        latest_version (int): Highest version number saved for the session
+    """
+    session_id = db.Column(db.String(36), db.ForeignKey("session.id"), primary_key=True)
+    current_version = db.Column(db.Integer, nullable=False)
+    latest_version = db.Column(db.Integer, nullable=False)
+
+class Profile(db.Model):
+    """A professional's public profile, kept from every search and profile lookup.
+
+    Searches are answered from this table first (see database/profiles.py),
+    through a full-text index over name, current_position, snippet and
+    search_terms: an FTS5 table on SQLite or a tsvector GIN index on Postgres,
+    created by ``ensure_profile_search_index``.
+
+    Attributes:
+        url (str): Primary key, the normalised profile URL (see
+            ``web_search.normalize_profile_url``)
+        link (str): Profile URL as returned by the search
+        name (str): Name from the search result
+        current_position (str): Where the person works now, from the snippet
+        snippet (str): Search result snippet
+        search_terms (str): The searches (query, location, company) that found
+            the profile, most recent first
+        title (str): Page title from the profile lookup
+        content (str): Profile text from the profile lookup
+        updated_at (datetime): When a search last returned the profile
+        details_fetched_at (datetime): When title and content were looked up
+    """
+    url = db.Column(db.String(255), primary_key=True)
+    link = db.Column(db.String(500), nullable=False)
+    name = db.Column(db.String(200))
+    current_position = db.Column(db.Text)
+    snippet = db.Column(db.Text)
+    search_terms = db.Column(db.Text)
+    title = db.Column(db.String(500))
+    content = db.Column(db.Text)
+    updated_at = db.Column(db.DateTime)
+    details_fetched_at = db.Column(db.DateTime)
+
+class Job(db.Model):
+    """A unit of background work, such as one chat turn, queued for the worker pool.
+
+    Jobs live in the database so queued and interrupted work survives a
+    process restart (see services/jobs.py).
+
+    Attributes:
+        id (str): Primary key, UUID string
+        session_id (str): Foreign key linking to the Session model
+        kind (str): Name of the registered handler that runs the job (e.g. "chat")
+        priority (int): Lower runs first (see JOB_PRIORITIES)
+        status (str): "queued", "running", "succeeded" or "failed"
+        payload (dict): Handler arguments
+        result (dict): Handler return value once the job succeeded
+        error (str): Error message once the job failed
+        attempts (int): How many times a worker has started the job
+        worker (str): "host:pid" of the process running the job
+        created_at (datetime): When the job was submitted
+        started_at (datetime): When the latest attempt started
+        finished_at (datetime): When the job succeeded or failed
+
+    Relationships:
+        - Belongs to a Session (many-to-one relationship)
+
+    Indexes:
+        - (status, priority, created_at) for loading the queue in run order
+    """
+    __table_args__ = (
+        db.Index("ix_job_status_priority_created_at", "status", "priority", "created_at"),
+    )
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    session_id = db.Column(db.String(36), db.ForeignKey("session.id"), nullable=False)
+    kind = db.Column(db.String(50), nullable=False)
+    priority = db.Column(db.Integer, nullable=False, default=5)
+    status = db.Column(db.String(20), nullable=False, default="queued")
+    payload = db.Column(db.JSON)
+    result = db.Column(db.JSON)
+    error = db.Column(db.Text)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    worker = db.Column(db.String(100))
+    # Set in Python so jobs submitted within one second still run in submission order
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
@@ -0,0 +1,75 @@
+import base64
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+def encode_cursor(timestamp: datetime, row_id: str) -> str:
+    """Encode a (timestamp, id) keyset position as an opaque URL-safe string."""
+    raw = f"{timestamp.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple:
+    """Decode a cursor produced by :func:`encode_cursor` into (timestamp, id)."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(timestamp), row_id
+    except Exception:
+        raise InvalidCursor(f"Invalid cursor: {cursor}")
+
+def parse_limit(value: Optional[str]) -> int:
+    """Parse a ``limit`` query parameter, clamped to 1..MAX_PAGE_SIZE."""
+    if value is None:
+        return DEFAULT_PAGE_SIZE
+    try:
+        return max(1, min(int(value), MAX_PAGE_SIZE))
+    except ValueError:
+        raise InvalidCursor(f"Invalid limit: {value}")
+
+def keyset_page(query, timestamp_column, id_column, limit: int,
+                before: Optional[str] = None, after: Optional[str] = None) -> tuple:
+    """Fetch one page of ``query`` using keyset pagination on (timestamp, id).
+
+    Rows are addressed by their (timestamp, id) position, so every page is a
+    single indexed range scan of at most ``limit + 1`` rows no matter how deep
+    into the history it is.
+
+    Args:
+        query: Base query, already filtered (e.g. by session)
+        timestamp_column: Column giving the chronological order
+        id_column: Unique column used to break timestamp ties
+        limit (int): Maximum number of rows to return
+        before (Optional[str]): Cursor; return the newest rows strictly older than it
+        after (Optional[str]): Cursor; return the oldest rows strictly newer than it.
+            Ignored if ``before`` is given. With neither, the newest rows are returned.
+
+    Returns:
+        tuple: (rows in chronological order, whether more rows exist in the
+        direction of travel)
+    """
+    if before:
+        timestamp, row_id = decode_cursor(before)
+        query = query.filter(or_(
+            timestamp_column < timestamp,
+            and_(timestamp_column == timestamp, id_column < row_id)
+        ))
+    elif after:
+        timestamp, row_id = decode_cursor(after)
+        query = query.filter(or_(
+            timestamp_column > timestamp,
+            and_(timestamp_column == timestamp, id_column > row_id)
+        ))
+
+    if after and not before:
+        rows = query.order_by(timestamp_column, id_column).limit(limit + 1).all()
+        return rows[:limit], len(rows) > limit
+
+    rows = query.order_by(timestamp_column.desc(), id_column.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    return list(reversed(rows[:limit])), has_more
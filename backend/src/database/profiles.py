@@ -0,0 +1,178 @@
+import os
+import re
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import column, delete, insert, select, table, text
+from sqlalchemy.exc import OperationalError
+from database.db import db
+from database.models import Profile
+
+# Stored profiles older than this are left out of local search until a network search refreshes them
+PROFILE_MAX_AGE = float(os.getenv("PROFILE_MAX_AGE", str(30 * 86400)))
+# Searches remembered per profile in ``Profile.search_terms``
+PROFILE_SEARCH_TERMS = 20
+
+# Full-text index over stored profiles; see ensure_profile_search_index
+FTS_TABLE = "profile_fts"
+FTS_COLUMNS = ("name", "current_position", "snippet", "search_terms")
+POSTGRES_DOCUMENT = (
+    "to_tsvector('english', coalesce(name, '') || ' ' || coalesce(current_position, '') || ' ' || "
+    "coalesce(snippet, '') || ' ' || coalesce(search_terms, ''))"
+)
+# Words not worth requiring in a match
+STOPWORDS = {"a", "an", "and", "at", "for", "in", "of", "on", "or", "the", "to", "with"}
+
+profile_fts = table(FTS_TABLE, column("url"), *(column(name) for name in FTS_COLUMNS))
+
+# Engine URL -> "fts5", "tsvector" or None, recorded by ensure_profile_search_index
+_search_backends: Dict[str, Optional[str]] = {}
+
+def ensure_profile_search_index() -> Optional[str]:
+    """Create the full-text index over stored profiles if the database supports one.
+
+    SQLite gets an FTS5 table (porter-stemmed) that :func:`store_profiles`
+    keeps in step with the profile table; Postgres gets a GIN index on a
+    tsvector of the same columns. Without either, local search falls back to
+    LIKE. Safe to run on every start-up; must be called inside an
+    application context.
+
+    Returns:
+        Optional[str]: "fts5", "tsvector" or None
+    """
+    backend = None
+    dialect = db.engine.dialect.name
+    with db.engine.begin() as connection:
+        if dialect == "sqlite":
+            try:
+                connection.exec_driver_sql(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                    f"url UNINDEXED, {', '.join(FTS_COLUMNS)}, tokenize='porter unicode61')"
+                )
+                backend = "fts5"
+            except OperationalError as e:
+                print(f"FTS5 unavailable, local profile search will use LIKE: {str(e)}")
+        elif dialect == "postgresql":
+            connection.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS ix_profile_search ON profile USING GIN ({POSTGRES_DOCUMENT})")
+            backend = "tsvector"
+    _search_backends[str(db.engine.url)] = backend
+    return backend
+
+def _search_backend() -> Optional[str]:
+    return _search_backends.get(str(db.engine.url))
+
+def _search_words(terms: str) -> List[str]:
+    return [word for word in re.findall(r"\w+", terms.lower()) if word not in STOPWORDS]
+
+def _merge_terms(existing: Optional[str], search_terms: str) -> str:
+    terms = [search_terms] + [term for term in (existing or "").split("\n") if term and term != search_terms]
+    return "\n".join(terms[:PROFILE_SEARCH_TERMS])
+
+def _profile_dict(row) -> dict:
+    return {
+        "name": row.name,
+        "link": row.link,
+        "snippet": row.snippet or "",
+        "source": "LinkedIn",
+        "type": "profile",
+        "current_position": row.current_position or ""
+    }
+
+def store_profiles(profiles: List[dict], search_terms: str) -> None:
+    """Save search results, adding ``search_terms`` to the searches that found each.
+
+    Args:
+        profiles (List[dict]): Professionals from ``search_professionals``,
+            each with ``url`` set to its normalised profile URL
+        search_terms (str): The search that returned them (query, location, company)
+    """
+    rows = {}
+    for profile in profiles:
+        rows.setdefault(profile["url"], profile)
+    if not rows:
+        return
+
+    now = datetime.utcnow()
+    existing = {p.url: p for p in db.session.scalars(select(Profile).where(Profile.url.in_(list(rows))))}
+    for url, row in rows.items():
+        profile = existing.get(url)
+        if profile is None:
+            profile = Profile(url=url)
+            db.session.add(profile)
+        profile.link = row["link"]
+        profile.name = row.get("name")
+        profile.current_position = row.get("current_position")
+        profile.snippet = row.get("snippet")
+        profile.search_terms = _merge_terms(profile.search_terms, search_terms)
+        profile.updated_at = now
+    db.session.flush()
+
+    if _search_backend() == "fts5":
+        saved = list(existing.values()) + [db.session.get(Profile, url) for url in rows if url not in existing]
+        db.session.execute(delete(profile_fts).where(profile_fts.c.url.in_(list(rows))))
+        db.session.execute(insert(profile_fts), [
+            {"url": p.url, **{name: getattr(p, name) or "" for name in FTS_COLUMNS}} for p in saved
+        ])
+    db.session.commit()
+
+def search_stored_profiles(terms: str, limit: int = 25, max_age: float = PROFILE_MAX_AGE) -> List[dict]:
+    """Stored profiles matching every word of ``terms``, best match first.
+
+    Words are stemmed ("managers" finds "manager") and may match any indexed
+    column, including the searches that found the profile before.
+
+    Returns:
+        List[dict]: Professionals shaped like ``search_professionals`` results
+    """
+    words = _search_words(terms)
+    if not words:
+        return []
+    since = datetime.utcnow() - timedelta(seconds=max_age)
+    backend = _search_backend()
+
+    if backend == "fts5":
+        query = text(
+            f"SELECT p.name, p.link, p.snippet, p.current_position FROM {FTS_TABLE} f "
+            f"JOIN profile p ON p.url = f.url "
+            f"WHERE {FTS_TABLE} MATCH :match AND p.updated_at >= :since ORDER BY f.rank LIMIT :limit"
+        )
+        params = {"match": " ".join(f'"{word}"' for word in words)}
+    elif backend == "tsvector":
+        query = text(
+            f"SELECT name, link, snippet, current_position FROM profile "
+            f"WHERE {POSTGRES_DOCUMENT} @@ plainto_tsquery('english', :match) AND updated_at >= :since "
+            f"ORDER BY ts_rank({POSTGRES_DOCUMENT}, plainto_tsquery('english', :match)) DESC LIMIT :limit"
+        )
+        params = {"match": " ".join(words)}
+    else:
+        document = " || ' ' || ".join(f"coalesce({column}, '')" for column in FTS_COLUMNS)
+        conditions = " AND ".join(f"lower({document}) LIKE :word{i}" for i in range(len(words)))
+        query = text(
+            f"SELECT name, link, snippet, current_position FROM profile "
+            f"WHERE {conditions} AND updated_at >= :since ORDER BY updated_at DESC LIMIT :limit"
+        )
+        params = {f"word{i}": f"%{word}%" for i, word in enumerate(words)}
+
+    rows = db.session.execute(query, {**params, "since": since, "limit": limit}).all()
+    return [_profile_dict(row) for row in rows]
+
+def get_stored_details(url: str, max_age: float = PROFILE_MAX_AGE) -> Optional[dict]:
+    """Looked-up title and content of a profile, shaped like ``get_professional_details``, if fresh."""
+    profile = db.session.get(Profile, url)
+    if not profile or not profile.details_fetched_at or not (profile.content or profile.title):
+        return None
+    if profile.details_fetched_at < datetime.utcnow() - timedelta(seconds=max_age):
+        return None
+    return {"url": profile.link, "content": profile.content or "", "title": profile.title or ""}
+
+def store_details(url: str, details: dict) -> None:
+    """Save the result of a profile lookup; empty lookups are not kept."""
+    if not (details.get("content") or details.get("title")):
+        return
+    profile = db.session.get(Profile, url)
+    if profile is None:
+        profile = Profile(url=url, link=details["url"])
+        db.session.add(profile)
+    profile.title = details.get("title")
+    profile.content = details.get("content")
+    profile.details_fetched_at = datetime.utcnow()
+    db.session.commit()
@@ -0,0 +1,23 @@
+from typing import Optional
+from sqlalchemy import delete, select
+from database.db import db
+from database.models import Job, Message, SequenceStep, Session, User
+from database.sequences import delete_history
+
+def get_session_user(session_id: str) -> Optional[User]:
+    """The user owning ``session_id``, in one query, or None if the session does not exist."""
+    return db.session.scalars(
+        select(User).join(Session, Session.user_id == User.id).where(Session.id == session_id)
+    ).first()
+
+def delete_session_rows(session_id: str) -> bool:
+    """Delete a session and everything belonging to it without loading any rows; the caller commits.
+
+    Returns:
+        bool: Whether the session existed
+    """
+    for model in (Message, SequenceStep, Job):
+        db.session.execute(delete(model).where(model.session_id == session_id))
+    delete_history(session_id)
+    deleted = db.session.execute(delete(Session).where(Session.id == session_id))
+    return deleted.rowcount > 0
@@ -0,0 +1,188 @@
+import hashlib
+from typing import List, Optional
+from sqlalchemy import delete, insert, select
+from database.db import db
+from database.models import SequenceHead, SequenceStep, SequenceVersion, StepContent
+
+def content_hash(content: str) -> str:
+    """Address of a step's text in the StepContent store."""
+    return hashlib.sha256(content.encode()).hexdigest()
+
+def get_sequence(session_id: str) -> List[dict]:
+    """Return a session's steps as ``{"step_number", "content"}`` dicts, in order."""
+    rows = (
+        db.session.query(SequenceStep.step_number, SequenceStep.content)
+        .filter(SequenceStep.session_id == session_id)
+        .order_by(SequenceStep.step_number)
+        .all()
+    )
+    return [{"step_number": step_number, "content": content} for step_number, content in rows]
+
+def current_version(session_id: str) -> Optional[int]:
+    """Version number of the session's current sequence, or None if it was never saved."""
+    return db.session.scalar(select(SequenceHead.current_version).where(SequenceHead.session_id == session_id))
+
+def _write_steps(session_id: str, sequence: List[dict]) -> None:
+    """Swap the session's SequenceStep rows for ``sequence``; the caller commits."""
+    db.session.execute(delete(SequenceStep).where(SequenceStep.session_id == session_id))
+    if sequence:
+        db.session.execute(insert(SequenceStep), [dict(step, session_id=session_id) for step in sequence])
+
+def _insert_ignoring_duplicates(model):
+    """INSERT that skips rows whose primary key already exists (e.g. written concurrently)."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return insert(model)
+    return dialect_insert(model).on_conflict_do_nothing()
+
+def _store_contents(contents: List[str]) -> List[str]:
+    """Save any step texts not stored yet and return the hash of each, in order."""
+    hashes = [content_hash(content) for content in contents]
+    unique = dict(zip(hashes, contents))
+    if unique:
+        existing = set(db.session.scalars(select(StepContent.hash).where(StepContent.hash.in_(list(unique)))))
+        missing = [{"hash": h, "content": content} for h, content in unique.items() if h not in existing]
+        if missing:
+            db.session.execute(_insert_ignoring_duplicates(StepContent), missing)
+    return hashes
+
+def _record_version(session_id: str, hashes: List[str], operation: str) -> int:
+    """Add a version derived from the current one and make it current; the caller commits."""
+    head = db.session.get(SequenceHead, session_id, with_for_update=True)
+    number = head.latest_version + 1 if head else 1
+    db.session.add(SequenceVersion(
+        session_id=session_id,
+        version_number=number,
+        parent_version=head.current_version if head else None,
+        step_hashes=hashes,
+        operation=operation
+    ))
+    if head:
+        head.current_version = head.latest_version = number
+    else:
+        db.session.add(SequenceHead(session_id=session_id, current_version=number, latest_version=number))
+    return number
+
+def replace_sequence(session_id: str, contents: List[str], operation: str = "edit") -> List[dict]:
+    """Replace every step of a session's sequence in a single transaction.
+
+    The old rows are removed with one DELETE and the new ones written with one
+    bulk INSERT, then committed together with a new SequenceVersion, so other
+    readers see either the old sequence or the new one and never an empty or
+    half-written one. Steps are numbered 1..n in the order given.
+
+    Args:
+        session_id (str): The unique identifier of the chat session
+        contents (List[str]): Text of each step, in order
+        operation (str): Recorded on the version, e.g. the tool that made the change
+
+    Returns:
+        List[dict]: The saved steps as ``{"step_number", "content"}`` dicts,
+        built from the input rather than read back from the database
+
+    Raises:
+        sqlalchemy.exc.SQLAlchemyError: If the write fails; the transaction is
+            rolled back and the previous sequence is kept
+    """
+    sequence = [
+        {"step_number": number, "content": content.strip()}
+        for number, content in enumerate(contents, start=1)
+    ]
+    try:
+        _write_steps(session_id, sequence)
+        _record_version(session_id, _store_contents([step["content"] for step in sequence]), operation)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return sequence
+
+def restore_version(session_id: str, version_number: int) -> Optional[dict]:
+    """Make an earlier (or later) saved version the session's current sequence.
+
+    Only the cursor moves: no version is added, so undo and redo keep working
+    from the restored point. The steps come from the content store, so this is
+    a few indexed reads and one rewrite of the session's steps.
+
+    Returns:
+        Optional[dict]: ``{"version": int, "sequence": list}``, or None if the
+        session has no such version
+    """
+    version = SequenceVersion.query.filter_by(session_id=session_id, version_number=version_number).first()
+    if version is None:
+        return None
+
+    texts = dict(db.session.execute(
+        select(StepContent.hash, StepContent.content).where(StepContent.hash.in_(set(version.step_hashes)))
+    ).all())
+    sequence = [
+        {"step_number": number, "content": texts[h]}
+        for number, h in enumerate(version.step_hashes, start=1)
+    ]
+    try:
+        _write_steps(session_id, sequence)
+        db.session.get(SequenceHead, session_id, with_for_update=True).current_version = version_number
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return {"version": version_number, "sequence": sequence}
+
+def undo_sequence(session_id: str) -> Optional[dict]:
+    """Go back to the version the current one was made from; None if there is none."""
+    head = db.session.get(SequenceHead, session_id)
+    if head is None:
+        return None
+    parent = db.session.scalar(
+        select(SequenceVersion.parent_version)
+        .where(SequenceVersion.session_id == session_id, SequenceVersion.version_number == head.current_version)
+    )
+    return restore_version(session_id, parent) if parent is not None else None
+
+def redo_sequence(session_id: str) -> Optional[dict]:
+    """Re-apply the newest version made from the current one; None if there is none."""
+    head = db.session.get(SequenceHead, session_id)
+    if head is None:
+        return None
+    child = db.session.scalar(
+        select(SequenceVersion.version_number)
+        .where(SequenceVersion.session_id == session_id, SequenceVersion.parent_version == head.current_version)
+        .order_by(SequenceVersion.version_number.desc())
+        .limit(1)
+    )
+    return restore_version(session_id, child) if child is not None else None
+
+def sequence_history(session_id: str, limit: int) -> dict:
+    """List a session's newest ``limit`` versions and which one is current."""
+    head = db.session.get(SequenceHead, session_id)
+    versions = (
+        SequenceVersion.query.filter_by(session_id=session_id)
+        .order_by(SequenceVersion.version_number.desc())
+        .limit(limit)
+        .all()
+    )
+    return {
+        "current_version": head.current_version if head else None,
+        "versions": [
+            {
+                "version": version.version_number,
+                "parent_version": version.parent_version,
+                "operation": version.operation,
+                "step_count": len(version.step_hashes),
+                "created_at": version.created_at.isoformat() if version.created_at else None
+            }
+            for version in versions
+        ]
+    }
+
+def delete_history(session_id: str) -> None:
+    """Remove a session's versions and cursor; the caller commits.
+
+    StepContent rows are shared between sessions and are left in place.
+    """
+    db.session.execute(delete(SequenceHead).where(SequenceHead.session_id == session_id))
+    db.session.execute(delete(SequenceVersion).where(SequenceVersion.session_id == session_id))
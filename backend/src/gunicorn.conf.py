@@ -0,0 +1,17 @@
+# gunicorn.conf.py
+# Usage (from backend/src): gunicorn -c gunicorn.conf.py "serve:app"
+import os
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '5001')}"
+
+# gevent worker with WebSocket support; each connection is a greenlet
+worker_class = "geventwebsocket.gunicorn.workers.GeventWebSocketWorker"
+
+# More than one worker needs SOCKETIO_MESSAGE_QUEUE (e.g. redis://...) so emits
+# reach clients on every worker, and a sticky load balancer for long-polling clients
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+worker_connections = int(os.getenv("WORKER_CONNECTIONS", "1000"))
+
+# Model calls can take a minute; don't let gunicorn kill busy workers
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
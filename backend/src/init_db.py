@@ -1,9 +1,12 @@
 from app import create_app
 from database.db import db
 from database import models
+from database.migrations import ensure_indexes, normalize_timestamps
 
 app = create_app()
 
 with app.app_context():
     db.create_all()
+    ensure_indexes()
+    normalize_timestamps()
     print("Database tables created.")
@@ -1,8 +1,13 @@
 # run.py
+import os
 from socketio_instance import socketio
 from app import create_app
+from services.jobs import job_queue
 
 app = create_app()
 
 if __name__ == "__main__":
+    # The reloader's parent process only watches files; the child it spawns serves and runs jobs
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        job_queue.start(app)
     socketio.run(app, port=5001, debug=True)
@@ -0,0 +1,42 @@
+# serve.py
+"""Production entry point: Flask-SocketIO on gevent.
+
+Every request and Socket.IO connection runs on a greenlet instead of an OS
+thread. Once the standard library is monkey-patched, the blocking OpenAI,
+SerpAPI and database calls yield while they wait on the network, so hundreds
+of concurrent chats share a single process without hundreds of threads.
+
+Run directly:
+    python serve.py
+
+or under gunicorn (see gunicorn.conf.py):
+    gunicorn -c gunicorn.conf.py "serve:app"
+"""
+from gevent import monkey
+
+# Must happen before anything else imports socket, ssl or threading
+monkey.patch_all()
+
+import os
+
+os.environ.setdefault("SOCKETIO_ASYNC_MODE", "gevent")
+
+if os.getenv("DATABASE_URL", "").startswith("postgres"):
+    # Make psycopg2 wait on the gevent hub instead of blocking the whole process
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
+
+from socketio_instance import socketio
+from app import create_app
+from services.jobs import job_queue
+
+app = create_app()
+# Every serving process (each gunicorn worker) runs its own job workers
+job_queue.start(app)
+
+if __name__ == "__main__":
+    socketio.run(
+        app,
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "5001"))
+    )
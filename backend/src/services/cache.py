@@ -0,0 +1,198 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+def make_key(*parts: Any) -> str:
+    """Build a stable cache key from JSON-serialisable parts."""
+    raw = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+class TTLCache:
+    """Two-tier cache with per-entry expiry.
+
+    Values must be JSON-serialisable. Lookups check an in-process LRU first and
+    then, if ``path`` is set, a SQLite file shared by every worker process on
+    the host. Hits on the persistent tier are promoted into memory. Entries are
+    stored as JSON, so callers always get a fresh copy they are free to mutate.
+
+    Args:
+        namespace (str): Separates caches sharing one SQLite file
+        ttl (float): Seconds an entry stays valid
+        max_entries (int): Size of the in-process LRU
+        path (Optional[str]): SQLite file for the persistent tier, or None to keep
+            everything in memory
+        max_disk_entries (Optional[int]): Rows kept on disk for this namespace;
+            the oldest are evicted first. Defaults to ``10 * max_entries``.
+    """
+
+    PRUNE_EVERY = 100  # writes between persistent-tier clean-ups
+
+    def __init__(self, namespace: str, ttl: float, max_entries: int = 1024,
+                 path: Optional[str] = None, max_disk_entries: Optional[int] = None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path
+        self.max_disk_entries = max_disk_entries or max_entries * 10
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self._disk_ready = False
+
+    @contextmanager
+    def _connect(self):
+        """Open a short-lived connection that commits on success and always closes."""
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_disk(self) -> bool:
+        """Create the backing table on first use; returns whether the persistent tier is usable."""
+        if self._disk_ready or not self.path:
+            return self._disk_ready
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS cache_entries ("
+                    "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                    "expires_at REAL NOT NULL, stored_at REAL NOT NULL, "
+                    "PRIMARY KEY (namespace, key))"
+                )
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS ix_cache_entries_namespace_stored_at "
+                    "ON cache_entries (namespace, stored_at)"
+                )
+            self._disk_ready = True
+        except sqlite3.Error as e:
+            logger.warning(f"Disabling persistent cache at {self.path}: {str(e)}")
+            self.path = None
+        return self._disk_ready
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for ``key``, or None on a miss or expiry."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, raw = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return json.loads(raw)
+                del self._memory[key]
+
+        row = self._disk_get(key, now)
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, *row)
+        return json.loads(row[1])
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store ``value`` under ``key`` for ``ttl`` seconds (defaults to the cache TTL)."""
+        raw = json.dumps(value)
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._remember(key, expires_at, raw)
+        self._disk_set(key, raw, expires_at)
+
+    def _remember(self, key: str, expires_at: float, raw: str) -> None:
+        """Put an entry in the in-process LRU. Caller must hold ``_lock``."""
+        self._memory[key] = (expires_at, raw)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _disk_get(self, key: str, now: float) -> Optional[tuple]:
+        if not self._init_disk():
+            return None
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT expires_at, value FROM cache_entries WHERE namespace = ? AND key = ?",
+                    (self.namespace, key)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Persistent cache read failed: {str(e)}")
+            return None
+        if row is None or row[0] <= now:
+            return None
+        return row
+
+    def _disk_set(self, key: str, raw: str, expires_at: float) -> None:
+        if not self._init_disk():
+            return
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at, stored_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (self.namespace, key, raw, expires_at, time.time())
+                )
+                self._writes += 1
+                if self._writes % self.PRUNE_EVERY == 0:
+                    self._prune(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"Persistent cache write failed: {str(e)}")
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        """Drop expired rows and keep at most ``max_disk_entries`` of the newest ones."""
+        conn.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND expires_at <= ?",
+            (self.namespace, time.time())
+        )
+        conn.execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND key NOT IN ("
+            "SELECT key FROM cache_entries WHERE namespace = ? ORDER BY stored_at DESC LIMIT ?)",
+            (self.namespace, self.namespace, self.max_disk_entries)
+        )
+
+    def clear(self) -> None:
+        """Remove every entry in this namespace from both tiers."""
+        with self._lock:
+            self._memory.clear()
+        if self._init_disk():
+            try:
+                with self._connect() as conn:
+                    conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+            except sqlite3.Error as e:
+                logger.warning(f"Persistent cache clear failed: {str(e)}")
+
+    def stats(self) -> dict:
+        """Hit/miss counters for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "namespace": self.namespace,
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
+
+def cache_path_from_env(variable: str, default: str) -> Optional[str]:
+    """Read a persistent-tier path from the environment; an empty value disables it."""
+    path = os.getenv(variable, default)
+    return path or None
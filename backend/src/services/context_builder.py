@@ -0,0 +1,197 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+from database.models import Message, SequenceStep
+from services.user_context import user_contexts
+
+# Rough token budget for chat history sent with each request. Once exceeded, the
+# oldest turns are folded into a short local summary until the history is back
+# under CONTEXT_TRIM_RATIO of the budget; trimming in chunks keeps the prompt
+# prefix unchanged for many turns, so provider-side prompt caching keeps hitting.
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "6000"))
+CONTEXT_TRIM_RATIO = float(os.getenv("CONTEXT_TRIM_RATIO", "0.75"))
+CONTEXT_CACHE_SIZE = int(os.getenv("CONTEXT_CACHE_SIZE", "256"))
+SUMMARY_CHARS_PER_TURN = 160
+SUMMARY_MAX_TURNS = 20
+
+SYSTEM_PROMPT = """
+                            You are Seeker, an AI job search assistant that helps users find and connect with potential employers and professional contacts.
+
+                            **Rules to Follow:**
+
+                            1. **Tool Usage**: Always use tools for sequence-related tasks. Never write or suggest sequence content directly.
+                            - Available tools:
+                                - `generate_sequence` (requires role) - Use for creating multi-step outreach campaigns to potential employers or networking contacts
+                                - `revise_step` (requires step number and revision instruction) - Use to refine specific messages in a sequence
+                                - `change_tone` (requires tone and session_id) - Use to adjust the overall tone of messages
+                                - `add_step` (requires step content and session_id) - Use to add follow-ups or additional messages
+                                - `generate_networking_asset` - Use for one-off requests like "write a cold email," "thank you note," or "follow-up email"
+                                - `undo_sequence_change` / `redo_sequence_change` - Use when the user wants to go back to (or forward to) a previous version of the sequence; never regenerate it for that
+                                - `search_and_analyze_professionals` - Use to find potential employers or networking contacts based on role and location
+                                - `generate_batch_outreach` - Use when the user wants outreach for several professionals at once, e.g. "write to all of them" or "draft messages for 1, 3 and 5" after a search
+
+                            2. **Clarify Intent**: If the user's request is unclear, ask a clarifying question before proceeding.
+
+                            3. **Conversational Responses**: Respond conversationally if the user's input is vague or unrelated to sequence manipulation.
+
+                            **Common Job Seeker Needs**:
+                            - Finding relevant hiring managers or team leads to contact
+                            - Crafting personalized cold outreach emails
+                            - Writing follow-up messages after job applications
+                            - Creating thank you notes after interviews
+                            - Developing networking strategies for specific companies
+
+                            **Tone Guidance**:
+                            - Technical roles → professional & direct
+                            - Creative roles → casual & expressive
+                            - Senior roles → formal & strategic
+                            - Startup companies → energetic & conversational
+                            - Enterprise companies → formal & structured
+
+                            **Your Role**: Act as a friendly, smart job search co-pilot, not a chatbot.
+
+                            **Before Responding**:
+                            - Verify that your response complies with all rules above.
+                            - Ensure you are using tools appropriately (if required).
+                            - Avoid direct content creation or unnecessary tool usage.
+                            If not compliant, revise your response before sending it.
+    """
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token plus per-message overhead)."""
+    return len(text or "") // 4 + 4
+
+class ConversationContext:
+    """Model input for one session, kept up to date as messages are added.
+
+    The messages sent to the model are laid out from most to least stable:
+
+    1. ``SYSTEM_PROMPT`` and the user's profile (shared with the tools through
+       ``user_contexts``, so a profile edit shows up on the next request)
+    2. a summary of turns dropped from the window (changes only when trimming)
+    3. the recent chat history (append-only between trims)
+    4. the current outreach sequence (read fresh on every request)
+    """
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.lock = threading.Lock()
+        self.prefix = [{"role": "system", "content": SYSTEM_PROMPT}]
+        self.turns = []
+        self.history_tokens = 0
+        self.message_count = -1  # not loaded yet
+        self.summary_lines = []
+        self.dropped_count = 0
+
+    def load(self) -> None:
+        """(Re)build the context from the database."""
+        self.turns = []
+        self.history_tokens = 0
+        self.message_count = 0
+        self.summary_lines = []
+        self.dropped_count = 0
+        past_messages = Message.query.filter_by(session_id=self.session_id).order_by(Message.timestamp).all()
+        for msg in past_messages:
+            self.append(msg.sender, msg.content)
+
+    def append(self, sender: str, content: str) -> None:
+        role = "user" if sender == "user" else "assistant"
+        tokens = estimate_tokens(content)
+        self.turns.append({"role": role, "content": content, "tokens": tokens})
+        self.history_tokens += tokens
+        self.message_count += 1
+        if self.history_tokens > CONTEXT_TOKEN_BUDGET:
+            self._trim()
+
+    def _trim(self) -> None:
+        """Fold the oldest turns into the summary until the history fits again."""
+        target = int(CONTEXT_TOKEN_BUDGET * CONTEXT_TRIM_RATIO)
+        while self.history_tokens > target and len(self.turns) > 1:
+            turn = self.turns.pop(0)
+            self.history_tokens -= turn["tokens"]
+            self.dropped_count += 1
+            if turn["role"] == "user":
+                text = " ".join(turn["content"].split())
+                if len(text) > SUMMARY_CHARS_PER_TURN:
+                    text = text[:SUMMARY_CHARS_PER_TURN].rstrip() + "..."
+                self.summary_lines.append(f"- {text}")
+        # Keep only the most recent requests in the summary
+        self.summary_lines = self.summary_lines[-SUMMARY_MAX_TURNS:]
+
+    def build_messages(self) -> list:
+        messages = [dict(m) for m in self.prefix]
+        profile = user_contexts.for_session(self.session_id)
+        if profile:
+            messages.append(dict(profile.system_message))
+        if self.dropped_count:
+            summary = f"Earlier in this conversation ({self.dropped_count} messages omitted), the user asked for:\n"
+            summary += "\n".join(self.summary_lines)
+            messages.append({"role": "system", "content": summary})
+        messages.extend({"role": t["role"], "content": t["content"]} for t in self.turns)
+
+        # Inject current sequence into context (if any)
+        sequence_steps = SequenceStep.query.filter_by(session_id=self.session_id).order_by(SequenceStep.step_number).all()
+        if sequence_steps:
+            sequence_text = "\n\n".join(
+                [f"Step {step.step_number}: {step.content}" for step in sequence_steps]
+            )
+            messages.append({
+                "role": "system",
+                "content": f"Here is the current outreach sequence for context:\n\n{sequence_text}"
+            })
+        return messages
+
+class ContextCache:
+    """LRU cache of :class:`ConversationContext` objects keyed by session id.
+
+    Messages written by this process are appended with :meth:`record_message`.
+    Before each use the cached message count is checked against the database
+    (one indexed ``COUNT``), so writes from other processes trigger a rebuild
+    instead of serving a stale history.
+    """
+
+    def __init__(self, max_sessions: int = CONTEXT_CACHE_SIZE):
+        self.max_sessions = max_sessions
+        self._contexts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, session_id: str) -> ConversationContext:
+        with self._lock:
+            context = self._contexts.get(session_id)
+            if context is None:
+                context = ConversationContext(session_id)
+                self._contexts[session_id] = context
+            self._contexts.move_to_end(session_id)
+            while len(self._contexts) > self.max_sessions:
+                self._contexts.popitem(last=False)
+            return context
+
+    def record_message(self, session_id: str, sender: str, content: str) -> None:
+        """Append a message that has just been committed for ``session_id``."""
+        with self._lock:
+            context = self._contexts.get(session_id)
+        if context is None:
+            return
+        with context.lock:
+            if context.message_count >= 0:
+                context.append(sender, content)
+
+    def build_messages(self, session_id: str) -> list:
+        """Return the messages to send to the model for ``session_id``."""
+        context = self._get(session_id)
+        with context.lock:
+            stored = Message.query.filter_by(session_id=session_id).count()
+            if stored != context.message_count:
+                context.load()
+            return context.build_messages()
+
+    def invalidate(self, session_id: Optional[str] = None) -> None:
+        """Forget one session's context, or every context if no id is given."""
+        with self._lock:
+            if session_id is None:
+                self._contexts.clear()
+            else:
+                self._contexts.pop(session_id, None)
+
+conversation_contexts = ContextCache()
@@ -0,0 +1,256 @@
+import heapq
+import itertools
+import os
+import socket
+import threading
+import traceback
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+from flask import Flask, current_app
+from sqlalchemy import and_, exists, select
+from sqlalchemy.orm import aliased
+from database.db import db
+from database.models import Job, Session
+from services.sequence_events import session_room
+from socketio_instance import socketio
+
+# Jobs run concurrently per process; the rest wait in priority order
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+# A job interrupted this many times (e.g. by restarts) is failed instead of requeued
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+# A job running this long on another host is presumed lost with its worker
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "900"))
+
+JOB_PRIORITIES = {"high": 0, "normal": 5, "low": 9}
+
+# handler(session_id, payload, report) -> result; report(event) pushes a progress event
+JobHandler = Callable[[str, dict, Callable[[dict], None]], Optional[dict]]
+
+def worker_id() -> str:
+    """Identifies this process in ``Job.worker``."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def job_to_dict(job: Job) -> dict:
+    return {
+        "job_id": job.id,
+        "session_id": job.session_id,
+        "kind": job.kind,
+        "status": job.status,
+        "result": job.result,
+        "error": job.error,
+        "attempts": job.attempts,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None
+    }
+
+class JobQueue:
+    """Durable priority queue of background jobs with a bounded worker pool.
+
+    Jobs are rows in the Job table, so the database is the queue of record;
+    each process keeps an in-memory heap of the ids it may run and claims a
+    job with a conditional update before starting it, so a job runs once even
+    when several processes load the same queue. On start, jobs left "running"
+    by a process that no longer exists are requeued (or failed after
+    ``JOB_MAX_ATTEMPTS``) and every queued job is loaded.
+
+    Jobs of one session run one at a time, in submission order: a job is
+    only claimed while no other job of its session is running and none was
+    submitted before it, and finishing a job queues its session's next one.
+    Chat turns of a session read and write the same history and sequence, so
+    they must not overlap.
+
+    Status changes go to the job's session room as ``job_updated`` and
+    handler progress as ``job_progress``.
+
+    Args:
+        workers (int): Worker threads started by :meth:`start`
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS):
+        self.workers = workers
+        self.handlers: Dict[str, JobHandler] = {}
+        self._heap = []
+        self._order = itertools.count()
+        self._condition = threading.Condition()
+        self._waiters: Dict[str, threading.Event] = {}
+        self._threads = []
+        self._app: Optional[Flask] = None
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        self.handlers[kind] = handler
+
+    def start(self, app: Flask) -> None:
+        """Recover interrupted jobs and start the worker pool for ``app``."""
+        self._app = app
+        with app.app_context():
+            self.recover()
+        with self._condition:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f"job-{len(self._threads)}", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+
+    def submit(self, kind: str, session_id: str, payload: dict, priority: str = "normal") -> dict:
+        """Save a job and queue it.
+
+        Apps with ``ASYNC_JOBS`` off (tests) run the job before returning.
+
+        Raises:
+            ValueError: Unknown job kind or priority
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if priority not in JOB_PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+
+        job = Job(session_id=session_id, kind=kind, priority=JOB_PRIORITIES[priority], payload=payload)
+        db.session.add(job)
+        db.session.commit()
+        job_id = job.id
+        self._emit_status(job)
+
+        if current_app.config["ASYNC_JOBS"]:
+            self._push(job.priority, job_id)
+        else:
+            self.run(job_id)
+        return job_to_dict(db.session.get(Job, job_id))
+
+    def wait(self, job_id: str, timeout: float) -> dict:
+        """Block until the job finishes in this process or ``timeout`` passes; return its state."""
+        with self._condition:
+            event = self._waiters.setdefault(job_id, threading.Event())
+        try:
+            job = db.session.get(Job, job_id, populate_existing=True)
+            if job.status in ("queued", "running"):
+                event.wait(timeout)
+        finally:
+            with self._condition:
+                self._waiters.pop(job_id, None)
+        return job_to_dict(db.session.get(Job, job_id, populate_existing=True))
+
+    def recover(self) -> None:
+        """Requeue jobs abandoned by dead processes and queue every waiting job."""
+        stale = datetime.utcnow() - timedelta(seconds=JOB_LEASE_SECONDS)
+        for job in Job.query.filter_by(status="running").all():
+            if not self._abandoned(job, stale):
+                continue
+            if job.attempts >= JOB_MAX_ATTEMPTS:
+                changes = {"status": "failed", "error": "Job was interrupted too many times", "finished_at": db.func.now()}
+            else:
+                changes = {"status": "queued", "worker": None}
+            # Conditional so a live worker that just finished the job keeps its result
+            Job.query.filter_by(id=job.id, status="running", worker=job.worker).update(changes, synchronize_session=False)
+            print(f"Recovered job {job.id}: {changes['status']}")  # Debug log
+        db.session.commit()
+
+        queued = db.session.query(Job.id, Job.priority).filter_by(status="queued").order_by(Job.priority, Job.created_at)
+        for job_id, priority in queued:
+            self._push(priority, job_id)
+
+    def _abandoned(self, job: Job, stale: datetime) -> bool:
+        host, _, pid = (job.worker or "").rpartition(":")
+        if host == socket.gethostname() and pid.isdigit():
+            # A restarted container often reuses the old process's pid
+            return int(pid) == os.getpid() or not process_alive(int(pid))
+        return job.started_at is None or job.started_at < stale
+
+    def _push(self, priority: int, job_id: str) -> None:
+        with self._condition:
+            heapq.heappush(self._heap, (priority, next(self._order), job_id))
+            self._condition.notify()
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                while not self._heap:
+                    self._condition.wait()
+                _, _, job_id = heapq.heappop(self._heap)
+            with self._app.app_context():
+                try:
+                    self.run(job_id)
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Error running job {job_id}: {str(e)}")
+                finally:
+                    db.session.remove()
+
+    def run(self, job_id: str) -> None:
+        """Claim and run one queued job.
+
+        Does nothing if another worker claimed it first, or if its session
+        has a job running or queued ahead of it; :meth:`_finish` queues it
+        again once its turn comes.
+        """
+        session_id = db.session.scalar(select(Job.session_id).where(Job.id == job_id))
+        if session_id is None:
+            return
+        # Claims for one session take turns on its row (Postgres; SQLite serializes writes anyway)
+        db.session.execute(select(Session.id).where(Session.id == session_id).with_for_update())
+        other = aliased(Job)
+        blocked = exists().where(
+            other.session_id == Job.session_id,
+            other.id != Job.id,
+            (other.status == "running") | and_(other.status == "queued", other.created_at < Job.created_at)
+        )
+        claimed = Job.query.filter(Job.id == job_id, Job.status == "queued", ~blocked).update({
+            "status": "running",
+            "worker": worker_id(),
+            "attempts": Job.attempts + 1,
+            "started_at": db.func.now()
+        }, synchronize_session=False)
+        db.session.commit()
+        if not claimed:
+            return
+
+        job = db.session.get(Job, job_id, populate_existing=True)
+        session_id = job.session_id
+        self._emit_status(job)
+
+        def report(event: dict) -> None:
+            socketio.emit("job_progress", {"job_id": job_id, "session_id": session_id, "event": event},
+                          to=session_room(session_id))
+
+        try:
+            result = self.handlers[job.kind](session_id, job.payload or {}, report)
+        except Exception as e:
+            db.session.rollback()
+            traceback.print_exc()
+            self._finish(job_id, status="failed", error=str(e))
+        else:
+            self._finish(job_id, status="succeeded", result=result)
+
+    def _finish(self, job_id: str, status: str, result: Optional[dict] = None, error: Optional[str] = None) -> None:
+        job = db.session.get(Job, job_id)
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = db.func.now()
+        db.session.commit()
+        self._emit_status(job)
+        with self._condition:
+            event = self._waiters.get(job_id)
+        if event:
+            event.set()
+
+        # The session's next job may have been skipped while this one ran
+        following = db.session.execute(
+            select(Job.id, Job.priority).where(Job.session_id == job.session_id, Job.status == "queued")
+            .order_by(Job.created_at).limit(1)
+        ).first()
+        if following:
+            self._push(following.priority, following.id)
+
+    def _emit_status(self, job: Job) -> None:
+        socketio.emit("job_updated", job_to_dict(job), to=session_room(job.session_id))
+
+job_queue = JobQueue()
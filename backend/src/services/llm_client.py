@@ -0,0 +1,277 @@
+import os
+import random
+import threading
+import time
+from typing import Optional
+import httpx
+import openai
+from openai import OpenAI
+from openai.types.chat import ChatCompletion
+from dotenv import load_dotenv
+from services.cache import TTLCache, cache_path_from_env, make_key
+from services.context_builder import estimate_tokens
+
+load_dotenv()
+
+# Connection pool shared by every completion in the process
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "32"))
+OPENAI_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_KEEPALIVE_CONNECTIONS", "16"))
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+
+# Per-attempt read timeout, and the default deadline for a call including retries
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "60"))
+OPENAI_DEADLINE = float(os.getenv("OPENAI_DEADLINE", "120"))
+
+# Retries on 429, 5xx and connection errors, with full-jitter exponential backoff
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "4"))
+OPENAI_BACKOFF_BASE = float(os.getenv("OPENAI_BACKOFF_BASE", "0.5"))
+OPENAI_BACKOFF_MAX = float(os.getenv("OPENAI_BACKOFF_MAX", "20"))
+
+# Admission control: concurrent requests, and estimated tokens per minute (0 = unlimited)
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "16"))
+OPENAI_TPM_LIMIT = int(os.getenv("OPENAI_TPM_LIMIT", "0"))
+
+# Completions requested with ``cache=True`` are memoized by model, prompt and
+# parameters, in memory and in a SQLite file shared by every worker on the host
+# (COMPLETION_CACHE_PATH="" keeps them in memory only).
+COMPLETION_CACHE_TTL = float(os.getenv("COMPLETION_CACHE_TTL", "604800"))
+COMPLETION_CACHE_SIZE = int(os.getenv("COMPLETION_CACHE_SIZE", "512"))
+COMPLETION_CACHE_PATH = cache_path_from_env("COMPLETION_CACHE_PATH", "completion_cache.sqlite")
+
+# Completion budget assumed for requests that do not set max_tokens
+DEFAULT_COMPLETION_TOKENS = 512
+
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError)
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a completion cannot finish (or start) before its deadline."""
+
+class TokenBudget:
+    """Token bucket refilled continuously at ``tokens_per_minute``.
+
+    Requests reserve their estimated size up front and wait until the bucket
+    holds enough tokens, which spreads bursts out instead of letting them run
+    into provider 429s.
+    """
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = tokens_per_minute
+        self.available = float(tokens_per_minute)
+        self.updated_at = time.monotonic()
+        self._condition = threading.Condition()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated_at) * self.capacity / 60)
+        self.updated_at = now
+
+    def acquire(self, tokens: int, deadline: float) -> None:
+        """Block until ``tokens`` can be spent, or raise DeadlineExceeded at ``deadline``."""
+        tokens = min(tokens, self.capacity)
+        with self._condition:
+            while True:
+                self._refill()
+                if self.available >= tokens:
+                    self.available -= tokens
+                    return
+                wait_for = (tokens - self.available) * 60 / self.capacity
+                remaining = deadline - time.monotonic()
+                if wait_for > remaining:
+                    raise DeadlineExceeded("Token budget exhausted until after the deadline")
+                self._condition.wait(wait_for)
+
+class LLMMetrics:
+    """Counters describing retries and admission delays."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.retries = 0
+            self.failures = 0
+            self.deadline_exceeded = 0
+            self.in_flight = 0
+            self.queue_wait_total = 0.0
+            self.queue_wait_max = 0.0
+            self.estimated_tokens = 0
+
+    def record(self, **deltas) -> None:
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.queue_wait_total += seconds
+            self.queue_wait_max = max(self.queue_wait_max, seconds)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "failures": self.failures,
+                "deadline_exceeded": self.deadline_exceeded,
+                "in_flight": self.in_flight,
+                "estimated_tokens": self.estimated_tokens,
+                "queue_wait_avg_ms": round(1000 * self.queue_wait_total / self.requests, 1) if self.requests else 0.0,
+                "queue_wait_max_ms": round(1000 * self.queue_wait_max, 1),
+            }
+
+metrics = LLMMetrics()
+concurrency = threading.BoundedSemaphore(OPENAI_MAX_CONCURRENCY)
+token_budget = TokenBudget(OPENAI_TPM_LIMIT) if OPENAI_TPM_LIMIT > 0 else None
+completion_cache = TTLCache("chat_completions", COMPLETION_CACHE_TTL, COMPLETION_CACHE_SIZE, COMPLETION_CACHE_PATH)
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client() -> OpenAI:
+    """Return the process-wide OpenAI client, creating it on first use.
+
+    The SDK's own retries are disabled; :func:`create_chat_completion` retries
+    with its own backoff so attempts count against the caller's deadline.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                http_client = httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=OPENAI_MAX_CONNECTIONS,
+                        max_keepalive_connections=OPENAI_KEEPALIVE_CONNECTIONS
+                    ),
+                    timeout=httpx.Timeout(OPENAI_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT)
+                )
+                _client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=http_client, max_retries=0)
+    return _client
+
+def estimate_request_tokens(kwargs: dict) -> int:
+    """Rough size of a chat completion: prompt plus the completion budget."""
+    prompt = sum(estimate_tokens(str(message.get("content") or "")) for message in kwargs.get("messages", []))
+    return prompt + (kwargs.get("max_tokens") or DEFAULT_COMPLETION_TOKENS)
+
+def backoff_delay(attempt: int, error: Exception) -> float:
+    """Seconds to wait before retry ``attempt`` (0-based).
+
+    Uses full jitter so concurrent callers that failed together do not retry
+    together, and never retries sooner than a ``Retry-After`` header asks.
+    """
+    delay = random.uniform(0, min(OPENAI_BACKOFF_MAX, OPENAI_BACKOFF_BASE * 2 ** attempt))
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            delay = max(delay, float(retry_after))
+        except ValueError:
+            pass
+    return delay
+
+def _release_after(stream, release):
+    """Yield from ``stream`` and free its concurrency slot once it is consumed or closed."""
+    try:
+        yield from stream
+    finally:
+        release()
+
+def completion_cache_key(kwargs: dict) -> str:
+    """Cache key for a request: everything sent to the model except transport options."""
+    return make_key("chat.completions", {key: value for key, value in kwargs.items() if key != "timeout"})
+
+def create_chat_completion(deadline: Optional[float] = None, cache: bool = False, **kwargs):
+    """Create a chat completion through the shared, rate-limited client.
+
+    Accepts the same keyword arguments as ``client.chat.completions.create``.
+    The call waits for a concurrency slot and token budget, then retries
+    rate limits, server errors and dropped connections with jittered
+    exponential backoff, all within one overall deadline.
+
+    Args:
+        deadline (Optional[float]): Seconds the whole call may take, including
+            queueing and retries. Defaults to ``OPENAI_DEADLINE``.
+        cache (bool): Return a stored response for an identical earlier request
+            and store this one. Use only where repeating the previous answer is
+            acceptable; ignored for streams. Stored responses come back with
+            ``from_cache`` set to True.
+        **kwargs: Passed through to the OpenAI SDK
+
+    Returns:
+        The SDK response. For ``stream=True`` an iterator of chunks; its
+        concurrency slot is held until the stream is consumed.
+
+    Raises:
+        DeadlineExceeded: If the deadline passes while queueing or between retries
+        openai.OpenAIError: The last error once retries are exhausted, or any
+            non-retryable error
+    """
+    key = completion_cache_key(kwargs) if cache and not kwargs.get("stream") else None
+    if key:
+        cached = completion_cache.get(key)
+        if cached is not None:
+            response = ChatCompletion.model_validate(cached)
+            # No API call was made; callers tracking usage must not count this one
+            response.from_cache = True
+            return response
+
+    started = time.monotonic()
+    deadline_at = started + (OPENAI_DEADLINE if deadline is None else deadline)
+    estimated = estimate_request_tokens(kwargs)
+    attempt_timeout = kwargs.pop("timeout", OPENAI_TIMEOUT)
+
+    if not concurrency.acquire(timeout=max(0.0, deadline_at - time.monotonic())):
+        metrics.record(deadline_exceeded=1)
+        raise DeadlineExceeded("Timed out waiting for an OpenAI connection slot")
+
+    released = False
+
+    def release():
+        nonlocal released
+        if not released:
+            released = True
+            metrics.record(in_flight=-1)
+            concurrency.release()
+
+    metrics.record(in_flight=1)
+    try:
+        if token_budget is not None:
+            try:
+                token_budget.acquire(estimated, deadline_at)
+            except DeadlineExceeded:
+                metrics.record(deadline_exceeded=1)
+                raise
+        metrics.record_wait(time.monotonic() - started)
+        metrics.record(requests=1, estimated_tokens=estimated)
+
+        attempt = 0
+        while True:
+            remaining = deadline_at - time.monotonic()
+            try:
+                response = get_client().chat.completions.create(
+                    **kwargs, timeout=max(0.1, min(attempt_timeout, remaining))
+                )
+                break
+            except RETRYABLE_ERRORS as e:
+                delay = backoff_delay(attempt, e)
+                if attempt >= OPENAI_MAX_RETRIES or time.monotonic() + delay >= deadline_at:
+                    metrics.record(failures=1)
+                    raise
+                attempt += 1
+                metrics.record(retries=1)
+                print(f"OpenAI call failed ({type(e).__name__}), retry {attempt} in {delay:.2f}s")
+                time.sleep(delay)
+            except Exception:
+                metrics.record(failures=1)
+                raise
+    except BaseException:
+        release()
+        raise
+
+    if kwargs.get("stream"):
+        return _release_after(response, release)
+    release()
+    if key:
+        completion_cache.set(key, response.model_dump(mode="json"))
+    return response
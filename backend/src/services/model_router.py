@@ -0,0 +1,171 @@
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+import openai
+from dotenv import load_dotenv
+from services import llm_client
+from services.llm_client import OPENAI_DEADLINE, RETRYABLE_ERRORS, DeadlineExceeded
+
+load_dotenv()
+
+class Route:
+    """How one kind of call is served.
+
+    Args:
+        models (List[str]): Fallback chain; the first model is tried first
+        params (dict): Default completion parameters (temperature, max_tokens, ...)
+    """
+
+    def __init__(self, models: List[str], params: Optional[dict] = None):
+        self.models = models
+        self.params = params or {}
+
+def models_from_env(variable: str, default: str) -> List[str]:
+    """Comma-separated model chain from ``variable``, e.g. MODEL_ROUTE_TITLE="gpt-4o-mini,gpt-4"."""
+    models = [model.strip() for model in os.getenv(variable, "").split(",") if model.strip()]
+    return models or default.split(",")
+
+# Short, fixed-format calls go to a small model; picking tools and writing
+# outreach stay on the flagship. Each chain falls back left to right.
+ROUTES: Dict[str, Route] = {
+    # Session titles: a few words from the first message
+    "title": Route(models_from_env("MODEL_ROUTE_TITLE", "gpt-4o-mini,gpt-4"), {"temperature": 0.7, "max_tokens": 10}),
+    # The short reply after tools ran
+    "ack": Route(models_from_env("MODEL_ROUTE_ACK", "gpt-4o-mini,gpt-4")),
+    # The main turn, where the model decides which tools to call
+    "tool_selection": Route(models_from_env("MODEL_ROUTE_TOOL_SELECTION", "gpt-4")),
+    # Sequences, networking assets and personalized outreach
+    "long_form": Route(models_from_env("MODEL_ROUTE_LONG_FORM", "gpt-4"), {"temperature": 0.7}),
+    # Revising, re-toning or adding a single step
+    "rewrite": Route(models_from_env("MODEL_ROUTE_REWRITE", "gpt-4o-mini,gpt-4"), {"temperature": 0.7}),
+}
+
+# USD per million (input, output) tokens, for the cost estimate in /metrics
+MODEL_PRICES = {
+    "gpt-4": (30.0, 60.0),
+    "gpt-4-turbo": (10.0, 30.0),
+    "gpt-4o": (2.5, 10.0),
+    "gpt-4o-mini": (0.15, 0.6),
+    "gpt-3.5-turbo": (0.5, 1.5),
+}
+
+# Errors after which the next model in the chain is tried: the model is
+# overloaded, unreachable, or not available to this API key
+FALLBACK_ERRORS = RETRYABLE_ERRORS + (openai.NotFoundError, openai.PermissionDeniedError)
+
+class RouteMetrics:
+    """Per route and model: calls, failures, fallbacks, latency, tokens and estimated cost.
+
+    Latency is the time until the response (or, for streams, the stream)
+    arrives, including queueing and retries. Token counts come from the
+    response's ``usage``; streams don't report it and only count calls.
+    Responses served from the completion cache cost nothing and only count
+    as ``cache_hits``, not as calls.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes = {}
+
+    def _entry(self, route: str, model: str) -> dict:
+        return self._routes.setdefault(route, {}).setdefault(model, {
+            "calls": 0, "cache_hits": 0, "failures": 0, "fallbacks": 0,
+            "latency_total": 0.0, "latency_max": 0.0,
+            "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0
+        })
+
+    def record_success(self, route: str, model: str, seconds: float, usage=None) -> None:
+        with self._lock:
+            entry = self._entry(route, model)
+            entry["calls"] += 1
+            entry["latency_total"] += seconds
+            entry["latency_max"] = max(entry["latency_max"], seconds)
+            if usage is not None:
+                entry["prompt_tokens"] += usage.prompt_tokens
+                entry["completion_tokens"] += usage.completion_tokens
+                input_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0))
+                entry["cost_usd"] += (usage.prompt_tokens * input_price + usage.completion_tokens * output_price) / 1_000_000
+
+    def record_cache_hit(self, route: str, model: str) -> None:
+        with self._lock:
+            self._entry(route, model)["cache_hits"] += 1
+
+    def record_failure(self, route: str, model: str, fell_back: bool) -> None:
+        with self._lock:
+            entry = self._entry(route, model)
+            entry["failures"] += 1
+            entry["fallbacks"] += int(fell_back)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                route: {
+                    model: {
+                        "calls": entry["calls"],
+                        "cache_hits": entry["cache_hits"],
+                        "failures": entry["failures"],
+                        "fallbacks": entry["fallbacks"],
+                        "latency_avg_ms": round(1000 * entry["latency_total"] / entry["calls"], 1) if entry["calls"] else 0.0,
+                        "latency_max_ms": round(1000 * entry["latency_max"], 1),
+                        "prompt_tokens": entry["prompt_tokens"],
+                        "completion_tokens": entry["completion_tokens"],
+                        "cost_usd": round(entry["cost_usd"], 6),
+                    }
+                    for model, entry in models.items()
+                }
+                for route, models in self._routes.items()
+            }
+
+route_metrics = RouteMetrics()
+
+def create_chat_completion(route: str, deadline: Optional[float] = None, cache: bool = False, **kwargs):
+    """Create a chat completion with the model and parameters of ``route``.
+
+    The route's parameters are defaults; keyword arguments override them. If
+    a model fails with one of ``FALLBACK_ERRORS`` (after the shared client's
+    own retries), the next model in the route's chain is tried with whatever
+    remains of the deadline.
+
+    Args:
+        route (str): A key of ``ROUTES``
+        deadline (Optional[float]): Seconds for the whole call, across every
+            model in the chain. Defaults to ``OPENAI_DEADLINE``.
+        cache (bool): See :func:`services.llm_client.create_chat_completion`
+        **kwargs: Passed through to the OpenAI SDK, except ``model``
+
+    Raises:
+        KeyError: Unknown route
+        DeadlineExceeded: If the deadline passes
+        openai.OpenAIError: The last model's error once the chain is exhausted
+    """
+    chain = ROUTES[route]
+    request = {**chain.params, **kwargs}
+    deadline_at = time.monotonic() + (OPENAI_DEADLINE if deadline is None else deadline)
+
+    for index, model in enumerate(chain.models):
+        started = time.monotonic()
+        remaining = deadline_at - started
+        if remaining <= 0:
+            raise DeadlineExceeded(f"No time left to try {model} for {route}")
+        try:
+            response = llm_client.create_chat_completion(deadline=remaining, cache=cache, model=model, **request)
+        except FALLBACK_ERRORS as e:
+            fall_back = index + 1 < len(chain.models)
+            route_metrics.record_failure(route, model, fell_back=fall_back)
+            if not fall_back:
+                raise
+            print(f"{model} failed for {route} ({type(e).__name__}), falling back to {chain.models[index + 1]}")
+            continue
+        except Exception:
+            route_metrics.record_failure(route, model, fell_back=False)
+            raise
+        if getattr(response, "from_cache", False):
+            route_metrics.record_cache_hit(route, model)
+        else:
+            route_metrics.record_success(route, model, time.monotonic() - started, getattr(response, "usage", None))
+        return response
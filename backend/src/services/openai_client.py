@@ -1,5 +1,5 @@
 import os
-from openai import OpenAI
+from services.model_router import create_chat_completion
 from dotenv import load_dotenv
 from agents.tools import (
     tool_definitions,
@@ -8,84 +8,163 @@ from agents.tools import (
     change_tone,
     add_step,
     generate_networking_asset,
+    undo_sequence_change,
+    redo_sequence_change,
     search_and_analyze_professionals,
-    generate_personalized_outreach
+    generate_personalized_outreach,
+    generate_batch_outreach
 )
-from database.models import SequenceStep, Session, User
+from database.db import db
+from database.sequences import get_sequence
+from flask import current_app
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
+from typing import Optional
 
 
 load_dotenv()
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Independent tool calls from one turn run concurrently on up to this many threads
+TOOL_MAX_WORKERS = int(os.getenv("TOOL_MAX_WORKERS", "4"))
 
-def chat_with_openai(messages: list, session_id: str) -> dict:
-    print(f"\nProcessing chat with session_id: {session_id}")  # Debug log
+# How the reply after a tool call is produced:
+# - "completion": a separate short completion acknowledges the tool results
+# - "inline": the tool results are appended to the original conversation and a
+#   single completion answers with full context
+# - "template": rendered locally from FOLLOW_UP_TEMPLATES, no second model call
+FOLLOW_UP_MODES = ("completion", "inline", "template")
+FOLLOW_UP_MODE = os.getenv("FOLLOW_UP_MODE", "completion")
+if FOLLOW_UP_MODE not in FOLLOW_UP_MODES:
+    print(f"Unknown FOLLOW_UP_MODE {FOLLOW_UP_MODE!r}, using 'completion'")
+    FOLLOW_UP_MODE = "completion"
+
+# Template replies, keyed by tool name. ``{result}`` is the tool's return value.
+FOLLOW_UP_TEMPLATES = {
+    "generate_sequence": "Your outreach sequence is ready! Want me to adjust the tone, revise a step, or regenerate it?",
+    "generate_networking_asset": "Your message is ready! Would you like to change the tone, fix a section, or regenerate it?",
+    "search_and_analyze_professionals": "Want me to draft personalized outreach for any of these people, dig into someone's profile, or refine the search?",
+    "generate_personalized_outreach": "Here's a personalized draft:\n\n{result}\n\nWant me to tweak it or turn it into a full outreach sequence?",
+    "generate_batch_outreach": "{result}\n\nWant me to tweak any of these or turn one into a full outreach sequence?",
+    "revise_step": "{result} Anything else you'd like to tweak?",
+    "change_tone": "{result} Anything else you'd like to adjust?",
+    "add_step": "{result} Want to revise it or add another one?",
+    "undo_sequence_change": "{result} Say redo if you want the change back.",
+    "redo_sequence_change": "{result} Anything else you'd like to adjust?",
+}
+DEFAULT_FOLLOW_UP_TEMPLATE = "{result} Anything else you'd like to explore?"
+FAILED_FOLLOW_UP_TEMPLATE = "I ran into a problem: {result} Want me to try again or take a different approach?"
+
+# Tools whose results only start like this when they succeeded
+TOOL_SUCCESS_PREFIXES = {
+    "generate_sequence": "Outreach sequence generated",
+    "generate_networking_asset": "Networking asset generated",
+    "search_and_analyze_professionals": "I found",
+    "generate_batch_outreach": "Outreach drafted",
+}
+
+# Tools that rewrite the session's sequence. They depend on each other's output,
+# so calls to them run one after another in the order the model issued them.
+SEQUENCE_TOOLS = {
+    "generate_sequence",
+    "revise_step",
+    "change_tone",
+    "add_step",
+    "generate_networking_asset",
+    "undo_sequence_change",
+    "redo_sequence_change",
+}
+
+tool_functions = {
+    "generate_sequence": generate_sequence,
+    "revise_step": revise_step,
+    "change_tone": change_tone,
+    "add_step": add_step,
+    "generate_networking_asset": generate_networking_asset,
+    "undo_sequence_change": undo_sequence_change,
+    "redo_sequence_change": redo_sequence_change,
+    "search_and_analyze_professionals": search_and_analyze_professionals,
+    "generate_personalized_outreach": generate_personalized_outreach,
+    "generate_batch_outreach": generate_batch_outreach,
+}
+
+def execute_tool(name: str, args: dict, session_id: str):
+    """Run a tool requested by the model, always scoped to the chat's session."""
+    # Always use the correct session_id from the chat endpoint
+    args["session_id"] = session_id
+
+    print(f"→ Tool called: {name}")
+    print(f"→ Arguments: {json.dumps(args, indent=2)}")
+
+    tool = tool_functions.get(name)
+    if tool is None:
+        raise ValueError(f"Unknown tool: {name}")
+    result = tool(**args)
+    print(f"Tool execution result: {result}")  # Debug log
+    return result
 
-    # Fetch the user context via the session ID
-    session = Session.query.get(session_id)
-    if session and session.user:
-        user = session.user
-        context_message = {
-            "role": "system",
-            "content": f"""
-    The user is a job seeker named {user.name} with experience as a {user.title} in the {user.industry} industry.
-    Their company background is {user.company}.
-    Do NOT ask for this information again unless explicitly requested.
+def _run_tool_group(calls: list, session_id: str) -> list:
+    """Run tool calls one after another and return one outcome dict per call."""
+    outcomes = []
+    for call in calls:
+        outcome = {"id": call["id"], "name": call["name"]}
+        try:
+            args = json.loads(call["arguments"] or "{}")
+            outcome["result"] = execute_tool(call["name"], args, session_id)
+        except Exception as e:
+            print(f"Error executing tool {call['name']}: {str(e)}")  # Debug log
+            outcome["error"] = str(e)
+        outcomes.append(outcome)
+    return outcomes
+
+def _run_tool_group_in_app(app, calls: list, session_id: str) -> list:
+    with app.app_context():
+        try:
+            return _run_tool_group(calls, session_id)
+        finally:
+            db.session.remove()
+
+def iter_tool_results(calls: list, session_id: str):
+    """Run the tool calls of one turn, yielding outcomes as they finish.
+
+    Sequence-mutating calls form a single group that runs in order; every other
+    call is its own group. With more than one group they run concurrently on a
+    pool of ``TOOL_MAX_WORKERS`` threads, each with its own app context.
+
+    Args:
+        calls (list): Dicts with ``id``, ``name`` and JSON ``arguments``
+        session_id (str): The chat's session; always overrides the model's value
+
+    Yields:
+        dict: ``{"id", "name", "result"}`` or ``{"id", "name", "error"}``
     """
-        }
-        # Inject into the second position (after the main system prompt, before chat history)
-        messages.insert(1, context_message)
-        
-    # Step 1: Send user + history messages and tool defs
-    response = client.chat.completions.create(
-        model="gpt-4",
-        messages=messages,
-        tools=tool_definitions,
-        tool_choice="auto"
-    )
+    sequence_calls = [call for call in calls if call["name"] in SEQUENCE_TOOLS]
+    groups = [[call] for call in calls if call["name"] not in SEQUENCE_TOOLS]
+    if sequence_calls:
+        groups.insert(0, sequence_calls)
 
-    message = response.choices[0].message
-    # Step 2: If tool is called, extract name + arguments
-    if message.tool_calls:
-        for tool_call in message.tool_calls:
-            name = tool_call.function.name
-            args = json.loads(tool_call.function.arguments)
-            
-            # Always use the correct session_id from the chat endpoint
-            args["session_id"] = session_id
-            
-            print(f"→ Tool called: {name}")
-            print(f"→ Arguments: {json.dumps(args, indent=2)}")
-
-            try:
-                if name == "generate_sequence":
-                    result = generate_sequence(**args)
-                elif name == "revise_step":
-                    result = revise_step(**args)
-                elif name == "change_tone":
-                    result = change_tone(**args)
-                elif name == "add_step":
-                    result = add_step(**args)
-                elif name == "generate_networking_asset":
-                    result = generate_networking_asset(**args)
-                elif name == "search_and_analyze_professionals":
-                    result = search_and_analyze_professionals(**args)
-                elif name == "generate_personalized_outreach":
-                    result = generate_personalized_outreach(**args)
-                
-                print(f"Tool execution result: {result}")  # Debug log
-            except Exception as e:
-                print(f"Error executing tool {name}: {str(e)}")  # Debug log
-                continue
+    if len(groups) <= 1:
+        for group in groups:
+            yield from _run_tool_group(group, session_id)
+        return
 
-        # After tool execution, fetch updated sequence
-        print(f"Fetching sequence for session_id: {session_id}")  # Debug log
-        steps = SequenceStep.query.filter_by(session_id=session_id).order_by(SequenceStep.step_number).all()
-        print(f"Found {len(steps)} steps for session_id: {session_id}")  # Debug log
+    app = current_app._get_current_object()
+    with ThreadPoolExecutor(max_workers=max(1, min(TOOL_MAX_WORKERS, len(groups)))) as executor:
+        futures = [executor.submit(_run_tool_group_in_app, app, group, session_id) for group in groups]
+        for future in as_completed(futures):
+            yield from future.result()
 
-        if name == "generate_sequence":
-            follow_up_prompt = """You just created an outreach sequence using the `generate_sequence` tool.
+    # The tools committed through their own sessions; don't serve stale rows from ours
+    db.session.expire_all()
+
+def run_tool_calls(calls: list, session_id: str) -> list:
+    """Run the tool calls of one turn and return their outcomes in call order."""
+    order = {call["id"]: index for index, call in enumerate(calls)}
+    return sorted(iter_tool_results(calls, session_id), key=lambda outcome: order[outcome["id"]])
+
+def get_follow_up_prompt(name: str) -> str:
+    """Return the system prompt used to acknowledge a completed tool call."""
+    if name == "generate_sequence":
+        return """You just created an outreach sequence using the `generate_sequence` tool.
 
         Now respond naturally:
         - Mention that the sequence is ready.
@@ -93,16 +172,16 @@ def chat_with_openai(messages: list, session_id: str) -> dict:
         - Don't repeat your intro or say hello.
         - Keep it short, friendly, and helpful.
         """
-        elif name == "generate_networking_asset":
-            follow_up_prompt = """You just helped the job seeker using the `generate_networking_asset` tool.
+    elif name == "generate_networking_asset":
+        return """You just helped the job seeker using the `generate_networking_asset` tool.
 
         Now respond naturally:
         - Mention that the message is ready.
         - Ask if the user wants to update the tone, fix any sections, or regenerate it.
         - Be proactive and conversational — avoid starting with 'Hi' or repeating your name.
         """
-        elif name == "search_and_analyze_professionals":
-            follow_up_prompt = """You just performed a professional search using the `search_and_analyze_professionals` tool.
+    elif name == "search_and_analyze_professionals":
+        return """You just performed a professional search using the `search_and_analyze_professionals` tool.
 
         Now respond naturally:
         - Acknowledge that you've found relevant professionals.
@@ -113,8 +192,7 @@ def chat_with_openai(messages: list, session_id: str) -> dict:
         - Keep it short and friendly.
         - Don't repeat the search results (they're already displayed).
         """
-        else:
-            follow_up_prompt = f"""You just used the `{name}` tool.
+    return f"""You just used the `{name}` tool.
 
         Respond naturally:
         - Mention what was done (e.g. revised a step, changed tone).
@@ -122,28 +200,225 @@ def chat_with_openai(messages: list, session_id: str) -> dict:
         - Keep it short and friendly.
         """
 
-        # Step 3: Send follow-up prompt to get natural response
-        follow_up_response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": follow_up_prompt},
-                {"role": "user", "content": "What happened?"}
+def build_follow_up_prompt(names: list) -> str:
+    """Combine the follow-up guidance for every tool used in a turn."""
+    if len(names) == 1:
+        return get_follow_up_prompt(names[0])
+    guidance = "\n".join(get_follow_up_prompt(name) for name in names)
+    tool_list = ", ".join(f"`{name}`" for name in names)
+    return f"""You just used several tools in one turn: {tool_list}.
+
+        Write a single short reply that covers all of them, following this guidance for each:
+        {guidance}
+        """
+
+def build_tool_exchange(calls: list, outcomes: list) -> list:
+    """The assistant tool-call message followed by one `tool` message per result."""
+    return [
+        {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": call["id"],
+                    "type": "function",
+                    "function": {"name": call["name"], "arguments": call["arguments"] or "{}"}
+                }
+                for call in calls
             ]
-        )
+        },
+        *[
+            {
+                "role": "tool",
+                "tool_call_id": outcome["id"],
+                "content": str(outcome["result"]) if "result" in outcome else f"Error: {outcome['error']}"
+            }
+            for outcome in outcomes
+        ]
+    ]
+
+def build_follow_up_messages(calls: list, outcomes: list) -> list:
+    """Messages for the acknowledgement completion, with every tool result fed back as a `tool` message."""
+    names = list(dict.fromkeys(outcome["name"] for outcome in outcomes))
+    return [
+        {"role": "system", "content": build_follow_up_prompt(names)},
+        {"role": "user", "content": "What happened?"},
+        *build_tool_exchange(calls, outcomes)
+    ]
+
+def follow_up_request(messages: list, calls: list, outcomes: list) -> dict:
+    """Completion arguments for the reply after tool calls, according to FOLLOW_UP_MODE."""
+    if FOLLOW_UP_MODE == "inline":
+        names = list(dict.fromkeys(outcome["name"] for outcome in outcomes))
+        follow_up_messages = messages + build_tool_exchange(calls, outcomes) + [
+            {"role": "system", "content": build_follow_up_prompt(names)}
+        ]
+    else:
+        follow_up_messages = build_follow_up_messages(calls, outcomes)
+    return {
+        "route": "ack",
+        "messages": follow_up_messages,
+        "tools": tool_definitions,
+        "tool_choice": "none"
+    }
+
+def render_follow_up_template(outcomes: list) -> str:
+    """Build the reply after tool calls locally from FOLLOW_UP_TEMPLATES."""
+    replies = []
+    for outcome in outcomes:
+        name = outcome["name"]
+        if "error" in outcome:
+            replies.append(FAILED_FOLLOW_UP_TEMPLATE.format(result=outcome["error"]))
+            continue
+
+        result = str(outcome["result"]).strip()
+        success_prefix = TOOL_SUCCESS_PREFIXES.get(name)
+        if success_prefix and not result.startswith(success_prefix):
+            # Unsuccessful searches are already shown verbatim ahead of the reply
+            if name != "search_and_analyze_professionals":
+                replies.append(FAILED_FOLLOW_UP_TEMPLATE.format(result=result))
+            continue
+        replies.append(FOLLOW_UP_TEMPLATES.get(name, DEFAULT_FOLLOW_UP_TEMPLATE).format(result=result))
+    return "\n\n".join(replies)
+
+def search_results_text(outcomes: list) -> str:
+    """Formatted search results from a turn, shown to the user ahead of the acknowledgement."""
+    results = [
+        outcome["result"] for outcome in outcomes
+        if outcome["name"] == "search_and_analyze_professionals" and isinstance(outcome.get("result"), str)
+    ]
+    return "\n\n".join(results)
+
+def get_sequence_snapshot(session_id: str) -> list:
+    return get_sequence(session_id)
+
+def chat_with_openai(messages: list, session_id: str) -> dict:
+    print(f"\nProcessing chat with session_id: {session_id}")  # Debug log
+
+    # Step 1: Send user + history messages and tool defs
+    response = create_chat_completion(
+        route="tool_selection",
+        messages=messages,
+        tools=tool_definitions,
+        tool_choice="auto"
+    )
+
+    message = response.choices[0].message
+    # Step 2: If tools are called, run them (independent ones concurrently)
+    if message.tool_calls:
+        calls = [
+            {"id": tool_call.id, "name": tool_call.function.name, "arguments": tool_call.function.arguments}
+            for tool_call in message.tool_calls
+        ]
+        outcomes = run_tool_calls(calls, session_id)
+
+        # After tool execution, fetch updated sequence
+        sequence_data = get_sequence_snapshot(session_id)
+
+        # Step 3: Turn every tool result into one natural response
+        if FOLLOW_UP_MODE == "template":
+            response_text = render_follow_up_template(outcomes)
+        else:
+            follow_up_response = create_chat_completion(**follow_up_request(messages, calls, outcomes))
+            response_text = follow_up_response.choices[0].message.content
 
-        sequence_data = [{"step_number": step.step_number, "content": step.content} for step in steps]
         print(f"Returning sequence data: {sequence_data}")  # Debug log
 
         # If this was a search, include the search results in the response
-        if name == "search_and_analyze_professionals":
-            return {
-                "response": result + "\n\n" + follow_up_response.choices[0].message.content,
-                "sequence": sequence_data
-            }
+        search_text = search_results_text(outcomes)
+        if search_text:
+            response_text = search_text + "\n\n" + response_text
 
         return {
-            "response": follow_up_response.choices[0].message.content,
+            "response": response_text,
             "sequence": sequence_data
         }
 
-    return {"response": message.content}
\ No newline at end of file
+    return {"response": message.content}
+
+def _stream_tokens(stream, tool_calls: Optional[dict] = None):
+    """Yield text deltas from a streamed completion.
+
+    Tool call fragments are accumulated into ``tool_calls`` (keyed by index) as
+    they arrive, since the model sends names and arguments in pieces.
+    """
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        if delta.content:
+            yield delta.content
+        if tool_calls is not None and delta.tool_calls:
+            for fragment in delta.tool_calls:
+                call = tool_calls.setdefault(fragment.index, {"id": "", "name": "", "arguments": ""})
+                if fragment.id:
+                    call["id"] = fragment.id
+                if fragment.function and fragment.function.name:
+                    call["name"] += fragment.function.name
+                if fragment.function and fragment.function.arguments:
+                    call["arguments"] += fragment.function.arguments
+
+def stream_chat_with_openai(messages: list, session_id: str):
+    """Streaming variant of :func:`chat_with_openai`.
+
+    Yields event dicts as the turn progresses so callers can forward them to the
+    client immediately:
+
+    - ``{"type": "token", "content": str}`` for every text delta
+    - ``{"type": "tool_call", "name": str, "arguments": dict}`` for every tool the
+      model requested, before any of them run
+    - ``{"type": "tool_result", "name": str, "result": str}`` as each tool finishes,
+      in completion order (``"error"`` instead of ``"result"`` if it raised)
+    - ``{"type": "done", "response": str, "sequence": list | None}`` last
+    """
+    print(f"\nStreaming chat with session_id: {session_id}")  # Debug log
+
+    tool_calls = {}
+    response_text = ""
+    stream = create_chat_completion(
+        route="tool_selection",
+        messages=messages,
+        tools=tool_definitions,
+        tool_choice="auto",
+        stream=True
+    )
+    for token in _stream_tokens(stream, tool_calls):
+        response_text += token
+        yield {"type": "token", "content": token}
+
+    if not tool_calls:
+        yield {"type": "done", "response": response_text, "sequence": None}
+        return
+
+    calls = [tool_calls[index] for index in sorted(tool_calls)]
+    for call in calls:
+        yield {"type": "tool_call", "name": call["name"], "arguments": json.loads(call["arguments"] or "{}")}
+
+    outcomes = []
+    for outcome in iter_tool_results(calls, session_id):
+        outcomes.append(outcome)
+        event = {"type": "tool_result", "name": outcome["name"]}
+        event.update({key: outcome[key] for key in ("result", "error") if key in outcome})
+        yield event
+
+    order = {call["id"]: index for index, call in enumerate(calls)}
+    outcomes.sort(key=lambda outcome: order[outcome["id"]])
+    sequence_data = get_sequence_snapshot(session_id)
+
+    # Search results are shown ahead of the acknowledgement, as in chat_with_openai
+    response_text = search_results_text(outcomes)
+    if response_text:
+        response_text += "\n\n"
+        yield {"type": "token", "content": response_text}
+
+    if FOLLOW_UP_MODE == "template":
+        reply = render_follow_up_template(outcomes)
+        response_text += reply
+        yield {"type": "token", "content": reply}
+    else:
+        follow_up_stream = create_chat_completion(**follow_up_request(messages, calls, outcomes), stream=True)
+        for token in _stream_tokens(follow_up_stream):
+            response_text += token
+            yield {"type": "token", "content": token}
+
+    yield {"type": "done", "response": response_text, "sequence": sequence_data}
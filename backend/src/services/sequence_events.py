@@ -0,0 +1,103 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+from socketio_instance import socketio
+
+# Sequence changes made within this many seconds of each other go out as one
+# update. 0 sends every change immediately.
+SEQUENCE_EMIT_DELAY = float(os.getenv("SEQUENCE_EMIT_DELAY", "0.25"))
+# Sessions whose last broadcast state is remembered for diffing; older ones get a full update
+SEQUENCE_EMIT_SESSIONS = int(os.getenv("SEQUENCE_EMIT_SESSIONS", "1024"))
+
+def session_room(session_id: str) -> str:
+    """Socket.IO room of the clients viewing one chat session."""
+    return f"session:{session_id}"
+
+def user_room(user_id: str) -> str:
+    """Socket.IO room of every client signed in as one user (e.g. their sidebars)."""
+    return f"user:{user_id}"
+
+def sequence_delta(previous: List[dict], current: List[dict]) -> List[dict]:
+    """Steps of ``current`` that are new or differ from the same position in ``previous``."""
+    return [
+        step for index, step in enumerate(current)
+        if index >= len(previous) or previous[index]["content"] != step["content"]
+    ]
+
+class SequenceBroadcaster:
+    """Coalesces sequence changes and sends each session's room a delta.
+
+    Every ``sequence_updated`` payload carries the session's sequence version.
+    Deltas also carry ``base_version``, the version the changes apply to; a
+    client whose copy is at another version should ask for a full snapshot
+    (the ``join_session`` event). Payloads are one of:
+
+    - full: ``{"session_id", "version", "sequence": [...]}``
+    - delta: ``{"session_id", "version", "base_version", "step_count",
+      "changes": [...]}``; steps past ``step_count`` were removed
+
+    Args:
+        delay (float): Debounce window in seconds
+        max_sessions (int): Sessions whose last sent state is kept for diffing
+    """
+
+    def __init__(self, delay: float = SEQUENCE_EMIT_DELAY, max_sessions: int = SEQUENCE_EMIT_SESSIONS):
+        self.delay = delay
+        self.max_sessions = max_sessions
+        self._pending = {}
+        self._sent = OrderedDict()
+        self._lock = threading.Lock()
+
+    def notify(self, session_id: str, sequence: List[dict], version: Optional[int]) -> None:
+        """Queue the session's new state; it is sent once the debounce window closes."""
+        with self._lock:
+            scheduled = session_id in self._pending
+            self._pending[session_id] = (version, [dict(step) for step in sequence])
+        if self.delay <= 0:
+            self.flush(session_id)
+        elif not scheduled:
+            socketio.start_background_task(self._flush_later, session_id)
+
+    def _flush_later(self, session_id: str) -> None:
+        socketio.sleep(self.delay)
+        self.flush(session_id)
+
+    def flush(self, session_id: str) -> None:
+        """Send the latest queued state of ``session_id``, if any."""
+        with self._lock:
+            pending = self._pending.pop(session_id, None)
+            if pending is None:
+                return
+            version, sequence = pending
+            previous = self._sent.get(session_id)
+            self._sent[session_id] = pending
+            self._sent.move_to_end(session_id)
+            while len(self._sent) > self.max_sessions:
+                self._sent.popitem(last=False)
+
+        if previous is None:
+            payload = self.snapshot(session_id, sequence, version)
+        else:
+            base_version, previous_sequence = previous
+            if base_version == version and previous_sequence == sequence:
+                return
+            payload = {
+                "session_id": session_id,
+                "version": version,
+                "base_version": base_version,
+                "step_count": len(sequence),
+                "changes": sequence_delta(previous_sequence, sequence)
+            }
+        socketio.emit("sequence_updated", payload, to=session_room(session_id))
+
+    @staticmethod
+    def snapshot(session_id: str, sequence: List[dict], version: Optional[int]) -> dict:
+        return {"session_id": session_id, "version": version, "sequence": sequence}
+
+    def forget(self, session_id: str) -> None:
+        with self._lock:
+            self._pending.pop(session_id, None)
+            self._sent.pop(session_id, None)
+
+sequence_broadcaster = SequenceBroadcaster()
@@ -0,0 +1,69 @@
+import fcntl
+import json
+import os
+from typing import Optional
+import socketio
+
+class FileQueueManager(socketio.PubSubManager):
+    """Socket.IO client manager that shares emits through an append-only file.
+
+    Every process publishes by appending one JSON line and listens by tailing
+    the file, so workers on one host can reach each other's clients with no
+    broker. It is meant for development and tests; the file is never
+    truncated, so use Redis (or another supported queue) in production.
+
+    Args:
+        url (str): ``file:///absolute/path/to/queue.log``
+        channel (str): Only lines published on this channel are delivered
+        write_only (bool): Publish without listening (for processes that
+            emit but serve no clients)
+        poll_interval (float): Seconds between checks for new lines
+    """
+
+    name = "file"
+
+    def __init__(self, url: str, channel: str = "socketio", write_only: bool = False,
+                 logger=None, poll_interval: float = 0.05):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.path = url[len("file://"):]
+        self.poll_interval = poll_interval
+        # Create the file up front so listeners can start tailing before anyone publishes
+        open(self.path, "a").close()
+
+    def _publish(self, data):
+        line = json.dumps({"channel": self.channel, "message": data}) + "\n"
+        with open(self.path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.write(line)
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _listen(self):
+        with open(self.path) as f:
+            f.seek(0, os.SEEK_END)  # only messages published from now on
+            while True:
+                position = f.tell()
+                line = f.readline()
+                if not line.endswith("\n"):
+                    # Nothing new, or a line still being written
+                    f.seek(position)
+                    self.server.sleep(self.poll_interval)
+                    continue
+                entry = json.loads(line)
+                if entry.get("channel") == self.channel:
+                    yield entry["message"]
+
+def queue_options(url: Optional[str], channel: str) -> dict:
+    """SocketIO keyword arguments for the message queue at ``url``.
+
+    ``file://`` URLs use :class:`FileQueueManager`. Anything else
+    (``redis://``, ``amqp://``, ``kafka://``, ...) is passed to Flask-SocketIO,
+    which picks the matching python-socketio manager. No URL means a single
+    process with no queue.
+    """
+    if not url:
+        return {}
+    if url.startswith("file://"):
+        return {"client_manager": FileQueueManager(url, channel=channel)}
+    return {"message_queue": url, "channel": channel}
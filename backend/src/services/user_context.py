@@ -0,0 +1,172 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession, object_session
+from database.db import db
+from database.models import User
+from database.queries import get_session_user
+
+# Formatted profiles are rebuilt after this many seconds even without a local
+# write, which bounds staleness when another worker process edits the user.
+USER_CONTEXT_TTL = float(os.getenv("USER_CONTEXT_TTL", "300"))
+USER_CONTEXT_CACHE_SIZE = int(os.getenv("USER_CONTEXT_CACHE_SIZE", "1024"))
+
+class UserContext:
+    """A job seeker's profile, formatted once for every place it is injected.
+
+    Attributes:
+        user_id (str): The user this context describes
+        preferences (dict): The user's job search preferences, used to rank search results
+        prompt_text (str): Paragraph appended to tool prompts so generated
+            messages are written from the user's perspective
+        system_message (dict): Chat message telling the assistant who the user is
+        built_at (float): ``time.monotonic()`` when the context was built
+    """
+
+    def __init__(self, user: User):
+        self.user_id = user.id
+        self.preferences = dict(user.preferences or {})
+        self.prompt_text = self._prompt_text(user)
+        self.system_message = {
+            "role": "system",
+            "content": f"""
+    The user is a job seeker named {user.name} with experience as a {user.title} in the {user.industry} industry.
+    Their company background is {user.company}.
+    Do NOT ask for this information again unless explicitly requested.
+    """
+        }
+        self.built_at = time.monotonic()
+
+    @staticmethod
+    def _prompt_text(user: User) -> str:
+        # Extract job seeker preferences
+        prefs = user.preferences or {}
+        job_types = ", ".join(prefs.get("jobTypes", []) or ["Full-time"])
+        target_companies = ", ".join(prefs.get("targetCompanies", []) or [])
+        target_locations = ", ".join(prefs.get("targetLocations", []) or [])
+        years_experience = prefs.get("yearsExperience", 0)
+        skills = ", ".join(prefs.get("skills", []) or [])
+        job_level = prefs.get("jobLevel", "")
+
+        context = f"""
+The messages should be written from {user.name}'s perspective as a {user.title} in the {user.industry} industry.
+"""
+
+        if user.company:
+            context += f"Their current or previous company is {user.company}.\n"
+
+        if years_experience:
+            context += f"They have {years_experience} years of experience.\n"
+
+        if skills:
+            context += f"Their key skills include: {skills}.\n"
+
+        if job_level:
+            context += f"They are looking for {job_level}-level positions.\n"
+
+        if job_types:
+            context += f"They are interested in {job_types} roles.\n"
+
+        if target_locations:
+            context += f"Their preferred locations are: {target_locations}.\n"
+
+        if target_companies:
+            context += f"Their target companies include: {target_companies}.\n"
+
+        return context
+
+class UserContextCache:
+    """Memoized :class:`UserContext` objects, looked up by session id.
+
+    A session never changes owner, so the session-to-user mapping is kept for
+    as long as it stays in the LRU. Contexts are stored per user, so every
+    session of a user shares one, and are dropped whenever the ``User`` row is
+    updated or deleted through the ORM (see the listeners below).
+    """
+
+    def __init__(self, max_entries: int = USER_CONTEXT_CACHE_SIZE, ttl: float = USER_CONTEXT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._session_users = OrderedDict()
+        self._contexts = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _remember(entries: OrderedDict, key: str, value, max_entries: int) -> None:
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > max_entries:
+            entries.popitem(last=False)
+
+    def for_session(self, session_id: str) -> Optional[UserContext]:
+        """Return the context of the user owning ``session_id``, or None if there is none.
+
+        Must be called inside an application context.
+        """
+        with self._lock:
+            user_id = self._session_users.get(session_id)
+        if user_id is None:
+            # Session and user in one query; for_user then finds the user in the identity map
+            user = get_session_user(session_id)
+            if user is None:
+                return None
+            user_id = user.id
+            with self._lock:
+                self._remember(self._session_users, session_id, user_id, self.max_entries)
+        return self.for_user(user_id)
+
+    def for_user(self, user_id: str) -> Optional[UserContext]:
+        """Return the context for ``user_id``, building it if missing or expired."""
+        with self._lock:
+            context = self._contexts.get(user_id)
+            if context is not None and time.monotonic() - context.built_at < self.ttl:
+                self._contexts.move_to_end(user_id)
+                return context
+
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        context = UserContext(user)
+        with self._lock:
+            self._remember(self._contexts, user_id, context, self.max_entries)
+        return context
+
+    def invalidate_user(self, user_id: str) -> None:
+        with self._lock:
+            self._contexts.pop(user_id, None)
+
+    def invalidate_session(self, session_id: str) -> None:
+        with self._lock:
+            self._session_users.pop(session_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._session_users.clear()
+            self._contexts.clear()
+
+user_contexts = UserContextCache()
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _forget_changed_user(mapper, connection, target):
+    """Drop a user's context as soon as the row is flushed, and again once committed.
+
+    The second pass covers a request on another thread rebuilding the context
+    from the old row between this flush and the commit.
+    """
+    user_contexts.invalidate_user(target.id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_user_ids", set()).add(target.id)
+
+@event.listens_for(OrmSession, "after_commit")
+def _forget_committed_users(session):
+    for user_id in session.info.pop("changed_user_ids", ()):
+        user_contexts.invalidate_user(user_id)
+
+@event.listens_for(OrmSession, "after_soft_rollback")
+def _discard_pending_invalidations(session, previous_transaction):
+    session.info.pop("changed_user_ids", None)
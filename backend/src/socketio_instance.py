@@ -1,4 +1,17 @@
 # socketio_instance.py
+import os
 from flask_socketio import SocketIO
+from services.socketio_queue import queue_options
 
-socketio = SocketIO(cors_allowed_origins="*")
+# Required when more than one worker process serves Socket.IO clients, so an
+# emit from any worker reaches clients connected to the others, e.g.
+# redis://localhost:6379/0 (or file:///tmp/helix-socketio.log on one host)
+SOCKETIO_MESSAGE_QUEUE = os.getenv("SOCKETIO_MESSAGE_QUEUE")
+SOCKETIO_CHANNEL = os.getenv("SOCKETIO_CHANNEL", "helix")
+
+# "threading" for the development server (run.py); serve.py switches to "gevent"
+socketio = SocketIO(
+    cors_allowed_origins="*",
+    async_mode=os.getenv("SOCKETIO_ASYNC_MODE", "threading"),
+    **queue_options(SOCKETIO_MESSAGE_QUEUE, SOCKETIO_CHANNEL)
+)
@@ -0,0 +1,38 @@
+from contextlib import contextmanager
+from sqlalchemy import event
+from database.db import db
+
+class QueryCounter:
+    """Records every SQL statement the app's engine executes while active.
+
+    Attributes:
+        statements (list): The statements, in execution order
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+class QueryCountMixin:
+    """``assertMaxQueries`` for unittest cases running inside an app context."""
+
+    @contextmanager
+    def assertMaxQueries(self, limit: int):
+        with QueryCounter(db.engine) as counter:
+            yield counter
+        if counter.count > limit:
+            self.fail(f"{counter.count} queries executed, expected at most {limit}:\n" + "\n".join(counter.statements))
@@ -1,8 +1,16 @@
+import json
 import unittest
+from types import SimpleNamespace
 from unittest.mock import patch
-from app import create_app
+from app import create_app, fallback_title, update_generated_title
 from database.db import db
-from database.models import Message, SequenceStep
+from database.models import User, Session, Message, SequenceStep
+from services import openai_client
+
+def stream_chunks(*tokens):
+    for token in tokens:
+        delta = SimpleNamespace(content=token, tool_calls=None)
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
 
 class ChatEndpointTestCase(unittest.TestCase):
     def setUp(self):
@@ -20,7 +28,7 @@ class ChatEndpointTestCase(unittest.TestCase):
         session_id = 99
         message = "Generate a 3-step outreach sequence for a Product Manager in SF"
 
-        res = self.client.post("/chat", json={"message": message, "session_id": session_id})
+        res = self.client.post("/chat", json={"message": message, "session_id": session_id, "wait": True})
         self.assertEqual(res.status_code, 200)
         data = res.get_json()
         self.assertIn("response", data)
@@ -42,7 +50,7 @@ class ChatEndpointTestCase(unittest.TestCase):
         # First generate a sequence
         session_id = 100
         message = "Create a sequence for a Senior Engineer in New York"
-        self.client.post("/chat", json={"message": message, "session_id": session_id})
+        self.client.post("/chat", json={"message": message, "session_id": session_id, "wait": True})
 
         # Then test the sequence endpoint
         res = self.client.get(f"/sequence/{session_id}")
@@ -62,12 +70,55 @@ class ChatEndpointTestCase(unittest.TestCase):
         session_id = 101
         message = "Generate a sequence for a UX Designer"
         
-        res = self.client.post("/chat", json={"message": message, "session_id": session_id})
+        res = self.client.post("/chat", json={"message": message, "session_id": session_id, "wait": True})
         self.assertEqual(res.status_code, 200)
         data = res.get_json()
         self.assertIn("response", data)
         # Should ask for location
         self.assertIn("location", data["response"].lower())
 
+    def test_chat_stream_sends_tokens_and_saves_reply(self):
+        with self.app.app_context():
+            user = User(name="Ishaan", title="Engineer", industry="Tech")
+            db.session.add(user)
+            db.session.commit()
+            session = Session(user_id=user.id)
+            db.session.add(session)
+            db.session.commit()
+            session_id = session.id
+
+        with patch("app.generate_chat_title", return_value="Greeting"), \
+                patch.object(openai_client, "create_chat_completion",
+                             return_value=stream_chunks("Hel", "lo!")):
+            res = self.client.post("/chat/stream", json={"message": "Hi", "session_id": session_id})
+            events = [json.loads(line) for line in res.get_data(as_text=True).splitlines()]
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([e["content"] for e in events if e["type"] == "token"], ["Hel", "lo!"])
+        self.assertEqual(events[-1], {"type": "done", "response": "Hello!", "sequence": None})
+
+        with self.app.app_context():
+            replies = Message.query.filter_by(session_id=session_id, sender="ai").all()
+            self.assertEqual([m.content for m in replies], ["Hello!"])
+
+    def test_fallback_title_is_short(self):
+        title = fallback_title("Help me write a cold email to the VP of Engineering at Stripe")
+        self.assertEqual(title, "Help me write a cold email to")
+        self.assertLessEqual(len(title), 30)
+
+    def test_generated_title_keeps_user_rename(self):
+        with self.app.app_context():
+            user = User(name="Ishaan", title="Engineer", industry="Tech")
+            db.session.add(user)
+            db.session.commit()
+            session = Session(user_id=user.id, session_title="My renamed chat")
+            db.session.add(session)
+            db.session.commit()
+
+            with patch("app.generate_chat_title", return_value="Stripe Cold Email"):
+                update_generated_title(session.id, "Help me", placeholder="Help me")
+
+            self.assertEqual(db.session.get(Session, session.id).session_title, "My renamed chat")
+
 if __name__ == "__main__":
     unittest.main()
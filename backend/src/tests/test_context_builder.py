@@ -0,0 +1,79 @@
+import unittest
+from unittest.mock import patch
+from app import create_app
+from database.db import db
+from database.models import User, Session, Message
+from services import context_builder
+from services.context_builder import ContextCache, SYSTEM_PROMPT
+
+class ContextBuilderTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(testing=True)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        user = User(name="Ishaan", title="Engineer", industry="Tech", company="SellScale")
+        db.session.add(user)
+        db.session.commit()
+        session = Session(user_id=user.id)
+        db.session.add(session)
+        db.session.commit()
+        self.session_id = session.id
+        self.cache = ContextCache()
+
+    def tearDown(self):
+        db.drop_all()
+        self.ctx.pop()
+
+    def add_message(self, sender, content, record=True):
+        db.session.add(Message(session_id=self.session_id, sender=sender, content=content))
+        db.session.commit()
+        if record:
+            self.cache.record_message(self.session_id, sender, content)
+
+    def test_prefix_layout(self):
+        self.add_message("user", "Find me PMs in SF")
+        messages = self.cache.build_messages(self.session_id)
+
+        self.assertEqual(messages[0]["content"], SYSTEM_PROMPT)
+        self.assertIn("Ishaan", messages[1]["content"])
+        self.assertEqual(messages[2], {"role": "user", "content": "Find me PMs in SF"})
+
+    def test_recorded_messages_do_not_reload_history(self):
+        self.add_message("user", "first")
+        self.cache.build_messages(self.session_id)
+
+        self.add_message("ai", "second")
+        with patch.object(context_builder.ConversationContext, "load") as load:
+            messages = self.cache.build_messages(self.session_id)
+
+        load.assert_not_called()
+        self.assertEqual(messages[-1], {"role": "assistant", "content": "second"})
+
+    def test_unrecorded_write_triggers_rebuild(self):
+        self.add_message("user", "first")
+        self.cache.build_messages(self.session_id)
+
+        # e.g. written by another worker process
+        self.add_message("ai", "from elsewhere", record=False)
+        messages = self.cache.build_messages(self.session_id)
+
+        self.assertEqual(messages[-1], {"role": "assistant", "content": "from elsewhere"})
+
+    def test_old_turns_are_summarised_once_budget_is_exceeded(self):
+        with patch.object(context_builder, "CONTEXT_TOKEN_BUDGET", 100):
+            for i in range(10):
+                self.add_message("user", f"request {i} " + "x" * 80)
+            messages = self.cache.build_messages(self.session_id)
+
+        summary = messages[2]
+        self.assertEqual(summary["role"], "system")
+        self.assertIn("messages omitted", summary["content"])
+        self.assertIn("request 0", summary["content"])
+        self.assertEqual(messages[-1]["content"], "request 9 " + "x" * 80)
+        history = [m for m in messages if m["role"] == "user"]
+        self.assertLess(len(history), 10)
+
+if __name__ == "__main__":
+    unittest.main()
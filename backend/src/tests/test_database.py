@@ -1,7 +1,12 @@
 import unittest
+from unittest.mock import patch
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
 from app import create_app
 from database.db import db
+from database.migrations import ensure_indexes
 from database.models import User, Session, Message, SequenceStep
+from database.sequences import get_sequence, replace_sequence
 
 class DatabaseTestCase(unittest.TestCase):
     def setUp(self):
@@ -38,5 +43,84 @@ class DatabaseTestCase(unittest.TestCase):
             self.assertEqual(Message.query.count(), 1)
             self.assertEqual(SequenceStep.query.count(), 1)
 
+    def test_step_numbers_are_unique_per_session(self):
+        with self.app.app_context():
+            user = User(name="Ishaan")
+            db.session.add(user)
+            db.session.commit()
+            session = Session(user_id=user.id)
+            db.session.add(session)
+            db.session.commit()
+
+            db.session.add(SequenceStep(session_id=session.id, step_number=1, content="a"))
+            db.session.add(SequenceStep(session_id=session.id, step_number=1, content="b"))
+            with self.assertRaises(IntegrityError):
+                db.session.commit()
+
+    def test_ensure_indexes_migrates_existing_database(self):
+        with self.app.app_context():
+            # Simulate a database created before the indexes existed
+            with db.engine.begin() as connection:
+                connection.execute(text("DROP INDEX uq_sequence_step_session_id_step_number"))
+                connection.execute(text("DROP INDEX ix_message_session_id_timestamp"))
+                connection.execute(text(
+                    "INSERT INTO sequence_step (id, session_id, step_number, content) VALUES "
+                    "('a', 's1', 1, 'first'), ('b', 's1', 1, 'second'), ('c', 's1', 2, 'third')"
+                ))
+
+            created = ensure_indexes()
+
+            self.assertEqual(
+                sorted(created),
+                ["ix_message_session_id_timestamp", "uq_sequence_step_session_id_step_number"]
+            )
+            names = {i["name"] for i in inspect(db.engine).get_indexes("sequence_step")}
+            self.assertIn("uq_sequence_step_session_id_step_number", names)
+            steps = SequenceStep.query.filter_by(session_id="s1").order_by(SequenceStep.step_number).all()
+            self.assertEqual([(s.step_number, s.content) for s in steps], [(1, "first"), (2, "second"), (3, "third")])
+            self.assertEqual(ensure_indexes(), [])
+
+class ReplaceSequenceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(testing=True)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        user = User(name="Ishaan")
+        db.session.add(user)
+        db.session.commit()
+        session = Session(user_id=user.id)
+        db.session.add(session)
+        db.session.commit()
+        self.session_id = session.id
+        replace_sequence(self.session_id, ["old 1", "old 2", "old 3"])
+
+    def tearDown(self):
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_replaces_all_steps_and_returns_them(self):
+        saved = replace_sequence(self.session_id, [" new 1 ", "new 2"])
+
+        self.assertEqual(saved, [{"step_number": 1, "content": "new 1"}, {"step_number": 2, "content": "new 2"}])
+        self.assertEqual(get_sequence(self.session_id), saved)
+        self.assertEqual(len({step.id for step in SequenceStep.query.all()}), 2)
+
+    def test_failed_insert_keeps_previous_sequence(self):
+        execute = db.session.execute
+        calls = []
+
+        def fail_on_insert(statement, *args, **kwargs):
+            calls.append(statement)
+            if len(calls) == 2:
+                raise RuntimeError("connection lost")
+            return execute(statement, *args, **kwargs)
+
+        with patch.object(db.session, "execute", side_effect=fail_on_insert):
+            with self.assertRaises(RuntimeError):
+                replace_sequence(self.session_id, ["new 1"])
+
+        self.assertEqual([s["content"] for s in get_sequence(self.session_id)], ["old 1", "old 2", "old 3"])
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from agents.tools.extraction import (
+    KEYWORD_SCAN_MAX, KeywordMatcher, extract_current_position, extract_profile_fields_batch, extract_years_experience,
+    skill_matcher, tokenize
+)
+
+class KeywordMatcherTestCase(unittest.TestCase):
+    def test_whole_words_and_phrases_in_keyword_order(self):
+        matcher = KeywordMatcher(["Python", "Go", "Machine Learning", "C++", "Node.js"])
+
+        found = matcher.find("Node.js and C++ at Google; machine   learning with PYTHON")
+
+        self.assertEqual(found, ["Python", "Machine Learning", "C++", "Node.js"])
+        self.assertEqual(matcher.find("Learning machines"), [])
+
+    def test_phrases_sharing_a_first_word(self):
+        matcher = KeywordMatcher(["data", "data science", "data engineering"])
+        self.assertEqual(matcher.find("Data engineering lead"), ["data", "data engineering"])
+
+    def test_batch(self):
+        matcher = KeywordMatcher(["jobs", "apply now"])
+        self.assertEqual(matcher.find_batch(["Apply now!", "Staff engineer", "Jobs at Stripe"]),
+                         [["apply now"], [], ["jobs"]])
+
+    def test_scanning_agrees_with_tokens(self):
+        keywords = ["Go", "C++", "Node.js", "Machine Learning", "front-end", "apply now"]
+        texts = [
+            "Go, C++ and node.js", "Google", "a.go and go.x", "go-to person", "machine-learning",
+            "Machine. Learning", "machine.-learning", "Front-end / APPLY   NOW", "c++17", "node.jsx",
+        ]
+        matcher = KeywordMatcher(keywords)
+        self.assertTrue(matcher.scans)
+        for text in texts:
+            self.assertEqual(matcher.find(text), matcher.find_in_tokens(tokenize(text)), text)
+
+class ProfileFieldsTestCase(unittest.TestCase):
+    def test_extracts_every_field_in_one_pass(self):
+        snippets = [
+            "Senior engineer\nCurrently leading payments at Stripe. 8+ years of experience in Go",
+            "We're hiring! Apply now",
+        ]
+
+        person, listing = extract_profile_fields_batch(snippets, skills=["Go", "Rust"], with_years=True)
+
+        self.assertEqual(person, {
+            "excluded": False,
+            "current_position": "Currently leading payments at Stripe. 8+ years of experience in Go",
+            "years_experience": 8,
+            "matched_skills": ["Go"],
+        })
+        self.assertTrue(listing["excluded"])
+
+    def test_long_skill_lists_match_on_tokens(self):
+        skills = ["Go", "Machine Learning"] + [f"Skill {i}" for i in range(KEYWORD_SCAN_MAX)]
+        self.assertFalse(skill_matcher(tuple(skills)).scans)
+
+        fields, = extract_profile_fields_batch(["Go and machine learning at Google. Hiring!"], skills)
+
+        self.assertEqual((fields["excluded"], fields["matched_skills"]), (True, ["Go", "Machine Learning"]))
+
+    def test_single_snippet_helpers(self):
+        self.assertEqual(extract_years_experience("10 yrs experience"), 10)
+        self.assertIsNone(extract_years_experience("new grad"))
+        # "that " is not "at "
+        self.assertEqual(extract_current_position("Builds things that scale"), "")
+
+if __name__ == "__main__":
+    unittest.main()
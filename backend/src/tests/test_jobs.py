@@ -0,0 +1,166 @@
+import os
+import socket
+import unittest
+from unittest.mock import patch
+from app import create_app
+from database.db import db
+from database.models import User, Session, Message, Job
+from services import jobs
+from services.jobs import JOB_MAX_ATTEMPTS, JobQueue
+
+def fake_chat_turn(messages, session_id=None):
+    yield {"type": "tool_call", "name": "generate_sequence", "arguments": {}}
+    yield {"type": "token", "content": "Done!"}
+    yield {"type": "done", "response": "Done!", "sequence": [{"step_number": 1, "content": "Hi"}]}
+
+class ChatJobTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(testing=True)
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        user = User(name="Ishaan")
+        db.session.add(user)
+        db.session.commit()
+        session = Session(user_id=user.id)
+        db.session.add(session)
+        db.session.commit()
+        self.session_id = session.id
+
+        for patcher in (patch("app.generate_chat_title", return_value="Outreach"),
+                        patch("app.stream_chat_with_openai", side_effect=fake_chat_turn)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_chat_returns_job_and_pushes_progress(self):
+        with patch.object(jobs.socketio, "emit") as emit:
+            res = self.client.post("/chat", json={"message": "Write a sequence", "session_id": self.session_id})
+
+        self.assertEqual(res.status_code, 202)
+        job = res.get_json()
+        # Tests run jobs inline, so it has already finished
+        self.assertEqual(job["status"], "succeeded")
+        self.assertEqual(job["result"]["response"], "Done!")
+
+        job_calls = [c for c in emit.call_args_list if c.args[0].startswith("job_")]
+        events = [(c.args[0], c.args[1]) for c in job_calls]
+        self.assertEqual([e[1]["status"] for e in events if e[0] == "job_updated"], ["queued", "running", "succeeded"])
+        progress = [e[1]["event"]["type"] for e in events if e[0] == "job_progress"]
+        self.assertEqual(progress, ["tool_call", "token"])
+        self.assertTrue(all(c.kwargs["to"] == f"session:{self.session_id}" for c in job_calls))
+
+        status = self.client.get(f"/jobs/{job['job_id']}").get_json()
+        self.assertEqual((status["status"], status["attempts"]), ("succeeded", 1))
+        self.assertEqual([m.sender for m in Message.query.filter_by(session_id=self.session_id)], ["user", "ai"])
+
+    def test_wait_returns_the_reply(self):
+        res = self.client.post("/chat", json={"message": "Hi", "session_id": self.session_id, "wait": True})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.get_json(), {"response": "Done!", "sequence": [{"step_number": 1, "content": "Hi"}]})
+
+    def test_failed_job_reports_error(self):
+        with patch("app.stream_chat_with_openai", side_effect=RuntimeError("model unavailable")):
+            res = self.client.post("/chat", json={"message": "Hi", "session_id": self.session_id, "wait": True})
+        self.assertEqual(res.status_code, 500)
+        self.assertEqual(res.get_json()["error"], "model unavailable")
+        self.assertEqual(Job.query.one().status, "failed")
+
+    def test_unknown_priority_is_rejected(self):
+        res = self.client.post("/chat", json={"message": "Hi", "session_id": self.session_id, "priority": "urgent"})
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(Message.query.count(), 0)
+
+    def test_unknown_job_is_404(self):
+        self.assertEqual(self.client.get("/jobs/missing").status_code, 404)
+
+class JobRecoveryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(testing=True)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        user = User(name="Ishaan")
+        db.session.add(user)
+        db.session.commit()
+        session = Session(user_id=user.id)
+        db.session.add(session)
+        db.session.commit()
+        self.session_id = session.id
+        self.queue = JobQueue()
+        self.calls = []
+        self.queue.register("chat", lambda session_id, payload, report: self.calls.append(payload) or {})
+
+    def tearDown(self):
+        db.drop_all()
+        self.ctx.pop()
+
+    def add_job(self, **fields):
+        job = Job(session_id=self.session_id, kind="chat", **fields)
+        db.session.add(job)
+        db.session.commit()
+        return job.id
+
+    def test_restart_requeues_interrupted_jobs_in_priority_order(self):
+        # A previous incarnation of this process (same host and pid after a container restart)
+        this_process = f"{socket.gethostname()}:{os.getpid()}"
+        interrupted = self.add_job(status="running", worker=this_process, attempts=1, priority=5)
+        exhausted = self.add_job(status="running", worker=this_process, attempts=JOB_MAX_ATTEMPTS)
+        elsewhere = self.add_job(status="running", worker="other-host:1", attempts=1, started_at=db.func.now())
+        urgent = self.add_job(status="queued", priority=0)
+        background = self.add_job(status="queued", priority=9)
+
+        self.queue.recover()
+
+        self.assertEqual(db.session.get(Job, interrupted).status, "queued")
+        self.assertEqual(db.session.get(Job, exhausted).status, "failed")
+        self.assertEqual(db.session.get(Job, elsewhere).status, "running")
+        queued = [job_id for _, _, job_id in sorted(self.queue._heap)]
+        self.assertEqual(queued, [urgent, interrupted, background])
+
+    def test_job_runs_once(self):
+        job_id = self.add_job(status="queued", payload={"message": "Hi"})
+        with patch.object(jobs.socketio, "emit"):
+            self.queue.run(job_id)
+            self.queue.run(job_id)
+        self.assertEqual(self.calls, [{"message": "Hi"}])
+        self.assertEqual(db.session.get(Job, job_id).status, "succeeded")
+
+    def test_jobs_of_one_session_run_one_at_a_time_in_order(self):
+        first = self.add_job(status="queued", payload={"message": "first"}, priority=9)
+        second = self.add_job(status="queued", payload={"message": "second"}, priority=0)
+        with patch.object(jobs.socketio, "emit"):
+            # A higher priority does not let a later message overtake an earlier one
+            self.queue.run(second)
+            self.assertEqual(db.session.get(Job, second, populate_existing=True).status, "queued")
+
+            self.queue.run(first)
+            # Finishing the first job queues the session's next one
+            self.assertEqual([job_id for _, _, job_id in self.queue._heap], [second])
+            self.queue.run(second)
+
+        self.assertEqual(self.calls, [{"message": "first"}, {"message": "second"}])
+
+    def test_running_job_blocks_its_session_only(self):
+        self.add_job(status="running", worker="other-host:1")
+        waiting = self.add_job(status="queued", payload={"message": "waiting"})
+        other_session = Session(user_id=db.session.get(Session, self.session_id).user_id)
+        db.session.add(other_session)
+        db.session.commit()
+        elsewhere = Job(session_id=other_session.id, kind="chat", payload={"message": "elsewhere"})
+        db.session.add(elsewhere)
+        db.session.commit()
+
+        with patch.object(jobs.socketio, "emit"):
+            self.queue.run(waiting)
+            self.queue.run(elsewhere.id)
+
+        self.assertEqual(self.calls, [{"message": "elsewhere"}])
+        self.assertEqual(db.session.get(Job, waiting, populate_existing=True).status, "queued")
+
+if __name__ == "__main__":
+    unittest.main()
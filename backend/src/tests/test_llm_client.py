@@ -0,0 +1,120 @@
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+import httpx
+import openai
+from openai.types.chat import ChatCompletion
+from services import llm_client
+from services.cache import TTLCache
+
+def rate_limit_error(retry_after=None):
+    headers = {"retry-after": retry_after} if retry_after else {}
+    response = httpx.Response(429, headers=headers, request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+    return openai.RateLimitError("rate limited", response=response, body=None)
+
+class CreateChatCompletionTestCase(unittest.TestCase):
+    def setUp(self):
+        llm_client.metrics.reset()
+        self.client = MagicMock()
+        patcher = patch.object(llm_client, "get_client", return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        sleep = patch.object(llm_client.time, "sleep")
+        self.sleep = sleep.start()
+        self.addCleanup(sleep.stop)
+
+    def test_retries_rate_limits_then_succeeds(self):
+        self.client.chat.completions.create.side_effect = [rate_limit_error(), rate_limit_error(), "ok"]
+
+        result = llm_client.create_chat_completion(model="gpt-4", messages=[{"role": "user", "content": "hi"}])
+
+        self.assertEqual(result, "ok")
+        self.assertEqual(self.client.chat.completions.create.call_count, 3)
+        stats = llm_client.metrics.stats()
+        self.assertEqual((stats["requests"], stats["retries"], stats["failures"], stats["in_flight"]), (1, 2, 0, 0))
+
+    def test_does_not_retry_client_errors(self):
+        response = httpx.Response(400, request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+        self.client.chat.completions.create.side_effect = openai.BadRequestError("bad", response=response, body=None)
+
+        with self.assertRaises(openai.BadRequestError):
+            llm_client.create_chat_completion(model="gpt-4", messages=[])
+
+        self.assertEqual(self.client.chat.completions.create.call_count, 1)
+        self.assertEqual(llm_client.metrics.stats()["failures"], 1)
+
+    def test_gives_up_when_retry_after_passes_the_deadline(self):
+        self.client.chat.completions.create.side_effect = rate_limit_error(retry_after="30")
+
+        with self.assertRaises(openai.RateLimitError):
+            llm_client.create_chat_completion(deadline=5, model="gpt-4", messages=[])
+
+        self.sleep.assert_not_called()
+        self.assertEqual(self.client.chat.completions.create.call_count, 1)
+
+    def test_attempt_timeout_is_capped_by_the_deadline(self):
+        self.client.chat.completions.create.return_value = "ok"
+
+        llm_client.create_chat_completion(deadline=2, timeout=30, model="gpt-4", messages=[])
+
+        self.assertLessEqual(self.client.chat.completions.create.call_args.kwargs["timeout"], 2)
+
+    def test_stream_holds_slot_until_consumed(self):
+        self.client.chat.completions.create.return_value = iter(["a", "b"])
+
+        stream = llm_client.create_chat_completion(model="gpt-4", messages=[], stream=True)
+        self.assertEqual(llm_client.metrics.stats()["in_flight"], 1)
+        self.assertEqual(list(stream), ["a", "b"])
+        self.assertEqual(llm_client.metrics.stats()["in_flight"], 0)
+
+def chat_completion(content):
+    return ChatCompletion.model_validate({
+        "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": "gpt-4",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}]
+    })
+
+class CompletionCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.client = MagicMock()
+        self.client.chat.completions.create.side_effect = [chat_completion("first"), chat_completion("second")]
+        for patcher in (patch.object(llm_client, "get_client", return_value=self.client),
+                        patch.object(llm_client, "completion_cache", TTLCache("test", ttl=60))):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def ask(self, cache, content="hi", timeout=30):
+        response = llm_client.create_chat_completion(
+            cache=cache, timeout=timeout, model="gpt-4", messages=[{"role": "user", "content": content}]
+        )
+        return response.choices[0].message.content
+
+    def test_identical_request_is_served_from_cache(self):
+        self.assertEqual(self.ask(cache=True), "first")
+        self.assertEqual(self.ask(cache=True, timeout=5), "first")
+        self.assertEqual(self.client.chat.completions.create.call_count, 1)
+
+    def test_cached_responses_are_marked(self):
+        request = {"model": "gpt-4", "messages": [{"role": "user", "content": "hi"}]}
+        self.assertFalse(getattr(llm_client.create_chat_completion(cache=True, **request), "from_cache", False))
+        self.assertTrue(llm_client.create_chat_completion(cache=True, **request).from_cache)
+
+    def test_different_prompt_or_fresh_call_reaches_the_model(self):
+        self.ask(cache=True)
+        self.assertEqual(self.ask(cache=False), "second")
+        self.client.chat.completions.create.side_effect = [chat_completion("third")]
+        self.assertEqual(self.ask(cache=True, content="hello"), "third")
+
+class TokenBudgetTestCase(unittest.TestCase):
+    def test_waits_for_refill_and_respects_deadline(self):
+        budget = llm_client.TokenBudget(tokens_per_minute=600)  # 10 tokens per second
+        budget.acquire(600, deadline=time.monotonic() + 1)
+
+        with self.assertRaises(llm_client.DeadlineExceeded):
+            budget.acquire(100, deadline=time.monotonic() + 1)
+
+        started = time.monotonic()
+        budget.acquire(2, deadline=time.monotonic() + 1)
+        self.assertGreater(time.monotonic() - started, 0.1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+import httpx
+import openai
+from services import model_router
+from services.model_router import Route, route_metrics
+
+def not_found_error():
+    response = httpx.Response(404, request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+    return openai.NotFoundError("model not found", response=response, body=None)
+
+def completion(prompt_tokens=1000, completion_tokens=10, from_cache=False):
+    usage = SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+    return SimpleNamespace(usage=usage, from_cache=from_cache)
+
+class ModelRouterTestCase(unittest.TestCase):
+    def setUp(self):
+        route_metrics.reset()
+        self.addCleanup(route_metrics.reset)
+        routes = patch.dict(model_router.ROUTES, {
+            "title": Route(["gpt-4o-mini", "gpt-4"], {"temperature": 0.7, "max_tokens": 10})
+        })
+        routes.start()
+        self.addCleanup(routes.stop)
+
+    def test_route_supplies_model_and_parameters(self):
+        with patch.object(model_router.llm_client, "create_chat_completion", return_value=completion()) as create:
+            model_router.create_chat_completion(route="title", messages=[], max_tokens=5)
+
+        kwargs = create.call_args.kwargs
+        self.assertEqual((kwargs["model"], kwargs["temperature"], kwargs["max_tokens"]), ("gpt-4o-mini", 0.7, 5))
+        stats = route_metrics.stats()["title"]["gpt-4o-mini"]
+        self.assertEqual((stats["calls"], stats["prompt_tokens"], stats["completion_tokens"]), (1, 1000, 10))
+        self.assertAlmostEqual(stats["cost_usd"], (1000 * 0.15 + 10 * 0.6) / 1_000_000)
+
+    def test_cached_responses_add_no_calls_tokens_or_cost(self):
+        responses = [completion(), completion(from_cache=True), completion(from_cache=True)]
+        with patch.object(model_router.llm_client, "create_chat_completion", side_effect=responses):
+            for _ in responses:
+                model_router.create_chat_completion(route="title", cache=True, messages=[])
+
+        stats = route_metrics.stats()["title"]["gpt-4o-mini"]
+        self.assertEqual((stats["calls"], stats["cache_hits"], stats["prompt_tokens"]), (1, 2, 1000))
+        self.assertAlmostEqual(stats["cost_usd"], (1000 * 0.15 + 10 * 0.6) / 1_000_000)
+
+    def test_falls_back_to_the_next_model(self):
+        with patch.object(model_router.llm_client, "create_chat_completion",
+                          side_effect=[not_found_error(), completion()]) as create:
+            model_router.create_chat_completion(route="title", messages=[])
+
+        self.assertEqual([c.kwargs["model"] for c in create.call_args_list], ["gpt-4o-mini", "gpt-4"])
+        stats = route_metrics.stats()["title"]
+        self.assertEqual((stats["gpt-4o-mini"]["fallbacks"], stats["gpt-4"]["calls"]), (1, 1))
+
+    def test_last_model_error_is_raised(self):
+        with patch.object(model_router.llm_client, "create_chat_completion", side_effect=not_found_error()):
+            with self.assertRaises(openai.NotFoundError):
+                model_router.create_chat_completion(route="title", messages=[])
+
+        stats = route_metrics.stats()["title"]["gpt-4"]
+        self.assertEqual((stats["failures"], stats["fallbacks"]), (1, 0))
+
+    def test_other_errors_do_not_fall_back(self):
+        response = httpx.Response(400, request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+        with patch.object(model_router.llm_client, "create_chat_completion",
+                          side_effect=openai.BadRequestError("bad", response=response, body=None)) as create:
+            with self.assertRaises(openai.BadRequestError):
+                model_router.create_chat_completion(route="title", messages=[])
+        self.assertEqual(create.call_count, 1)
+
+if __name__ == "__main__":
+    unittest.main()
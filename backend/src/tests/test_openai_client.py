@@ -0,0 +1,121 @@
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+from app import create_app
+from services import openai_client
+
+def tool_call(call_id, name, arguments="{}"):
+    return SimpleNamespace(id=call_id, function=SimpleNamespace(name=name, arguments=arguments))
+
+def completion(content=None, tool_calls=None):
+    response = MagicMock()
+    response.choices[0].message = SimpleNamespace(content=content, tool_calls=tool_calls)
+    return response
+
+class AppContextTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(testing=True)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+    def tearDown(self):
+        self.ctx.pop()
+
+class ToolExecutionTestCase(AppContextTestCase):
+    def slow_tool(self, label):
+        def tool(session_id, **kwargs):
+            time.sleep(0.3)
+            return f"{label} done"
+        return tool
+
+    def test_independent_tools_run_concurrently_and_all_results_are_kept(self):
+        tools = {
+            "search_and_analyze_professionals": self.slow_tool("search"),
+            "generate_personalized_outreach": self.slow_tool("outreach"),
+        }
+        calls = [
+            {"id": "call_1", "name": "search_and_analyze_professionals", "arguments": "{}"},
+            {"id": "call_2", "name": "generate_personalized_outreach", "arguments": "{}"},
+        ]
+
+        with patch.dict(openai_client.tool_functions, tools):
+            start = time.perf_counter()
+            outcomes = openai_client.run_tool_calls(calls, session_id="s1")
+            elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 0.55)
+        self.assertEqual([o["result"] for o in outcomes], ["search done", "outreach done"])
+
+    def test_sequence_tools_run_in_call_order(self):
+        order = []
+        tools = {
+            "generate_sequence": lambda session_id, **kwargs: order.append("generate") or "generated",
+            "change_tone": lambda session_id, **kwargs: order.append("tone") or "toned",
+        }
+        calls = [
+            {"id": "call_1", "name": "generate_sequence", "arguments": "{}"},
+            {"id": "call_2", "name": "change_tone", "arguments": "{}"},
+        ]
+
+        with patch.dict(openai_client.tool_functions, tools):
+            openai_client.run_tool_calls(calls, session_id="s1")
+
+        self.assertEqual(order, ["generate", "tone"])
+
+    def test_follow_up_sees_every_tool_result(self):
+        tools = {
+            "search_and_analyze_professionals": lambda session_id, **kwargs: "1. Jane Doe",
+            "generate_personalized_outreach": MagicMock(side_effect=RuntimeError("no profile")),
+        }
+        first = completion(tool_calls=[
+            tool_call("call_1", "search_and_analyze_professionals", '{"query": "PMs"}'),
+            tool_call("call_2", "generate_personalized_outreach", '{"profile_url": "x"}'),
+        ])
+        create = MagicMock(side_effect=[first, completion(content="Here you go!")])
+
+        with patch.dict(openai_client.tool_functions, tools), \
+                patch.object(openai_client, "create_chat_completion", create), \
+                patch.object(openai_client, "get_sequence_snapshot", return_value=[]):
+            result = openai_client.chat_with_openai([{"role": "user", "content": "hi"}], session_id="s1")
+
+        follow_up = create.call_args_list[1].kwargs["messages"]
+        tool_messages = [m for m in follow_up if m["role"] == "tool"]
+        self.assertEqual([m["tool_call_id"] for m in tool_messages], ["call_1", "call_2"])
+        self.assertEqual(tool_messages[1]["content"], "Error: no profile")
+        self.assertIn("`search_and_analyze_professionals`, `generate_personalized_outreach`", follow_up[0]["content"])
+        self.assertEqual(result["response"], "1. Jane Doe\n\nHere you go!")
+
+class FollowUpModeTestCase(AppContextTestCase):
+    def run_turn(self, mode, tool_result):
+        first = completion(tool_calls=[tool_call("call_1", "generate_sequence", '{"role": "PM"}')])
+        create = MagicMock(side_effect=[first, completion(content="Model reply")])
+        history = [{"role": "system", "content": "prompt"}, {"role": "user", "content": "make a sequence"}]
+
+        with patch.object(openai_client, "FOLLOW_UP_MODE", mode), \
+                patch.dict(openai_client.tool_functions, {"generate_sequence": lambda session_id, **kwargs: tool_result}), \
+                patch.object(openai_client, "create_chat_completion", create), \
+                patch.object(openai_client, "get_sequence_snapshot", return_value=[]):
+            result = openai_client.chat_with_openai(list(history), session_id="s1")
+        return result, create
+
+    def test_template_mode_skips_second_completion(self):
+        result, create = self.run_turn("template", "Outreach sequence generated and saved successfully.")
+
+        self.assertEqual(create.call_count, 1)
+        self.assertEqual(result["response"], openai_client.FOLLOW_UP_TEMPLATES["generate_sequence"])
+
+    def test_template_mode_reports_tool_failures(self):
+        result, _ = self.run_turn("template", "Error generating sequence: timeout")
+        self.assertIn("I ran into a problem: Error generating sequence: timeout", result["response"])
+
+    def test_inline_mode_continues_the_original_conversation(self):
+        result, create = self.run_turn("inline", "Outreach sequence generated and saved successfully.")
+
+        follow_up = create.call_args_list[1].kwargs["messages"]
+        self.assertEqual(follow_up[1], {"role": "user", "content": "make a sequence"})
+        self.assertEqual(follow_up[3]["role"], "tool")
+        self.assertEqual(result["response"], "Model reply")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+from datetime import datetime, timedelta
+from app import create_app
+from database.db import db
+from database.models import User, Session, Message
+from database.migrations import normalize_timestamps
+from sqlalchemy import text
+
+class PaginationTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(testing=True)
+        self.client = self.app.test_client()
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(name="Ishaan")
+            db.session.add(user)
+            db.session.commit()
+            self.user_id = user.id
+
+            start = datetime(2025, 1, 1)
+            session = Session(user_id=user.id, created_at=start)
+            db.session.add(session)
+            db.session.commit()
+            self.session_id = session.id
+
+            for i in range(7):
+                db.session.add(Message(session_id=session.id, sender="user", content=f"message {i}",
+                                       timestamp=start + timedelta(seconds=i)))
+            # Two more sessions created in the same second to exercise the id tie-breaker
+            for title in ("second", "third"):
+                db.session.add(Session(user_id=user.id, session_title=title, created_at=start + timedelta(days=1)))
+            db.session.commit()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+    def test_messages_latest_page_then_older(self):
+        url = f"/sessions/{self.session_id}/messages"
+        page = self.client.get(f"{url}?limit=3").get_json()
+        self.assertEqual([m["content"] for m in page["messages"]], ["message 4", "message 5", "message 6"])
+        self.assertTrue(page["has_more"])
+
+        seen = [m["content"] for m in page["messages"]]
+        while page["has_more"]:
+            page = self.client.get(f"{url}?limit=3&before={page['before']}").get_json()
+            seen = [m["content"] for m in page["messages"]] + seen
+
+        self.assertEqual(seen, [f"message {i}" for i in range(7)])
+
+    def test_messages_after_cursor(self):
+        url = f"/sessions/{self.session_id}/messages"
+        first = self.client.get(f"{url}?limit=2&before={self.client.get(f'{url}?limit=5').get_json()['before']}").get_json()
+        newer = self.client.get(f"{url}?limit=2&after={first['after']}").get_json()
+
+        self.assertEqual([m["content"] for m in first["messages"]], ["message 0", "message 1"])
+        self.assertEqual([m["content"] for m in newer["messages"]], ["message 2", "message 3"])
+        self.assertTrue(newer["has_more"])
+
+    def test_sessions_newest_first_without_duplicates(self):
+        page = self.client.get(f"/sessions?user_id={self.user_id}&limit=1").get_json()
+        ids = [s["session_id"] for s in page["sessions"]]
+        while page["has_more"]:
+            page = self.client.get(f"/sessions?user_id={self.user_id}&limit=1&before={page['before']}").get_json()
+            ids += [s["session_id"] for s in page["sessions"]]
+
+        self.assertEqual(len(ids), 3)
+        self.assertEqual(len(set(ids)), 3)
+        self.assertEqual(ids[-1], self.session_id)
+
+    def page_through_messages(self, session_id):
+        url = f"/sessions/{session_id}/messages"
+        page = self.client.get(f"{url}?limit=2").get_json()
+        seen = [m["content"] for m in page["messages"]]
+        for _ in range(10):
+            if not page["has_more"]:
+                break
+            page = self.client.get(f"{url}?limit=2&before={page['before']}").get_json()
+            seen = [m["content"] for m in page["messages"]] + seen
+        self.assertFalse(page["has_more"])
+        return seen
+
+    def test_default_timestamps_page_in_order(self):
+        # Written in quick succession, many in the same second
+        with self.app.app_context():
+            session = Session(user_id=self.user_id)
+            db.session.add(session)
+            db.session.commit()
+            session_id = session.id
+            for i in range(5):
+                db.session.add(Message(session_id=session_id, sender="user", content=f"m{i}"))
+                db.session.commit()
+
+        self.assertEqual(self.page_through_messages(session_id), [f"m{i}" for i in range(5)])
+
+    def test_server_default_timestamps_are_normalized(self):
+        # Rows written by the old CURRENT_TIMESTAMP default: whole seconds, no fraction
+        with self.app.app_context():
+            db.session.execute(text("UPDATE message SET timestamp = '2025-01-01 00:00:00'"))
+            db.session.execute(text("UPDATE session SET created_at = '2025-01-01 00:00:00'"))
+            db.session.commit()
+            self.assertEqual(normalize_timestamps(), 10)
+            self.assertEqual(normalize_timestamps(), 0)
+
+        seen = self.page_through_messages(self.session_id)
+        self.assertEqual(sorted(seen), [f"message {i}" for i in range(7)])
+        self.assertEqual(len(seen), 7)
+
+        page = self.client.get(f"/sessions?user_id={self.user_id}&limit=2").get_json()
+        ids = [s["session_id"] for s in page["sessions"]]
+        while page["has_more"]:
+            page = self.client.get(f"/sessions?user_id={self.user_id}&limit=2&before={page['before']}").get_json()
+            ids += [s["session_id"] for s in page["sessions"]]
+        self.assertEqual(len(set(ids)), 3)
+        self.assertEqual(len(ids), 3)
+
+    def test_invalid_cursor(self):
+        res = self.client.get(f"/sessions/{self.session_id}/messages?before=not-a-cursor")
+        self.assertEqual(res.status_code, 400)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from app import create_app
+from database.db import db
+from database.models import Profile, User, Session
+from database.profiles import get_stored_details, search_stored_profiles, store_details, store_profiles
+from agents.tools import core
+from services.cache import TTLCache
+
+def professional(slug, name, position, snippet=""):
+    return {
+        "url": f"www.linkedin.com/in/{slug}",
+        "name": name,
+        "link": f"https://www.linkedin.com/in/{slug}/",
+        "snippet": snippet or f"{position}\n{name} builds payment systems.",
+        "source": "LinkedIn",
+        "type": "profile",
+        "current_position": position
+    }
+
+PROFESSIONALS = [
+    professional("ana", "Ana Ruiz", "Engineering Manager at Stripe"),
+    professional("ben", "Ben Okafor", "Senior Engineering Manager at Airbnb"),
+    professional("cai", "Cai Lin", "Product Designer at Figma", "Designs onboarding flows. 8+ years of experience in Python"),
+]
+
+class AppContextTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(testing=True)
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.drop_all()
+        self.context.pop()
+
+class ProfileStoreTestCase(AppContextTestCase):
+    def test_full_text_search_is_stemmed(self):
+        store_profiles(PROFESSIONALS[:2], "engineering managers San Francisco")
+        store_profiles(PROFESSIONALS[2:], "product designers")
+
+        names = [p["name"] for p in search_stored_profiles("engineering manager")]
+        self.assertEqual(sorted(names), ["Ana Ruiz", "Ben Okafor"])
+        self.assertEqual([p["name"] for p in search_stored_profiles("designers at figma")], ["Cai Lin"])
+        # Matches the search that found a profile, not just its own text
+        self.assertEqual(len(search_stored_profiles("san francisco")), 2)
+        self.assertEqual(search_stored_profiles("the and of"), [])
+
+    def test_upsert_keeps_one_row_and_reindexes(self):
+        store_profiles(PROFESSIONALS, "engineering managers")
+        moved = dict(PROFESSIONALS[0], current_position="VP Engineering at Plaid", snippet="VP Engineering at Plaid")
+        store_profiles([moved], "vp engineering")
+
+        self.assertEqual(Profile.query.count(), 3)
+        self.assertEqual([p["name"] for p in search_stored_profiles("plaid")], ["Ana Ruiz"])
+        self.assertEqual(search_stored_profiles("stripe"), [])
+        self.assertEqual(db.session.get(Profile, moved["url"]).search_terms, "vp engineering\nengineering managers")
+
+    def test_stale_profiles_are_left_out(self):
+        store_profiles(PROFESSIONALS, "engineering managers")
+        Profile.query.update({"updated_at": datetime.utcnow() - timedelta(days=60)})
+        db.session.commit()
+
+        self.assertEqual(search_stored_profiles("engineering managers"), [])
+
+    def test_details_round_trip(self):
+        url = PROFESSIONALS[0]["url"]
+        store_details(url, {"url": PROFESSIONALS[0]["link"], "content": "", "title": ""})
+        self.assertIsNone(get_stored_details(url))
+
+        store_details(url, {"url": PROFESSIONALS[0]["link"], "content": "Leads payments.", "title": "Ana Ruiz"})
+        self.assertEqual(get_stored_details(url)["content"], "Leads payments.")
+
+class LocalFirstSearchTestCase(AppContextTestCase):
+    def setUp(self):
+        super().setUp()
+        # In memory only, so the suite never touches the on-disk search cache
+        patch.object(core, "last_searches", TTLCache("last_search", ttl=60)).start()
+        self.addCleanup(patch.stopall)
+        user = User(name="Ishaan", title="Engineer", industry="Tech")
+        db.session.add(user)
+        db.session.commit()
+        session = Session(user_id=user.id)
+        db.session.add(session)
+        db.session.commit()
+        self.session_id = session.id
+
+    def network_results(self, professionals):
+        return {"query": "q", "professionals": [dict(p) for p in professionals], "total_found": len(professionals)}
+
+    def test_repeated_search_is_answered_locally(self):
+        with patch.object(core, "PROFILE_LOCAL_MIN_RESULTS", 2), \
+                patch.object(core, "search_professionals",
+                             return_value=self.network_results(PROFESSIONALS[:2])) as search:
+            first = core.search_and_analyze_professionals(self.session_id, "engineering managers", location="Bay Area")
+            second = core.search_and_analyze_professionals(self.session_id, "engineering manager", location="Bay Area",
+                                                           skills=["Python"])
+
+        self.assertEqual(search.call_count, 1)
+        self.assertIn("Ana Ruiz", first)
+        self.assertIn("Ben Okafor", second)
+        self.assertEqual(core.last_searches.get(self.session_id)[0]["link"], "https://www.linkedin.com/in/ana")
+
+    def test_too_few_stored_matches_go_to_the_network(self):
+        store_profiles(PROFESSIONALS[2:], "product designers")
+        with patch.object(core, "search_professionals",
+                          return_value=self.network_results(PROFESSIONALS[:1])) as search:
+            result = core.search_and_analyze_professionals(self.session_id, "designer")
+
+        search.assert_called_once()
+        # Stored matches the network missed are added to its results
+        self.assertIn("Ana Ruiz", result)
+        self.assertIn("Cai Lin", result)
+        self.assertIsNotNone(db.session.get(Profile, PROFESSIONALS[0]["url"]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from app import create_app
+from database.db import db
+from database.models import User, Session, Message, SequenceStep
+from database.queries import get_session_user
+from services.user_context import user_contexts
+from query_counter import QueryCountMixin
+
+class QueryCountTestCase(QueryCountMixin, unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(testing=True)
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        user_contexts.clear()
+
+        user = User(name="Ishaan", title="Engineer", industry="Tech")
+        db.session.add(user)
+        db.session.commit()
+        self.user_id = user.id
+        sessions = [Session(user_id=user.id, session_title=f"Chat {i}") for i in range(20)]
+        db.session.add_all(sessions)
+        db.session.commit()
+        self.session_id = sessions[0].id
+        db.session.add_all([Message(session_id=self.session_id, sender="user", content=f"m{i}") for i in range(30)])
+        db.session.add_all([SequenceStep(session_id=self.session_id, step_number=i, content=f"s{i}") for i in range(1, 4)])
+        db.session.commit()
+        db.session.expunge_all()
+
+    def tearDown(self):
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_session_user_in_one_query(self):
+        with self.assertMaxQueries(1):
+            self.assertEqual(get_session_user(self.session_id).title, "Engineer")
+        self.assertIsNone(get_session_user("missing"))
+
+    def test_cold_user_context_is_one_query(self):
+        with self.assertMaxQueries(1):
+            self.assertIn("Ishaan", user_contexts.for_session(self.session_id).system_message["content"])
+
+    def test_listing_endpoints_are_one_query_per_page(self):
+        with self.assertMaxQueries(1):
+            response = self.client.get(f"/sessions?user_id={self.user_id}&limit=10")
+        self.assertEqual(len(response.get_json()["sessions"]), 10)
+
+        with self.assertMaxQueries(1):
+            response = self.client.get(f"/sessions/{self.session_id}/messages?limit=10")
+        self.assertEqual(len(response.get_json()["messages"]), 10)
+
+        with self.assertMaxQueries(1):
+            self.assertEqual(self.client.get(f"/sessions/{self.session_id}").get_json()["session_title"], "Chat 0")
+
+    def test_delete_session_does_not_load_children(self):
+        # One DELETE per table, however many rows the session has
+        with self.assertMaxQueries(6):
+            response = self.client.delete(f"/sessions/{self.session_id}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Message.query.count(), 0)
+        self.assertIsNone(db.session.get(Session, self.session_id))
+
+        self.assertEqual(self.client.delete(f"/sessions/{self.session_id}").status_code, 404)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+from agents.tools.ranking import PreferenceScorer, canonical_profile_url, merge_duplicates, rank_professionals
+from agents.tools.web_search import normalize_profile_url
+
+def professional(link, name="Ada Lovelace", position="", snippet=""):
+    return {"name": name, "link": link, "snippet": snippet, "current_position": position}
+
+class CanonicalUrlTestCase(unittest.TestCase):
+    def test_variants_of_one_profile_share_a_url(self):
+        variants = [
+            "https://www.linkedin.com/in/ada-lovelace/",
+            "http://uk.linkedin.com/in/Ada-Lovelace?trk=public_profile",
+            "https://de.linkedin.com/in/ada-lovelace#experience",
+            "https://linkedin.com/in/ada%2Dlovelace",
+            "https://m.linkedin.com/in/Ada-Lovelace/",
+        ]
+        self.assertEqual({canonical_profile_url(url) for url in variants}, {"https://www.linkedin.com/in/ada-lovelace"})
+        self.assertEqual(normalize_profile_url(variants[1]), "www.linkedin.com/in/ada-lovelace")
+        self.assertEqual(canonical_profile_url("https://Example.com/team/?ref=x"), "https://example.com/team")
+
+class MergeDuplicatesTestCase(unittest.TestCase):
+    def test_duplicates_fill_in_missing_fields(self):
+        merged = merge_duplicates([
+            professional("https://www.linkedin.com/in/ada/", snippet="Short", position=""),
+            professional("https://www.linkedin.com/in/grace", name="Grace Hopper"),
+            dict(professional("https://uk.linkedin.com/in/ada?trk=x", snippet="A longer snippet",
+                              position="CTO at Analytical Engines"), matched_skills=["Python"]),
+        ])
+
+        self.assertEqual([p["name"] for p in merged], ["Ada Lovelace", "Grace Hopper"])
+        self.assertEqual(merged[0]["link"], "https://www.linkedin.com/in/ada")
+        self.assertEqual(merged[0]["snippet"], "A longer snippet")
+        self.assertEqual(merged[0]["current_position"], "CTO at Analytical Engines")
+        self.assertEqual(merged[0]["matched_skills"], ["Python"])
+
+class RankingTestCase(unittest.TestCase):
+    preferences = {
+        "skills": ["Python", "Machine Learning"],
+        "targetCompanies": ["Stripe"],
+        "targetLocations": ["San Francisco"],
+        "jobLevel": "Senior"
+    }
+
+    def test_preferences_outweigh_search_order(self):
+        professionals = [
+            professional("https://www.linkedin.com/in/a", "A", "Engineer at Acme", "Java developer in Boston"),
+            professional("https://www.linkedin.com/in/b", "B", "Senior Engineer at Stripe",
+                         "Python and machine learning in San Francisco"),
+            professional("https://www.linkedin.com/in/c", "C", "Engineer at Plaid", "Python, formerly at Stripe"),
+        ]
+
+        ranked = rank_professionals(professionals, self.preferences)
+
+        self.assertEqual([p["name"] for p in ranked], ["B", "C", "A"])
+        self.assertGreater(ranked[0]["relevance"], ranked[1]["relevance"])
+
+    def test_top_k_matches_full_sort(self):
+        professionals = [
+            professional(f"https://www.linkedin.com/in/p{i}", f"P{i}", "Senior Engineer" if i % 3 else "Engineer",
+                         "Python" if i % 2 else "Go")
+            for i in range(50)
+        ]
+        full = rank_professionals(professionals, self.preferences)
+        top = rank_professionals(professionals, self.preferences, limit=5)
+
+        self.assertEqual(top, full[:5])
+
+    def test_no_preferences_keeps_search_order(self):
+        professionals = [professional(f"https://www.linkedin.com/in/p{i}", f"P{i}") for i in range(4)]
+        self.assertEqual([p["name"] for p in rank_professionals(professionals)], ["P0", "P1", "P2", "P3"])
+        self.assertEqual(PreferenceScorer().score_batch([]), [])
+
+if __name__ == "__main__":
+    unittest.main()
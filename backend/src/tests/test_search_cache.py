@@ -0,0 +1,146 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+from services.cache import TTLCache
+from agents.tools import web_search
+
+class TTLCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cache.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_lru_eviction_and_stats(self):
+        cache = TTLCache("test", ttl=60, max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)  # evicts "b", the least recently used
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (2, 1, 1))
+
+    def test_expired_entries_are_misses(self):
+        cache = TTLCache("test", ttl=60, path=self.path)
+        cache.set("a", {"x": 1}, ttl=-1)
+        self.assertIsNone(cache.get("a"))
+
+    def test_persistent_tier_is_shared_between_instances(self):
+        TTLCache("test", ttl=60, path=self.path).set("a", {"x": [1, 2]})
+        other = TTLCache("test", ttl=60, path=self.path)
+
+        self.assertEqual(other.get("a"), {"x": [1, 2]})
+        self.assertEqual(other.stats()["disk_hits"], 1)
+        self.assertIsNone(TTLCache("other", ttl=60, path=self.path).get("a"))
+
+    def test_returned_values_are_copies(self):
+        cache = TTLCache("test", ttl=60)
+        cache.set("a", {"items": []})
+        cache.get("a")["items"].append(1)
+        self.assertEqual(cache.get("a"), {"items": []})
+
+class SearchCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.search_cache = TTLCache("search", ttl=60)
+        self.profile_cache = TTLCache("profile", ttl=60)
+        patch.object(web_search, "search_cache", self.search_cache).start()
+        patch.object(web_search, "profile_cache", self.profile_cache).start()
+        self.addCleanup(patch.stopall)
+
+    @patch.object(web_search, "GoogleSearch")
+    def test_equivalent_searches_hit_serpapi_once(self, google_search):
+        google_search.return_value.get_dict.return_value = {"organic_results": [{
+            "title": "Jane Doe | LinkedIn",
+            "link": "https://www.linkedin.com/in/janedoe",
+            "snippet": "Engineering Manager at Stripe"
+        }]}
+
+        first = web_search.search_professionals("Engineering Managers", location="San Francisco", skills=["Go", "Python"])
+        second = web_search.search_professionals("engineering  managers", location="san francisco", skills=["python", "go"])
+
+        self.assertEqual(google_search.call_count, 1)
+        self.assertEqual(first["professionals"], second["professionals"])
+        self.assertEqual(second["query"], "engineering  managers")
+
+    @patch.object(web_search, "GoogleSearch")
+    def test_errors_are_not_cached(self, google_search):
+        google_search.return_value.get_dict.return_value = {"error": "Invalid API key"}
+
+        web_search.search_professionals("recruiters")
+        web_search.search_professionals("recruiters")
+
+        self.assertEqual(google_search.call_count, 2)
+
+    @patch.object(web_search, "GoogleSearch")
+    def test_profile_details_cached_by_normalised_url(self, google_search):
+        google_search.return_value.get_dict.return_value = {"organic_results": [{
+            "title": "Jane Doe", "snippet": "Engineering Manager at Stripe"
+        }]}
+
+        web_search.get_professional_details("https://www.linkedin.com/in/janedoe/")
+        details = web_search.get_professional_details("https://WWW.linkedin.com/in/janedoe?trk=abc")
+
+        self.assertEqual(google_search.call_count, 1)
+        self.assertEqual(details["content"], "Engineering Manager at Stripe")
+
+class FanOutSearchTestCase(unittest.TestCase):
+    def setUp(self):
+        patch.object(web_search, "search_cache", TTLCache("search", ttl=60)).start()
+        self.addCleanup(patch.stopall)
+
+    @staticmethod
+    def profile(handle, snippet="Engineering Manager at Stripe"):
+        return {"title": f"{handle.title()} | LinkedIn", "link": f"https://www.linkedin.com/in/{handle}", "snippet": snippet}
+
+    def test_pages_and_variants_are_merged_without_duplicates(self):
+        def page(params):
+            search = MagicMock()
+            start = params.get("start", 0)
+            if params["q"].startswith("engineering managers"):
+                # A synonym finds one new profile and one already found by the original query
+                search.get_dict.return_value = {"organic_results": [self.profile("ada"), self.profile(f"grace{start}")]}
+            elif params["q"].startswith("team leads"):
+                search.get_dict.return_value = {"error": "quota"}
+            else:
+                search.get_dict.return_value = {"organic_results": [
+                    self.profile("ada"), self.profile(f"linus{start}"), self.profile("jobs", snippet="We're hiring!")
+                ]}
+            return search
+
+        batches = []
+        with patch.object(web_search, "GoogleSearch", side_effect=page) as google_search:
+            results = web_search.search_professionals("hiring managers", fan_out=True, on_results=batches.append)
+
+        # 3 variants x 2 pages
+        self.assertEqual(google_search.call_count, 6)
+        self.assertEqual({call.args[0].get("start", 0) for call in google_search.call_args_list}, {0, 10})
+        links = [p["link"].rsplit("/", 1)[1] for p in results["professionals"]]
+        self.assertEqual(sorted(links), ["ada", "grace0", "grace10", "linus0", "linus10"])
+        self.assertEqual(sum(len(batch) for batch in batches), 5)
+        # A page failed, so the partial result is not cached
+        self.assertEqual(web_search.search_cache.stats()["memory_entries"], 0)
+
+    def test_query_variants(self):
+        self.assertEqual(web_search.query_variants("Recruiters", "Berlin", "Stripe", limit=5), [
+            ("Recruiters", "Berlin", "Stripe"),
+            ("technical recruiters", "Berlin", "Stripe"),
+            # The company and location as plain keywords, not repeated as "at Stripe" / "in Berlin"
+            ("Stripe Recruiters", "Berlin", None),
+            ("Recruiters Berlin", None, "Stripe"),
+            ("talent acquisitions", "Berlin", "Stripe"),
+        ])
+        self.assertEqual(web_search.query_variants("Recruiters", current_company="Stripe", limit=3),
+                         [("Recruiters", None, "Stripe"), ("technical recruiters", None, "Stripe"),
+                          ("Stripe Recruiters", None, None)])
+        self.assertEqual(web_search.query_variants("designers"), [("designers", None, None)])
+
+        query, location, company = web_search.query_variants("Recruiters", current_company="Stripe")[2]
+        self.assertNotIn(" at Stripe", web_search.build_linkedin_query(query, location, None, None, company))
+
+if __name__ == "__main__":
+    unittest.main()
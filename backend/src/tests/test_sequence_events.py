@@ -0,0 +1,88 @@
+import unittest
+from unittest.mock import patch
+from app import create_app
+from database.db import db
+from database.models import User, Session
+from database.sequences import replace_sequence
+from agents.tools.core import emit_sequence_update
+from services import sequence_events
+from services.sequence_events import SequenceBroadcaster, sequence_broadcaster
+from socketio_instance import socketio
+
+def sequence_events_received(client):
+    return [event["args"][0] for event in client.get_received() if event["name"] == "sequence_updated"]
+
+class SequenceRoomTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(testing=True)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        user = User(name="Ishaan")
+        db.session.add(user)
+        db.session.commit()
+        sessions = [Session(user_id=user.id), Session(user_id=user.id)]
+        db.session.add_all(sessions)
+        db.session.commit()
+        self.session_ids = [s.id for s in sessions]
+        replace_sequence(self.session_ids[0], ["intro", "follow-up"])
+
+        patcher = patch.object(sequence_broadcaster, "delay", 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(sequence_broadcaster.forget, self.session_ids[0])
+
+    def tearDown(self):
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_updates_reach_only_the_sessions_room(self):
+        viewer = socketio.test_client(self.app)
+        other = socketio.test_client(self.app)
+        viewer.emit("join_session", {"session_id": self.session_ids[0]})
+        other.emit("join_session", {"session_id": self.session_ids[1]})
+
+        snapshot = sequence_events_received(viewer)
+        self.assertEqual(snapshot[0]["version"], 1)
+        self.assertEqual([s["content"] for s in snapshot[0]["sequence"]], ["intro", "follow-up"])
+        sequence_events_received(other)
+
+        emit_sequence_update(self.session_ids[0])
+        replace_sequence(self.session_ids[0], ["intro", "casual follow-up", "final"])
+        emit_sequence_update(self.session_ids[0])
+
+        delta = sequence_events_received(viewer)[-1]
+        self.assertEqual((delta["base_version"], delta["version"], delta["step_count"]), (1, 2, 3))
+        self.assertEqual([s["step_number"] for s in delta["changes"]], [2, 3])
+        self.assertEqual(sequence_events_received(other), [])
+
+        viewer.disconnect()
+        other.disconnect()
+
+class SequenceBroadcasterTestCase(unittest.TestCase):
+    def test_changes_within_the_window_are_coalesced(self):
+        broadcaster = SequenceBroadcaster(delay=60)
+        with patch.object(sequence_events.socketio, "start_background_task") as schedule, \
+                patch.object(sequence_events.socketio, "emit") as emit:
+            broadcaster.notify("s1", [{"step_number": 1, "content": "a"}], 1)
+            broadcaster.notify("s1", [{"step_number": 1, "content": "b"}], 2)
+            broadcaster.notify("s1", [{"step_number": 1, "content": "c"}], 3)
+            broadcaster.flush("s1")
+
+        schedule.assert_called_once()
+        emit.assert_called_once()
+        payload = emit.call_args.args[1]
+        self.assertEqual((payload["version"], payload["sequence"][0]["content"]), (3, "c"))
+        self.assertEqual(emit.call_args.kwargs["to"], "session:s1")
+
+    def test_removed_steps_are_reported_through_step_count(self):
+        broadcaster = SequenceBroadcaster(delay=0)
+        with patch.object(sequence_events.socketio, "emit") as emit:
+            broadcaster.notify("s1", [{"step_number": 1, "content": "a"}, {"step_number": 2, "content": "b"}], 1)
+            broadcaster.notify("s1", [{"step_number": 1, "content": "a"}], 2)
+
+        payload = emit.call_args.args[1]
+        self.assertEqual((payload["step_count"], payload["changes"]), (1, []))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+from app import create_app
+from database.db import db
+from database.models import User, Session, StepContent
+from database.sequences import get_sequence, replace_sequence, undo_sequence, redo_sequence
+from agents.tools import core
+
+class SequenceHistoryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(testing=True)
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        user = User(name="Ishaan")
+        db.session.add(user)
+        db.session.commit()
+        session = Session(user_id=user.id)
+        db.session.add(session)
+        db.session.commit()
+        self.session_id = session.id
+
+    def tearDown(self):
+        db.drop_all()
+        self.ctx.pop()
+
+    def contents(self):
+        return [step["content"] for step in get_sequence(self.session_id)]
+
+    def test_undo_and_redo_walk_versions_locally(self):
+        replace_sequence(self.session_id, ["intro", "follow-up"], "generate_sequence")
+        replace_sequence(self.session_id, ["intro", "casual follow-up"], "revise_step")
+        replace_sequence(self.session_id, ["intro", "casual follow-up", "final"], "add_step")
+
+        self.assertEqual(undo_sequence(self.session_id)["version"], 2)
+        self.assertEqual(self.contents(), ["intro", "casual follow-up"])
+        undo_sequence(self.session_id)
+        self.assertEqual(self.contents(), ["intro", "follow-up"])
+        self.assertIsNone(undo_sequence(self.session_id))
+
+        self.assertEqual(redo_sequence(self.session_id)["version"], 2)
+        self.assertEqual(self.contents(), ["intro", "casual follow-up"])
+
+    def test_edit_after_undo_starts_a_new_branch(self):
+        replace_sequence(self.session_id, ["a"])
+        replace_sequence(self.session_id, ["b"])
+        undo_sequence(self.session_id)
+        replace_sequence(self.session_id, ["c"])
+
+        undo_sequence(self.session_id)
+        self.assertEqual(self.contents(), ["a"])
+        redo_sequence(self.session_id)
+        self.assertEqual(self.contents(), ["c"])
+        self.assertIsNone(redo_sequence(self.session_id))
+
+    def test_unchanged_steps_are_stored_once(self):
+        replace_sequence(self.session_id, ["intro", "follow-up", "final"])
+        replace_sequence(self.session_id, ["intro", "follow-up", "final (shorter)"])
+
+        self.assertEqual(StepContent.query.count(), 4)
+
+    def test_history_and_undo_endpoints(self):
+        self.assertEqual(self.client.post(f"/sequence/{self.session_id}/undo").status_code, 409)
+        replace_sequence(self.session_id, ["first"], "generate_sequence")
+        replace_sequence(self.session_id, ["second"], "change_tone")
+
+        res = self.client.post(f"/sequence/{self.session_id}/undo")
+        self.assertEqual(res.get_json()["sequence"], [{"step_number": 1, "content": "first"}])
+
+        history = self.client.get(f"/sequence/{self.session_id}/history").get_json()
+        self.assertEqual(history["current_version"], 1)
+        self.assertEqual([v["operation"] for v in history["versions"]], ["change_tone", "generate_sequence"])
+
+        res = self.client.post(f"/sequence/{self.session_id}/versions/2/restore")
+        self.assertEqual(res.get_json()["version"], 2)
+        self.assertEqual(self.contents(), ["second"])
+
+    def test_undo_tool_does_not_call_the_model(self):
+        replace_sequence(self.session_id, ["first"])
+        replace_sequence(self.session_id, ["second"])
+
+        self.assertEqual(core.undo_sequence_change(self.session_id), "Sequence restored to version 1.")
+        self.assertEqual(self.contents(), ["first"])
+        self.assertEqual(core.redo_sequence_change(self.session_id), "Sequence restored to version 2.")
+        self.assertEqual(core.redo_sequence_change(self.session_id), "There is no undone change to re-apply.")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from services.socketio_queue import FileQueueManager, queue_options
+
+class FileQueueManagerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.url = "file://" + os.path.join(self.tmp.name, "socketio.log")
+
+    def listen(self, manager, count):
+        """Collect ``count`` messages from ``manager`` on a background thread."""
+        manager.server = SimpleNamespace(sleep=time.sleep)
+        received = []
+
+        def run():
+            for message in manager._listen():
+                received.append(message)
+                if len(received) == count:
+                    return
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        time.sleep(0.1)  # let the listener reach the end of the file
+        return received, thread
+
+    def test_publish_reaches_listener_in_another_manager(self):
+        publisher = FileQueueManager(self.url, channel="helix", write_only=True)
+        publisher._publish({"method": "emit", "event": "stale"})
+        received, thread = self.listen(FileQueueManager(self.url, channel="helix"), count=2)
+
+        publisher._publish({"method": "emit", "event": "sequence_updated", "room": "session:1"})
+        FileQueueManager(self.url, channel="other")._publish({"method": "emit", "event": "ignored"})
+        publisher._publish({"method": "emit", "event": "session_updated", "room": "user:1"})
+        thread.join(timeout=2)
+
+        self.assertEqual([m["event"] for m in received], ["sequence_updated", "session_updated"])
+        self.assertEqual(received[0]["room"], "session:1")
+
+    def test_queue_options(self):
+        self.assertEqual(queue_options(None, "helix"), {})
+        self.assertEqual(queue_options("redis://localhost:6379/0", "helix"),
+                         {"message_queue": "redis://localhost:6379/0", "channel": "helix"})
+        self.assertIsInstance(queue_options(self.url, "helix")["client_manager"], FileQueueManager)
+
+if __name__ == "__main__":
+    unittest.main()
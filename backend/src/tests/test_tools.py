@@ -0,0 +1,115 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from app import create_app
+from database.db import db
+from database.models import User, Session, SequenceStep
+from agents.tools import core
+from services.cache import TTLCache
+
+def fake_completion(content):
+    response = MagicMock()
+    response.choices[0].message.content = content
+    return response
+
+class SequenceToolTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(testing=True)
+
+        with self.app.app_context():
+            db.create_all()
+            user = User(name="Ishaan", title="Engineer", industry="Tech")
+            db.session.add(user)
+            db.session.commit()
+            session = Session(user_id=user.id)
+            db.session.add(session)
+            db.session.commit()
+            self.session_id = session.id
+            for i in range(1, 4):
+                db.session.add(SequenceStep(session_id=session.id, step_number=i, content=f"original {i}"))
+            db.session.commit()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.drop_all()
+
+class ChangeToneTestCase(SequenceToolTestCase):
+    def test_failed_step_keeps_original_content(self):
+        def create(**kwargs):
+            prompt = kwargs["messages"][0]["content"]
+            if "original 2" in prompt:
+                raise RuntimeError("rate limited")
+            return fake_completion(prompt.split("Original message: ")[1].split("\n")[0] + " (casual)")
+
+        with self.app.app_context(), patch.object(core, "create_chat_completion", side_effect=create):
+            result = core.change_tone(self.session_id, "casual")
+            steps = SequenceStep.query.filter_by(session_id=self.session_id).order_by(SequenceStep.step_number).all()
+
+        self.assertIn("step(s) 2", result)
+        self.assertEqual(
+            [s.content for s in steps],
+            ["original 1 (casual)", "original 2", "original 3 (casual)"]
+        )
+
+class AddStepTestCase(SequenceToolTestCase):
+    def test_insert_in_the_middle_renumbers_steps(self):
+        with self.app.app_context(), patch.object(core, "create_chat_completion",
+                                                  return_value=fake_completion("inserted")):
+            core.add_step(self.session_id, "a quick check-in", position=2)
+            steps = SequenceStep.query.filter_by(session_id=self.session_id).order_by(SequenceStep.step_number).all()
+
+        self.assertEqual(
+            [(s.step_number, s.content) for s in steps],
+            [(1, "original 1"), (2, "inserted"), (3, "original 2"), (4, "original 3")]
+        )
+
+class BatchOutreachTestCase(SequenceToolTestCase):
+    def setUp(self):
+        super().setUp()
+        # In memory only, so the suite never touches the on-disk search cache
+        patch.object(core, "last_searches", TTLCache("last_search", ttl=60)).start()
+        self.addCleanup(patch.stopall)
+        core.last_searches.set(self.session_id, [
+            {"name": "Ada", "link": "https://linkedin.com/in/ada"},
+            {"name": "Grace", "link": "https://linkedin.com/in/grace"},
+            {"name": "Linus", "link": "https://linkedin.com/in/linus"},
+        ])
+
+    def draft(self, **kwargs):
+        def create(**request):
+            prompt = request["messages"][1]["content"]
+            if "grace" in prompt:
+                raise RuntimeError("rate limited")
+            return fake_completion("Hello " + prompt.split("Profile Content: ")[1].split("\n")[0])
+
+        details = lambda url: {"url": url, "content": url.rsplit("/", 1)[1], "title": ""}
+        with self.app.app_context(), \
+                patch.object(core, "get_professional_details", side_effect=details), \
+                patch.object(core, "create_chat_completion", side_effect=create), \
+                patch.object(core.socketio, "emit") as emit:
+            result = core.generate_batch_outreach(self.session_id, **kwargs)
+        return result, [call.args[1] for call in emit.call_args_list if call.args[0] == "outreach_draft"]
+
+    def test_drafts_last_search_results_and_streams_each(self):
+        result, events = self.draft()
+
+        self.assertTrue(result.startswith("Outreach drafted for 2 of 3 professionals"))
+        self.assertLess(result.index("Hello ada"), result.index("Hello linus"))
+        self.assertIn("Could not draft messages for: Grace.", result)
+        self.assertEqual(sorted(e["completed"] for e in events), [1, 2, 3])
+        self.assertEqual({e["name"]: "draft" in e for e in events}, {"Ada": True, "Grace": False, "Linus": True})
+
+    def test_selected_results_and_urls(self):
+        result, events = self.draft(result_numbers=[3, 3, 9])
+        self.assertEqual([e["name"] for e in events], ["Linus"])
+
+        result, events = self.draft(profile_urls=["https://linkedin.com/in/ada"])
+        self.assertIn("Outreach drafted for 1 of 1", result)
+
+    def test_requires_a_previous_search(self):
+        core.last_searches.clear()
+        result, events = self.draft()
+        self.assertIn("no recent search", result)
+        self.assertEqual(events, [])
+
+if __name__ == "__main__":
+    unittest.main()
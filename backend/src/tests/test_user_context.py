@@ -0,0 +1,52 @@
+import unittest
+from app import create_app
+from database.db import db
+from database.models import User, Session
+from agents.tools.core import get_user_context
+from services.user_context import user_contexts
+
+class UserContextCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(testing=True)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        user_contexts.clear()
+
+        user = User(name="Ishaan", title="Engineer", industry="Tech",
+                    preferences={"skills": ["Python", "SQL"], "jobLevel": "Senior"})
+        db.session.add(user)
+        db.session.commit()
+        self.user_id = user.id
+        sessions = [Session(user_id=user.id), Session(user_id=user.id)]
+        db.session.add_all(sessions)
+        db.session.commit()
+        self.session_ids = [s.id for s in sessions]
+
+    def tearDown(self):
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_sessions_of_one_user_share_a_memoized_context(self):
+        first = user_contexts.for_session(self.session_ids[0])
+        second = user_contexts.for_session(self.session_ids[1])
+
+        self.assertIs(first, second)
+        self.assertIn("Their key skills include: Python, SQL.", first.prompt_text)
+        self.assertIn("Ishaan", first.system_message["content"])
+
+    def test_profile_update_invalidates_context(self):
+        self.assertIn("as a Engineer", get_user_context(self.session_ids[0]))
+
+        user = db.session.get(User, self.user_id)
+        user.title = "Product Manager"
+        db.session.commit()
+
+        self.assertIn("as a Product Manager", get_user_context(self.session_ids[0]))
+
+    def test_unknown_session_has_no_context(self):
+        self.assertIsNone(user_contexts.for_session("missing"))
+        self.assertEqual(get_user_context("missing"), "")
+
+if __name__ == "__main__":
+    unittest.main()
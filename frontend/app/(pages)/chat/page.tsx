@@ -12,7 +12,14 @@ export default function ChatPage() {
   const searchParams = useSearchParams();
   const router = useRouter();
   const sessionId = searchParams.get("session");
-  const { messages, sequence, sendMessage, status } = useChat(sessionId);
+  const {
+    messages,
+    sequence,
+    sendMessage,
+    status,
+    loadOlderMessages,
+    hasMoreMessages,
+  } = useChat(sessionId);
   const [isSidebarExpanded, setIsSidebarExpanded] = useState(true);
 
   // Debug log for sequence state
@@ -95,7 +102,13 @@ export default function ChatPage() {
               Seeker
             </Typography>
           )}
-          <Chat messages={messages} sendMessage={sendMessage} status={status} />
+          <Chat
+            messages={messages}
+            sendMessage={sendMessage}
+            status={status}
+            loadOlderMessages={loadOlderMessages}
+            hasMoreMessages={hasMoreMessages}
+          />
         </Box>
 
         {hasValidSequence && (
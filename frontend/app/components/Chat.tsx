@@ -9,7 +9,7 @@ import {
   Link,
   Divider,
 } from "@mui/material";
-import React, { useState } from "react";
+import React, { useRef, useState } from "react";
 import { ChatMessage, LoadingStatus } from "../hooks/useChat";
 import SendIcon from "@mui/icons-material/Send";
 import SearchIcon from "@mui/icons-material/Search";
@@ -20,11 +20,15 @@ import SearchIcon from "@mui/icons-material/Search";
  * @property {ChatMessage[]} messages - Array of chat messages to display
  * @property {(content: string) => Promise<void>} sendMessage - Function to send a new message
  * @property {LoadingStatus} status - Current loading status of the chat
+ * @property {() => Promise<void>} [loadOlderMessages] - Loads the previous page of history
+ * @property {boolean} [hasMoreMessages] - Whether older history is available
  */
 interface ChatProps {
   messages: ChatMessage[];
   sendMessage: (content: string) => Promise<void>;
   status: LoadingStatus;
+  loadOlderMessages?: () => Promise<void>;
+  hasMoreMessages?: boolean;
 }
 
 /**
@@ -199,8 +203,36 @@ const convertUrlsToLinks = (text: string): React.ReactNode[] => {
  * @param {ChatProps} props - Component props
  * @returns {JSX.Element} Rendered chat interface
  */
-export default function Chat({ messages, sendMessage, status }: ChatProps) {
+export default function Chat({
+  messages,
+  sendMessage,
+  status,
+  loadOlderMessages,
+  hasMoreMessages,
+}: ChatProps) {
   const [input, setInput] = useState("");
+  const loadingOlderRef = useRef(false);
+
+  // Load older history when scrolled to the top, keeping the visible message in place
+  const handleScroll = async (e: React.UIEvent<HTMLDivElement>) => {
+    const el = e.currentTarget;
+    if (
+      el.scrollTop > 50 ||
+      !hasMoreMessages ||
+      !loadOlderMessages ||
+      loadingOlderRef.current
+    ) {
+      return;
+    }
+
+    loadingOlderRef.current = true;
+    const previousHeight = el.scrollHeight;
+    await loadOlderMessages();
+    requestAnimationFrame(() => {
+      el.scrollTop += el.scrollHeight - previousHeight;
+      loadingOlderRef.current = false;
+    });
+  };
 
   const handleSubmit = async () => {
     if (!input.trim()) return;
@@ -385,6 +417,7 @@ export default function Chat({ messages, sendMessage, status }: ChatProps) {
       }}
     >
       <Box
+        onScroll={handleScroll}
         sx={{
           flex: 1,
           display: "flex",
@@ -410,7 +443,7 @@ export default function Chat({ messages, sendMessage, status }: ChatProps) {
       >
         {messages.map((msg, i) => (
           <Fade
-            key={i}
+            key={msg.id ?? i}
             in
             timeout={500}
             style={{
@@ -1,6 +1,6 @@
 "use client";
 
-import { useState, useEffect } from "react";
+import { useState, useEffect, UIEvent } from "react";
 import {
   Box,
   List,
@@ -50,24 +50,45 @@ export default function ChatSidebar({
   const searchParams = useSearchParams();
   const currentSessionId = searchParams.get("session");
 
-  const fetchSessions = async () => {
+  const [olderCursor, setOlderCursor] = useState<string | null>(null);
+  const [hasMoreSessions, setHasMoreSessions] = useState(false);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  // Loads the newest page of sessions, or the page older than `before`
+  const fetchSessions = async (before?: string) => {
     const user_id = localStorage.getItem("user_id");
     if (!user_id) return;
 
     try {
+      const params = new URLSearchParams({ user_id });
+      if (before) params.set("before", before);
       const res = await fetch(
         `${
           process.env.NEXT_PUBLIC_API_URL || "http://localhost:5001"
-        }/sessions?user_id=${user_id}`
+        }/sessions?${params}`
       );
       if (!res.ok) throw new Error("Failed to fetch sessions");
       const data = await res.json();
-      setSessions(data);
+      setSessions((prev) =>
+        before ? [...prev, ...data.sessions] : data.sessions
+      );
+      setOlderCursor(data.before);
+      setHasMoreSessions(data.has_more);
     } catch (error) {
       console.error("Error fetching sessions:", error);
     }
   };
 
+  const handleSessionListScroll = async (e: UIEvent<HTMLElement>) => {
+    const el = e.currentTarget;
+    const nearBottom = el.scrollHeight - el.scrollTop - el.clientHeight < 100;
+    if (!nearBottom || !hasMoreSessions || loadingMore || !olderCursor) return;
+
+    setLoadingMore(true);
+    await fetchSessions(olderCursor);
+    setLoadingMore(false);
+  };
+
   useEffect(() => {
     fetchSessions();
 
@@ -86,9 +107,18 @@ export default function ChatSidebar({
       );
     };
 
+    // Title changes are sent to the user's room only
+    const joinUserRoom = () => {
+      const user_id = localStorage.getItem("user_id");
+      if (user_id) socket.emit("join_user", { user_id });
+    };
+
     socket.on("session_updated", handleSessionUpdate);
+    socket.on("connect", joinUserRoom);
+    joinUserRoom();
     return () => {
       socket.off("session_updated", handleSessionUpdate);
+      socket.off("connect", joinUserRoom);
     };
   }, []);
 
@@ -228,6 +258,7 @@ export default function ChatSidebar({
       <Collapse in={isExpanded}>
         <List
           sx={{ flex: 1, overflow: "auto", maxHeight: "calc(100vh - 64px)" }}
+          onScroll={handleSessionListScroll}
         >
           {sessions.map((session) => (
             <ListItem
@@ -1,10 +1,94 @@
 import { useState, useEffect } from "react";
-import { sendChatMessage } from "../utils/api";
+import {
+  ChatJob,
+  ChatStreamEvent,
+  fetchJob,
+  queueChatMessage,
+} from "../utils/api";
 import io from "socket.io-client";
 
 const socket = io(process.env.NEXT_PUBLIC_API_URL || "http://localhost:5001");
 
+// How often a running chat job is polled in case its room events were missed
+const JOB_POLL_INTERVAL_MS = 5000;
+
+// Pushed as "job_progress": one event of a running chat turn
+type JobProgress = { job_id: string; session_id: string; event: ChatStreamEvent };
+
+// Queues a chat turn and follows its job through the session room, calling
+// onEvent with the turn's events and a final "done". Events that arrive before
+// /chat has answered with the job id are held until it does. The job is also
+// polled, so a reply whose events were missed (e.g. across a reconnect) still lands.
+const runChatTurn = (
+  message: string,
+  sessionId: string,
+  onEvent: (event: ChatStreamEvent) => void
+) =>
+  new Promise<void>((resolve, reject) => {
+    let jobId: string | null = null;
+    let finished = false;
+    let held: JobProgress[] = [];
+    let poll: ReturnType<typeof setInterval> | undefined;
+
+    const finish = (error?: unknown) => {
+      if (finished) return;
+      finished = true;
+      socket.off("job_progress", handleProgress);
+      socket.off("job_updated", handleJob);
+      clearInterval(poll);
+      if (error) reject(error);
+      else resolve();
+    };
+
+    const handleProgress = (data: JobProgress) => {
+      if (finished || data.session_id !== sessionId) return;
+      if (jobId === null) {
+        held.push(data);
+        return;
+      }
+      if (data.job_id !== jobId) return;
+      try {
+        onEvent(data.event);
+      } catch (error) {
+        finish(error);
+      }
+    };
+
+    const handleJob = (job: ChatJob) => {
+      if (finished || job.job_id !== jobId) return;
+      if (job.status === "succeeded" && job.result) {
+        try {
+          onEvent({ type: "done", ...job.result });
+          finish();
+        } catch (error) {
+          finish(error);
+        }
+      } else if (job.status === "failed") {
+        finish(new Error(job.error || "Chat turn failed"));
+      }
+    };
+
+    socket.on("job_progress", handleProgress);
+    socket.on("job_updated", handleJob);
+    // Be in the room before the job starts, even for a session created just now
+    socket.emit("join_session", { session_id: sessionId });
+
+    queueChatMessage(message, sessionId)
+      .then((job) => {
+        jobId = job.job_id;
+        held.filter((data) => data.job_id === jobId).forEach(handleProgress);
+        held = [];
+        handleJob(job);
+        if (finished) return;
+        poll = setInterval(() => {
+          fetchJob(job.job_id).then(handleJob).catch(console.error);
+        }, JOB_POLL_INTERVAL_MS);
+      })
+      .catch(finish);
+  });
+
 export interface ChatMessage {
+  id?: string;
   sender: "user" | "ai";
   content: string;
   timestamp?: string;
@@ -15,6 +99,38 @@ export interface SequenceStep {
   content: string;
 }
 
+// Pushed as "sequence_updated": a full snapshot, or the steps that changed since base_version
+type SequenceUpdate =
+  | { session_id: string; version: number | null; sequence: SequenceStep[] }
+  | {
+      session_id: string;
+      version: number | null;
+      base_version: number | null;
+      step_count: number;
+      changes: SequenceStep[];
+    };
+
+// Pushed as "outreach_draft" while a batch of outreach messages is being written
+type OutreachDraft = {
+  session_id: string;
+  name: string | null;
+  profile_url: string;
+  completed: number;
+  total: number;
+  draft?: string;
+  error?: string;
+};
+
+const applySequenceDelta = (
+  steps: SequenceStep[],
+  stepCount: number,
+  changes: SequenceStep[]
+) => {
+  const next = steps.slice(0, stepCount);
+  for (const change of changes) next[change.step_number - 1] = change;
+  return next;
+};
+
 export type LoadingStatus = {
   state: "thinking" | "generating" | "processing" | null;
   step?: string;
@@ -27,6 +143,10 @@ export const useChat = (sessionId: string | null) => {
   const [currentSessionId, setCurrentSessionId] = useState<string | null>(
     sessionId
   );
+  // Cursor for the page of history just before the oldest loaded message
+  const [olderCursor, setOlderCursor] = useState<string | null>(null);
+  const [hasMoreMessages, setHasMoreMessages] = useState(false);
+  const [loadingOlder, setLoadingOlder] = useState(false);
 
   // Update currentSessionId when sessionId prop changes
   useEffect(() => {
@@ -67,13 +187,13 @@ export const useChat = (sessionId: string | null) => {
     }
   };
 
-  // 🔄 Fetch existing messages and sequence on session change
+  // 🔄 Fetch existing messages on session change (the sequence arrives over the socket)
   useEffect(() => {
     if (!currentSessionId) return;
 
     const fetchData = async () => {
       try {
-        // Fetch messages
+        // Fetch the latest page of messages; older ones load on scroll
         const messagesRes = await fetch(
           `${
             process.env.NEXT_PUBLIC_API_URL || "http://localhost:5001"
@@ -81,18 +201,9 @@ export const useChat = (sessionId: string | null) => {
         );
         if (!messagesRes.ok) throw new Error("Failed to fetch messages");
         const messagesData = await messagesRes.json();
-        setMessages(messagesData);
-
-        // Fetch sequence
-        const sequenceRes = await fetch(
-          `${
-            process.env.NEXT_PUBLIC_API_URL || "http://localhost:5001"
-          }/sequence/${currentSessionId}`
-        );
-        if (sequenceRes.ok) {
-          const sequenceData = await sequenceRes.json();
-          setSequence(sequenceData);
-        }
+        setMessages(messagesData.messages);
+        setOlderCursor(messagesData.before);
+        setHasMoreMessages(messagesData.has_more);
       } catch (error) {
         console.error("Error fetching data:", error);
       }
@@ -101,26 +212,94 @@ export const useChat = (sessionId: string | null) => {
     fetchData();
   }, [currentSessionId]);
 
-  // 🔔 WebSocket listener for sequence updates
+  // 🔔 Join the session's room: the server sends the sequence, then versioned deltas
   useEffect(() => {
     if (!currentSessionId) return;
+    let version: number | null = null;
 
-    const handleSequenceUpdate = (data: {
-      session_id: string;
-      sequence: SequenceStep[];
-    }) => {
-      if (data.session_id === currentSessionId) {
-        console.log("🔁 Real-time update received", data);
+    const join = () =>
+      socket.emit("join_session", { session_id: currentSessionId });
+
+    const handleSequenceUpdate = (data: SequenceUpdate) => {
+      if (data.session_id !== currentSessionId) return;
+      console.log("🔁 Real-time update received", data);
+      if ("sequence" in data) {
+        version = data.version;
         setSequence(data.sequence);
+      } else if (data.base_version !== version) {
+        // Missed an update; ask for a fresh snapshot
+        join();
+      } else {
+        version = data.version;
+        setSequence((prev) =>
+          applySequenceDelta(prev, data.step_count, data.changes)
+        );
       }
     };
 
+    const handleOutreachDraft = (data: OutreachDraft) => {
+      if (data.session_id !== currentSessionId) return;
+      setStatus({
+        state: "generating",
+        step: `Drafted ${data.completed} of ${data.total} messages`,
+      });
+    };
+
+    // Pushed as "search_results" with each batch of new profiles from a broad search
+    const handleSearchResults = (data: {
+      session_id: string;
+      professionals: unknown[];
+      found: number;
+    }) => {
+      if (data.session_id !== currentSessionId) return;
+      setStatus({
+        state: "processing",
+        step: `Found ${data.found} contacts so far`,
+      });
+    };
+
     socket.on("sequence_updated", handleSequenceUpdate);
+    socket.on("outreach_draft", handleOutreachDraft);
+    socket.on("search_results", handleSearchResults);
+    // Rooms are per connection, so join again after a reconnect
+    socket.on("connect", join);
+    join();
     return () => {
       socket.off("sequence_updated", handleSequenceUpdate);
+      socket.off("outreach_draft", handleOutreachDraft);
+      socket.off("search_results", handleSearchResults);
+      socket.off("connect", join);
+      socket.emit("leave_session", { session_id: currentSessionId });
     };
   }, [currentSessionId]);
 
+  // Prepend the page of history just before the oldest loaded message
+  const loadOlderMessages = async () => {
+    if (!currentSessionId || !olderCursor || !hasMoreMessages || loadingOlder) {
+      return;
+    }
+
+    setLoadingOlder(true);
+    try {
+      const res = await fetch(
+        `${
+          process.env.NEXT_PUBLIC_API_URL || "http://localhost:5001"
+        }/sessions/${currentSessionId}/messages?before=${encodeURIComponent(
+          olderCursor
+        )}`
+      );
+      if (!res.ok) throw new Error("Failed to fetch older messages");
+      const data = await res.json();
+      setMessages((prev) => [...data.messages, ...prev]);
+      setOlderCursor(data.before);
+      setHasMoreMessages(data.has_more);
+    } catch (error) {
+      console.error("Error fetching older messages:", error);
+    } finally {
+      setLoadingOlder(false);
+    }
+  };
+
   const sendMessage = async (content: string) => {
     try {
       // Create a new session if none exists
@@ -130,47 +309,49 @@ export const useChat = (sessionId: string | null) => {
       setMessages((prev) => [...prev, { sender: "user", content }]);
       setStatus({ state: "thinking", step: "Analyzing your request" });
 
-      const data = await sendChatMessage(content, sessionIdToUse);
-
-      if (!data.sequence) {
-        setMessages((prev) => [
-          ...prev,
-          { sender: "ai", content: data.response },
-        ]);
-        setStatus({ state: null });
-        return;
-      }
-
-      const showGenerationSteps = async () => {
-        setStatus({ state: "generating", step: "Identifying key milestones" });
-        await new Promise((res) => setTimeout(res, 1000));
-
-        setStatus({ state: "generating", step: "Planning sequence steps" });
-        await new Promise((res) => setTimeout(res, 1000));
-
-        setStatus({
-          state: "generating",
-          step: "Creating detailed instructions",
-        });
-        await new Promise((res) => setTimeout(res, 1000));
-
-        // Update both sequence and messages in a single state update
-        setSequence(data.sequence);
+      // The AI message is appended on the first token and then updated in place
+      let replyStarted = false;
+      const updateReply = (update: (content: string) => string) => {
+        const started = replyStarted;
+        replyStarted = true;
         setMessages((prev) => {
-          // Check if the AI message is already in the state
-          const lastMessage = prev[prev.length - 1];
-          if (
-            lastMessage?.sender === "ai" &&
-            lastMessage?.content === data.response
-          ) {
-            return prev;
+          if (!started) {
+            return [...prev, { sender: "ai", content: update("") }];
           }
-          return [...prev, { sender: "ai", content: data.response }];
+          const last = prev[prev.length - 1];
+          return [
+            ...prev.slice(0, -1),
+            { ...last, content: update(last.content) },
+          ];
         });
-        setStatus({ state: null });
       };
 
-      await showGenerationSteps();
+      await runChatTurn(content, sessionIdToUse, (event) => {
+        switch (event.type) {
+          case "token":
+            setStatus({ state: null });
+            updateReply((current) => current + event.content);
+            break;
+          case "tool_call":
+            // Drop any preamble so the follow-up reply starts fresh
+            if (replyStarted) updateReply(() => "");
+            setStatus({
+              state: "generating",
+              step: `Running ${event.name.replace(/_/g, " ")}`,
+            });
+            break;
+          case "tool_result":
+            setStatus({ state: "processing", step: "Wrapping up" });
+            break;
+          case "done":
+            updateReply(() => event.response);
+            if (event.sequence) setSequence(event.sequence);
+            setStatus({ state: null });
+            break;
+          case "error":
+            throw new Error(event.error);
+        }
+      });
     } catch (error) {
       console.error("Error sending message:", error);
       setStatus({ state: null });
@@ -189,5 +370,7 @@ export const useChat = (sessionId: string | null) => {
     sequence,
     status,
     sendMessage,
+    loadOlderMessages,
+    hasMoreMessages,
   };
 };
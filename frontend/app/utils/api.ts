@@ -1,4 +1,32 @@
-export const sendChatMessage = async (message: string, sessionId: string) => {
+export type ChatStreamEvent =
+  | { type: "token"; content: string }
+  | { type: "tool_call"; name: string; arguments: Record<string, unknown> }
+  | { type: "tool_result"; name: string; result?: string; error?: string }
+  | {
+      type: "done";
+      response: string;
+      sequence: { step_number: number; content: string }[] | null;
+    }
+  | { type: "error"; error: string };
+
+// A queued chat turn, as returned by /chat and /jobs/<job_id> and pushed as "job_updated"
+export type ChatJob = {
+  job_id: string;
+  session_id: string;
+  status: "queued" | "running" | "succeeded" | "failed";
+  result: {
+    response: string;
+    sequence: { step_number: number; content: string }[];
+  } | null;
+  error: string | null;
+};
+
+// Queues a chat turn on /chat. The server answers 202 with the job right away;
+// the reply arrives in the session room as "job_progress" and "job_updated".
+export const queueChatMessage = async (
+  message: string,
+  sessionId: string
+): Promise<ChatJob> => {
   const apiUrl = process.env.NEXT_PUBLIC_API_URL || "http://localhost:5001";
   const res = await fetch(`${apiUrl}/chat`, {
     method: "POST",
@@ -12,9 +40,16 @@ export const sendChatMessage = async (message: string, sessionId: string) => {
       `Chat API failed with status ${res.status}: ${errorDetails}`
     );
   }
-  const data = await res.json();
-  console.log("Raw API Response:", { data, sessionId }); // Debug log
-  return data;
+  return res.json();
+};
+
+export const fetchJob = async (jobId: string): Promise<ChatJob> => {
+  const apiUrl = process.env.NEXT_PUBLIC_API_URL || "http://localhost:5001";
+  const res = await fetch(`${apiUrl}/jobs/${jobId}`);
+  if (!res.ok) {
+    throw new Error(`Job lookup failed with status ${res.status}`);
+  }
+  return res.json();
 };
 
 export const signUpUser = async (formData: {